@@ -0,0 +1,85 @@
+# scripts/benchmark_bulk_write.py
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.benchmark_utils import generate_leads
+from src.db.db_utils import get_db_engine
+from src.ml.data_loader.data_loader import write_dataframe
+
+TABLE = "bench_bulk_write"
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    """Synthetic leads with NaNs and a few empty strings (must survive as '' not NULL)."""
+    block = generate_leads(min(rows, 100_000), seed=7)
+    df = pd.concat([block] * -(-rows // len(block)), ignore_index=True).iloc[:rows]
+    df.loc[df.index % 997 == 0, "City"] = ""
+    df["bench_row"] = np.arange(rows)
+    return df
+
+
+def check_roundtrip(engine, df: pd.DataFrame, sample: int = 2000) -> None:
+    """Compare a sample of rows read back against the source frame (values, NULLs, empty strings)."""
+    with engine.connect() as conn:
+        back = pd.read_sql(text(f"SELECT * FROM {TABLE} ORDER BY bench_row LIMIT {sample}"), conn)
+    src = df.iloc[:sample].reset_index(drop=True)
+    assert list(back.columns) == list(src.columns)
+    for col in src.columns:
+        a, b = src[col], back[col]
+        assert (a.isna() == b.isna()).all(), f"NULL mismatch in {col}"
+        if a.dtype.kind in "fi":
+            assert np.allclose(a.dropna().astype(float), b.dropna().astype(float)), col
+        else:
+            assert (a.dropna().astype(str) == b.dropna().astype(str)).all(), col
+
+
+def main():
+    parser = argparse.ArgumentParser(description="to_sql INSERTs vs COPY FROM STDIN (needs DB_* env for Postgres)")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--insert-max-rows", type=int, default=1_000_000,
+                        help="Skip the INSERT path above this size (it can take a very long time)")
+    args = parser.parse_args()
+
+    engine = get_db_engine()
+    results = []
+    for rows in args.rows:
+        df = make_frame(rows)
+        for method in ("insert", "copy"):
+            if method == "insert" and rows > args.insert_max_rows:
+                continue
+            t0 = time.perf_counter()
+            # replace + append: same if_exists semantics as lead_data loads and upload appends
+            half = rows // 2
+            write_dataframe(df.iloc[:half], TABLE, engine, if_exists="replace", method=method)
+            write_dataframe(df.iloc[half:], TABLE, engine, if_exists="append", method=method)
+            elapsed = time.perf_counter() - t0
+
+            with engine.connect() as conn:
+                count = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+            assert count == rows, (count, rows)
+            check_roundtrip(engine, df)
+
+            results.append({"rows": rows, "method": method, "seconds": round(elapsed, 3),
+                            "rows_per_s": round(rows / elapsed)})
+            print(f"[{rows:>9,} rows] {method:6s} {elapsed:8.2f}s  ({rows / elapsed:,.0f} rows/s)")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# scripts/benchmark_chunked_ingest.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+
+import joblib
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline
+from app.utils.ingest import categorical_columns, iter_csv_chunks, ingest_chunks, stream_predictions_json
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (Linux reports KiB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def write_csv(path: str, target_mb: int, block_rows: int = 50_000) -> int:
+    """Append synthetic lead blocks to `path` until it reaches `target_mb`. Returns row count."""
+    rows, seed = 0, 100
+    with open(path, "w") as f:
+        while f.tell() < target_mb * 1024 * 1024:
+            block = generate_leads(block_rows, seed=seed, with_target=False)
+            block.to_csv(f, index=False, header=(rows == 0))
+            rows += len(block)
+            seed += 1
+    return rows
+
+
+def run_worker(mode: str, csv_path: str, model_path: str, chunk_rows: int, persist: bool) -> dict:
+    """Process one upload the way /upload does in `mode`, measuring time and peak RSS."""
+    pipeline, model = joblib.load(model_path)
+    baseline = peak_rss_mb()
+
+    def score_chunk(df):
+        return [int(x > 0.5) for x in model.predict_proba(pipeline.transform(df))[:, 1]]
+
+    persist_chunk = None
+    if persist:
+        from src.ml.data_loader.data_loader import save_dataframe_to_postgres
+        persist_chunk = lambda df, if_exists: save_dataframe_to_postgres(df, "uploaded_leads", if_exists=if_exists)
+
+    t0 = time.perf_counter()
+    if mode == "buffered":
+        # Current route: parse, re-parse for handle_csv_upload, score, to_dict + json
+        df = pd.read_csv(csv_path)
+        raw = pd.read_csv(csv_path)
+        if persist_chunk:
+            persist_chunk(raw, "replace")
+        del raw
+        df["prediction"] = score_chunk(df)
+        records = df.where(pd.notnull(df), None).to_dict(orient="records")
+        response_bytes = len(json.dumps({"predictions": records}))
+    else:
+        with open(csv_path, "rb") as stream:
+            chunks = ingest_chunks(
+                iter_csv_chunks(stream, chunk_rows, text_columns=categorical_columns(pipeline)),
+                score_chunk=score_chunk,
+                persist_chunk=persist_chunk,
+            )
+            first = next(chunks)
+            response_bytes = sum(len(part) for part in stream_predictions_json(first, chunks))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_over_baseline_mb": peak_rss_mb() - baseline,
+        "response_mb": response_bytes / 1024 / 1024,
+    }
+
+
+def check_concurrent_uploads(chunk_rows: int = 1000) -> dict:
+    """
+    Two chunked uploads interleaved chunk by chunk (as concurrent requests or
+    jobs on different workers would be): 'uploaded_leads' must end up holding
+    exactly the rows of the upload that finished last, with no staging tables left.
+    """
+    import io
+    from sqlalchemy import text
+    from app.utils.upload import StagedUpload, publish_when_done
+    from src.ml.data_loader.data_loader import load_data_from_postgres
+    from src.db.db_utils import get_db_engine
+
+    def upload(rows: int, seed: int):
+        csv = io.StringIO(generate_leads(rows, seed=seed, with_target=False).to_csv(index=False))
+        staged = StagedUpload("uploaded_leads")
+        return publish_when_done(ingest_chunks(iter_csv_chunks(csv, chunk_rows),
+                                               score_chunk=lambda df: [0] * len(df),
+                                               persist_chunk=staged.write), staged)
+
+    first, second = upload(5 * chunk_rows, seed=11), upload(3 * chunk_rows, seed=12)
+    pending = [first, second]
+    while pending:
+        for gen in list(pending):
+            if next(gen, None) is None:
+                pending.remove(gen)
+
+    rows = len(load_data_from_postgres("uploaded_leads", columns=["Lead Number"]))
+    with get_db_engine().connect() as conn:
+        leftovers = conn.execute(text("SELECT count(*) FROM information_schema.tables "
+                                      "WHERE table_name LIKE 'uploaded_leads\\_\\_upload\\_%'")).scalar()
+    assert rows == 5 * chunk_rows and leftovers == 0, (rows, leftovers)
+    return {"uploaded_leads_rows": rows, "expected_rows": 5 * chunk_rows, "staging_tables_left": leftovers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buffered vs chunked /upload ingest: time and peak memory")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--persist", action="store_true", help="Also write raw rows to Postgres (needs DB_* env)")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "CSV", "MODEL"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        mode, csv_path, model_path = args.worker
+        print(json.dumps(run_worker(mode, csv_path, model_path, args.chunk_rows, args.persist)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "standin.joblib")
+        joblib.dump(build_standin_pipeline(generate_leads(20000, seed=1)), model_path)
+
+        results = []
+        for size_mb in args.sizes_mb:
+            csv_path = os.path.join(tmp, f"leads_{size_mb}mb.csv")
+            rows = write_csv(csv_path, size_mb)
+            for mode in ("buffered", "chunked"):
+                cmd = [sys.executable, __file__, "--worker", mode, csv_path, model_path,
+                       "--chunk-rows", str(args.chunk_rows)] + (["--persist"] if args.persist else [])
+                out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+                result = json.loads(out.strip().splitlines()[-1])
+                result.update({"file_mb": size_mb, "rows": rows})
+                results.append(result)
+                print(f"[{size_mb}MB/{rows} rows] {mode:8s} {result['seconds']:.1f}s "
+                      f"peak RSS {result['peak_rss_mb']:.0f}MB (+{result['peak_rss_over_baseline_mb']:.0f}MB)")
+            os.remove(csv_path)
+
+        print(json.dumps(results, indent=2))
+
+    if args.persist:
+        print(f"[concurrent uploads] {check_concurrent_uploads()}")
+        print("✅ Interleaved uploads never mix rows in 'uploaded_leads'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# scripts/benchmark_coalescer.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary
+from app.utils.batching import RequestCoalescer
+from app.utils.compiled_scorer import CompiledScorer
+
+
+def run_load(call, records: list, concurrency: int, per_thread: int) -> dict:
+    """
+    Drive `call(record)` from `concurrency` closed-loop threads.
+
+    Returns:
+        dict: Throughput (req/s) and latency percentiles.
+    """
+    latencies = [[] for _ in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(i: int):
+        barrier.wait()
+        for j in range(per_thread):
+            record = records[(i * per_thread + j) % len(records)]
+            t0 = time.perf_counter()
+            call(record)
+            latencies[i].append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    flat = [x for per in latencies for x in per]
+    summary = latency_summary(flat)
+    summary["throughput_rps"] = len(flat) / elapsed
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request vs coalesced /predict scoring under concurrency")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests per run")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    pipeline, model = build_standin_pipeline(generate_leads(20000, seed=1))
+    scorer = CompiledScorer(pipeline, model)
+    request_df = generate_leads(2000, seed=2, with_target=False)
+    records = request_df.astype(object).where(pd.notnull(request_df), None).to_dict(orient="records")
+
+    # Same scoring paths predict_lead / predict_proba_records use
+    def single_pandas(record):
+        return float(model.predict_proba(pipeline.transform(pd.DataFrame([record])))[0, 1])
+
+    def single_compiled(record):
+        return float(model.predict_proba(scorer.transform_one(record))[0, 1])
+
+    def batch_pandas(batch):
+        return model.predict_proba(pipeline.transform(pd.DataFrame(batch)))[:, 1].tolist()
+
+    def batch_compiled(batch):
+        return model.predict_proba(scorer.transform_many(batch))[:, 1].tolist()
+
+    # Sanity: coalesced results match the per-request path
+    coalescer = RequestCoalescer(batch_pandas, args.max_wait_ms, args.max_batch)
+    for record in records[:20]:
+        assert abs(coalescer.submit(record) - single_pandas(record)) < 1e-9
+    coalescer.close()
+
+    results = {}
+    for featurizer, single, batch in (
+        ("pandas", single_pandas, batch_pandas),
+        ("compiled", single_compiled, batch_compiled),
+    ):
+        for concurrency in args.concurrency:
+            per_thread = max(1, args.requests // concurrency)
+            key = f"{featurizer}_c{concurrency}"
+            results[f"{key}_per_request"] = run_load(single, records, concurrency, per_thread)
+
+            coalescer = RequestCoalescer(batch, args.max_wait_ms, args.max_batch)
+            results[f"{key}_coalesced"] = run_load(coalescer.submit, records, concurrency, per_thread)
+            results[f"{key}_coalesced"]["mean_batch_size"] = coalescer.stats()["mean_batch_size"]
+            coalescer.close()
+
+            print(
+                f"[{key}] per-request {results[f'{key}_per_request']['throughput_rps']:.0f} req/s "
+                f"p99={results[f'{key}_per_request']['p99_ms']:.2f}ms | coalesced "
+                f"{results[f'{key}_coalesced']['throughput_rps']:.0f} req/s "
+                f"p99={results[f'{key}_coalesced']['p99_ms']:.2f}ms "
+                f"(mean batch {results[f'{key}_coalesced']['mean_batch_size']:.1f})"
+            )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# scripts/benchmark_compiled_scorer.py
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary, time_calls
+from app.utils.compiled_scorer import CompiledScorer
+
+
+def _records(df: pd.DataFrame) -> list:
+    """Rows as JSON-like dicts (NaN → None, as a JSON payload would arrive)."""
+    return df.astype(object).where(pd.notnull(df), None).to_dict(orient="records")
+
+
+def check_parity(pipeline, scorer: CompiledScorer, df: pd.DataFrame) -> float:
+    """
+    Compare compiled features with `pipeline.transform` row by row.
+
+    Returns:
+        float: Max absolute difference across all rows.
+
+    Raises:
+        AssertionError: If any row differs beyond 1e-9.
+    """
+    records = _records(df)
+    expected = np.vstack([pipeline.transform(pd.DataFrame([r])) for r in records])
+    compiled = scorer.transform_many(records)
+    max_diff = float(np.max(np.abs(expected - compiled)))
+    assert np.allclose(expected, compiled, rtol=0, atol=1e-9), f"Parity failure: max diff {max_diff}"
+
+    # Batch path with NaN-filled frames (CSV uploads) must match as well
+    batch_expected = pipeline.transform(df)
+    batch_compiled = scorer.transform_many(df.to_dict(orient="records"))
+    assert np.allclose(batch_expected, batch_compiled, rtol=0, atol=1e-9), "Batch parity failure"
+    return max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled scorer parity check + latency benchmark")
+    parser.add_argument("--train-rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--parity-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    train_df = generate_leads(args.train_rows, seed=1)
+    pipeline, model = build_standin_pipeline(train_df)
+    scorer = CompiledScorer(pipeline, model)
+
+    request_df = generate_leads(max(args.requests, args.parity_rows), seed=2, with_target=False)
+    max_diff = check_parity(pipeline, scorer, request_df.head(args.parity_rows))
+    print(f"✅ Parity OK on {args.parity_rows} rows (max abs diff {max_diff:.2e})")
+
+    records = _records(request_df.head(args.requests))
+
+    def pandas_path(record):
+        return model.predict_proba(pipeline.transform(pd.DataFrame([record])))
+
+    def compiled_path(record):
+        return model.predict_proba(scorer.transform_one(record))
+
+    results = {
+        "n_features": scorer.n_features,
+        "featurize_pandas": latency_summary(time_calls(lambda r: pipeline.transform(pd.DataFrame([r])), records)),
+        "featurize_compiled": latency_summary(time_calls(scorer.transform_one, records)),
+        "score_pandas": latency_summary(time_calls(pandas_path, records)),
+        "score_compiled": latency_summary(time_calls(compiled_path, records)),
+    }
+    results["speedup_p50"] = results["score_pandas"]["p50_ms"] / results["score_compiled"]["p50_ms"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
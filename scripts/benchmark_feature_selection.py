@@ -0,0 +1,99 @@
+# scripts/benchmark_feature_selection.py
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.benchmark_utils import generate_leads
+from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
+from src.ml.pipeline.feature_selection import apply_feature_selection
+
+
+def downstream_models() -> dict:
+    from lightgbm import LGBMClassifier
+    return {"LogisticRegression": lambda: LogisticRegression(max_iter=1000),
+            "LightGBM": lambda: LGBMClassifier(n_estimators=100, verbose=-1, random_state=42)}
+
+
+def transformed(df, pipeline=None):
+    """(X, y, fitted pipeline): preprocessing fitted on `df` unless `pipeline` is given."""
+    df = clean_columns(df)
+    y = df["Converted"]
+    X = df.drop(columns=["Converted"])
+    if pipeline is None:
+        numeric = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+        categorical = X.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+        pipeline = get_full_pipeline(numeric, categorical)
+        return pipeline.fit_transform(X, y), y, pipeline
+    return pipeline.transform(X), y, pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature selection strategies: time, overlap with step-1 RFE, "
+                                                 "downstream F1")
+    parser.add_argument("--rows", type=int, default=9240)
+    parser.add_argument("--top-n", type=int, default=50)
+    args = parser.parse_args()
+
+    leads = generate_leads(args.rows, seed=8)
+    train, test = train_test_split(leads, test_size=0.2, random_state=42, stratify=leads["Converted"])
+    X_train, y_train, pipeline = transformed(train)
+    X_test, y_test, _ = transformed(test, pipeline)
+    names = pipeline.named_steps["preprocessing"].get_feature_names_out()
+
+    # Previous run for the warm start: last month's table, same distribution, fresh rows
+    X_prev, y_prev, _ = transformed(generate_leads(args.rows, seed=9), pipeline)
+    _, previous = apply_feature_selection(X_prev, y_prev, top_n=args.top_n, method="rfe")
+
+    cases = {
+        "rfe_step1 (previous)": dict(method="rfe", step=1),
+        "rfe_step0.1": dict(method="rfe", step=0.1),
+        "rfe_step0.2": dict(method="rfe", step=0.2),
+        "importance": dict(method="importance"),
+        "permutation": dict(method="permutation"),
+        "l1": dict(method="l1"),
+        "warm": dict(method="warm", previous=previous),
+        "warm_cold": dict(method="warm"),
+    }
+    models = downstream_models()
+    results = {"rows": args.rows, "features": X_train.shape[1], "top_n": args.top_n, "cpu_count": os.cpu_count()}
+
+    def f1s(columns):
+        return {name: round(f1_score(y_test, make().fit(X_train[:, columns], y_train).predict(X_test[:, columns])), 4)
+                for name, make in models.items()}
+
+    results["all_features"] = {"f1": f1s(list(range(X_train.shape[1])))}
+    baseline = None
+    for case, options in cases.items():
+        t0 = time.perf_counter()
+        _, selected = apply_feature_selection(X_train, y_train, top_n=args.top_n, **options)
+        seconds = time.perf_counter() - t0
+        assert len(selected) == args.top_n and selected == sorted(set(selected))
+        baseline = baseline or set(selected)
+        results[case] = {
+            "seconds": round(seconds, 2),
+            "overlap_with_step1": round(len(baseline & set(selected)) / len(baseline | set(selected)), 3),
+            "f1": f1s(selected),
+        }
+        r = results[case]
+        print(f"[{case:21s}] {r['seconds']:7.2f}s  jaccard vs step-1 RFE {r['overlap_with_step1']:.3f}  "
+              + "  ".join(f"F1 {m} {v:.4f}" for m, v in r["f1"].items()))
+    results["not_selected_by_step1"] = sorted(str(names[i]) for i in set(range(len(names))) - baseline)[:10]
+
+    print(json.dumps(results, indent=2))
+    print("✅ Every strategy returns top_n sorted column indices for FeatureSelector")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# scripts/benchmark_feature_writer.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary
+from app.utils.feature_writer import BackgroundWriter
+
+TABLE = "user_uploaded_preprocessed"
+
+
+def make_engine(args, tmp: str):
+    """Postgres from DB_* env with --postgres, else a local SQLite file."""
+    if args.postgres:
+        from src.db.db_utils import get_db_engine
+        return get_db_engine()
+    return create_engine(f"sqlite:///{tmp}/features.db")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs background writes of preprocessed features in predict_batch")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=500, help="Rows per predict_batch call")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated DB round trip added to each write")
+    parser.add_argument("--postgres", action="store_true", help="Write to Postgres from DB_* env instead of SQLite")
+    args = parser.parse_args()
+
+    pipeline, model = build_standin_pipeline(generate_leads(20000, seed=1))
+    preprocessing = pipeline.named_steps["preprocessing"]
+    selected = pipeline.named_steps["feature_selection"].selected_features
+    feature_names = [preprocessing.get_feature_names_out()[i] for i in selected]
+    batches = [generate_leads(args.rows, seed=10 + i, with_target=False) for i in range(8)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(args, tmp)
+        write_lock = threading.Lock()  # SQLite allows one writer; Postgres would not need this
+
+        def write(df_pre: pd.DataFrame) -> None:
+            time.sleep(args.rtt_ms / 1000.0)
+            with write_lock:
+                df_pre.to_sql(TABLE, engine, index=False, if_exists="append")
+
+        def run(mode: str) -> dict:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            writer = BackgroundWriter(write, flush_interval_s=0.5, flush_rows=20_000) if mode == "async" else None
+            latencies = [[] for _ in range(args.threads)]
+
+            def client(i: int):
+                for j in range(i, args.requests, args.threads):
+                    t0 = time.perf_counter()
+                    X = pipeline.transform(batches[j % len(batches)])
+                    [int(p > 0.5) for p in model.predict_proba(X)[:, 1]]
+                    df_pre = pd.DataFrame(X, columns=feature_names)
+                    if writer is not None:
+                        writer.submit(df_pre)
+                    else:
+                        write(df_pre)
+                    latencies[i].append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            served = time.perf_counter() - t0
+            stats = None
+            if writer is not None:
+                writer.close()
+                stats = writer.stats()
+            total = time.perf_counter() - t0
+
+            with engine.connect() as conn:
+                persisted = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}")).scalar()
+            assert persisted == args.requests * args.rows, (persisted, args.requests * args.rows)
+
+            return {
+                "request_latency": latency_summary([x for per in latencies for x in per]),
+                "serve_s": round(served, 3),
+                "until_persisted_s": round(total, 3),
+                "rows_persisted": persisted,
+                "writer": stats,
+            }
+
+        results = {"sync": run("sync"), "async": run("async")}
+        for mode, r in results.items():
+            print(f"[{mode:5s}] p50={r['request_latency']['p50_ms']:.1f}ms p99={r['request_latency']['p99_ms']:.1f}ms "
+                  f"served in {r['serve_s']:.2f}s, all rows persisted after {r['until_persisted_s']:.2f}s")
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# scripts/benchmark_fit_cache.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.benchmark_utils import generate_leads
+from scripts.benchmark_sparse_mode import load_lead_data
+from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
+from src.ml.pipeline.feature_selection import apply_feature_selection
+from src.ml.pipeline.feature_selector import FeatureSelector
+from src.ml.pipeline.fit_cache import FitCache, fit_preprocessing, cache_key
+
+
+def uncached_fit(X, y, numeric, categorical, sparse_mode, dtype):
+    """The previous run_pipeline steps 4–7: fit_transform, RFE, then a second fit of the final pipeline."""
+    full_pipeline = get_full_pipeline(numeric, categorical, sparse=sparse_mode, dtype=dtype)
+    X_transformed = full_pipeline.fit_transform(X, y)
+    X_selected, selected = apply_feature_selection(X_transformed, y)
+    final_pipeline = Pipeline([
+        ("feature_engineering", full_pipeline.named_steps["feature_engineering"]),
+        ("preprocessing",       full_pipeline.named_steps["preprocessing"]),
+        ("feature_selection",   FeatureSelector(selected_features=selected)),
+    ])
+    final_pipeline.fit(X, y)
+    return final_pipeline, X_selected, [int(i) for i in selected]
+
+
+def dense(X) -> np.ndarray:
+    return X.toarray() if sparse.issparse(X) else np.asarray(X)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round(time.perf_counter() - t0, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run_pipeline fit + RFE: uncached vs fit cache miss / hit")
+    parser.add_argument("--source", choices=["synthetic", "table"], default="synthetic",
+                        help="synthetic leads (117 features, RFE eliminates 67) or lead_data / its CSV")
+    parser.add_argument("--rows", type=int, default=9240, help="Synthetic rows")
+    args = parser.parse_args()
+
+    if args.source == "synthetic":
+        df, source = generate_leads(args.rows, seed=8), "synthetic"
+    else:
+        df, source = load_lead_data()
+    df = clean_columns(df)
+    y = df["Converted"]
+    X = df.drop(columns=["Converted"])
+    numeric = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    categorical = X.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    results = {"source": source, "rows": len(X)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        import mlflow
+        mlflow.set_tracking_uri(f"file://{os.path.join(tmp, 'mlruns')}")
+        cache = FitCache(root=os.path.join(tmp, "fit_cache"), max_entries=2)
+        miss_keys = {}
+
+        for sparse_mode in (False, True):
+            mode = "sparse" if sparse_mode else "dense"
+            (pipeline, X_sel, selected), results[f"{mode}_uncached_s"] = timed(
+                uncached_fit, X, y, numeric, categorical, sparse_mode, "float64")
+            (_, _, _, miss), results[f"{mode}_miss_s"] = timed(
+                fit_preprocessing, X, y, numeric, categorical, sparse=sparse_mode, dtype="float64", cache=cache)
+            (full_hit, X_hit, selected_hit, hit), results[f"{mode}_hit_s"] = timed(
+                fit_preprocessing, X, y, numeric, categorical, sparse=sparse_mode, dtype="float64", cache=cache)
+            assert (miss["status"], hit["status"]) == ("miss", "hit"), (miss, hit)
+            miss_keys[mode] = miss["key"]
+
+            # Same selection, same selected matrix, and the cached pipeline transforms like a fresh fit
+            assert selected_hit == selected
+            assert np.array_equal(dense(X_hit), dense(X_sel), equal_nan=True)
+            hit_pipeline = Pipeline(list(full_hit.steps) + [("feature_selection", FeatureSelector(selected_hit))])
+            assert np.array_equal(dense(hit_pipeline.transform(X.head(2000))), dense(pipeline.transform(X.head(2000))),
+                                  equal_nan=True)
+            print(f"[{mode:6s}] uncached {results[f'{mode}_uncached_s']:6.2f}s  miss {results[f'{mode}_miss_s']:6.2f}s  "
+                  f"hit {results[f'{mode}_hit_s']:6.2f}s")
+
+        # Any data or config change gives another key; rebuilt pipelines and copied data don't
+        pipe = get_full_pipeline(numeric, categorical, sparse=False, dtype="float64")
+        base, results["fingerprint_s"] = timed(cache_key, X, y, pipe, top_n=50)
+        changed = X.copy()
+        changed.iloc[0, changed.columns.get_loc("TotalVisits")] = 999
+        assert cache_key(changed, y, pipe, top_n=50) != base
+        assert cache_key(X, y.replace({0: 1, 1: 0}), pipe, top_n=50) != base
+        assert cache_key(X, y, get_full_pipeline(numeric, categorical, dtype="float32"), top_n=50) != base
+        assert cache_key(X, y, pipe, top_n=40) != base
+        assert cache_key(X.copy(), y.copy(), get_full_pipeline(numeric, categorical, sparse=False), top_n=50) == base
+
+        # A third fingerprint evicts the least recently used entry (max_entries=2)
+        dense_key = miss_keys["dense"]
+        fit_preprocessing(X.head(1000), y.head(1000), numeric, categorical, sparse=False, dtype="float64",
+                          cache=cache)
+        results["cache_entries"] = len(cache.entries())
+        assert results["cache_entries"] == 2 and dense_key not in cache.entries()
+
+        # Every hit/miss is an MLflow run
+        runs = mlflow.search_runs(experiment_names=["Preprocessing Pipeline Registry"])
+        results["mlflow_runs"] = runs["tags.fit_cache"].value_counts().to_dict()
+        assert results["mlflow_runs"] == {"miss": 3, "hit": 2}, results["mlflow_runs"]
+
+    print(json.dumps(results, indent=2))
+    print("✅ Cache hits reproduce the fitted pipeline, selection and matrix; any data/config change misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# scripts/benchmark_float32.py
+
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, latency_summary, time_calls
+from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
+from src.ml.pipeline.feature_selector import FeatureSelector
+from src.ml.pipeline.pruning import prune_pipeline
+from app.utils.compiled_scorer import CompiledScorer
+
+DTYPES = ("float64", "float32")
+
+
+def measure(fn, *args) -> tuple:
+    """(result, seconds, peak traced MB). Native xgboost/lightgbm buffers aren't traced."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def models() -> dict:
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.ensemble import RandomForestClassifier
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+    return {
+        "LogisticRegression": lambda: LogisticRegression(max_iter=1000),
+        "RandomForest": lambda: RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42),
+        "XGBoost": lambda: XGBClassifier(eval_metric="logloss", n_estimators=100, learning_rate=0.1),
+        "LightGBM": lambda: LGBMClassifier(verbose=-1, n_estimators=100, learning_rate=0.1),
+    }
+
+
+def db_write(frame: pd.DataFrame) -> dict:
+    """Write `frame` to a scratch table; time, on-disk size and column types. Empty if Postgres is down."""
+    try:
+        from sqlalchemy import text
+        from src.db.db_utils import get_db_engine
+        from src.ml.data_loader.data_loader import write_dataframe
+        engine = get_db_engine()
+        table = f"bench_float_{uuid.uuid4().hex[:8]}"
+        t0 = time.perf_counter()
+        write_dataframe(frame, table, engine)
+        elapsed = time.perf_counter() - t0
+        with engine.connect() as conn:
+            size = conn.execute(text("SELECT pg_total_relation_size(:t)"), {"t": table}).scalar()
+            types = conn.execute(text(
+                "SELECT DISTINCT data_type FROM information_schema.columns WHERE table_name = :t"), {"t": table}
+            ).scalars().all()
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE "{table}"'))
+        return {"write_s": round(elapsed, 3), "table_mb": round(size / 1024 ** 2, 2), "column_types": sorted(types)}
+    except Exception as e:
+        print(f"⚠️ Skipping Postgres write: {e}")
+        return {}
+
+
+def inference_pipeline(full, selected: list):
+    """feature_engineering → preprocessing → FeatureSelector, as run_pipeline assembles it."""
+    from sklearn.pipeline import Pipeline
+    return Pipeline([
+        ("feature_engineering", full.named_steps["feature_engineering"]),
+        ("preprocessing",       full.named_steps["preprocessing"]),
+        ("feature_selection",   FeatureSelector(selected_features=selected)),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float64 vs float32 pipeline: parity, memory, training and scoring speed")
+    parser.add_argument("--rows", type=int, default=100000, help="Training rows")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    parser.add_argument("--batch-repeats", type=int, default=10)
+    args = parser.parse_args()
+
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    df = clean_columns(generate_leads(args.rows, seed=1))
+    y = df.pop("Converted")
+    numeric = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    categorical = df.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42, stratify=y)
+    batch = generate_leads(args.batch_rows, seed=3, with_target=False)
+    records = batch.head(1000).astype(object).where(batch.head(1000).notna(), None).to_dict(orient="records")
+
+    results, selected, proba = {}, None, {}
+    for dtype in DTYPES:
+        r = results[dtype] = {}
+
+        # 1) Preprocessing fit_transform
+        full = get_full_pipeline(numeric, categorical, dtype=dtype)
+        X_t, secs, peak = measure(full.fit_transform, df, y)
+        r["preprocess"] = {"s": round(secs, 2), "peak_mb": round(peak, 1), "output_mb": round(X_t.nbytes / 1024 ** 2, 1),
+                           "dtype": str(X_t.dtype)}
+
+        # 2) RFE round (RandomForest on the full matrix); float64's ranking picks the 50 features for both
+        forest = RandomForestClassifier(n_estimators=50, random_state=42)
+        _, secs, peak = measure(forest.fit, X_t, y)
+        r["rfe_round"] = {"s": round(secs, 2), "peak_mb": round(peak, 1)}
+        if selected is None:
+            selected = sorted(int(i) for i in np.argsort(forest.feature_importances_)[::-1][:50])
+        X_sel = X_t[:, selected]
+
+        # 3) Models: fit time/memory and holdout quality
+        r["models"], proba[dtype] = {}, {}
+        fitted = {}
+        for name, make in models().items():
+            model = make()
+            _, fit_s, fit_peak = measure(model.fit, X_sel[train_idx], y.iloc[train_idx])
+            p = model.predict_proba(X_sel[test_idx])[:, 1]
+            pred = (p > 0.5).astype(int)
+            proba[dtype][name] = p
+            fitted[name] = model
+            r["models"][name] = {
+                "fit_s": round(fit_s, 2), "fit_peak_mb": round(fit_peak, 1),
+                "accuracy": round(float(accuracy_score(y.iloc[test_idx], pred)), 5),
+                "f1": round(float(f1_score(y.iloc[test_idx], pred)), 5),
+                "auc": round(float(roc_auc_score(y.iloc[test_idx], p)), 5),
+            }
+
+        # 4) Batch scoring: pipeline.transform + predict_proba (XGBoost) on one batch
+        pipeline = prune_pipeline(inference_pipeline(full, selected))
+        scorer = CompiledScorer(pipeline)
+        ref = pipeline.transform(batch.head(1000))
+        assert ref.dtype == np.dtype(dtype) and np.array_equal(scorer.transform_many(records), ref, equal_nan=True)
+        score = lambda frame: fitted["XGBoost"].predict_proba(pipeline.transform(frame))
+        _, _, peak = measure(score, batch)
+        lat = latency_summary(time_calls(score, [batch] * args.batch_repeats, warmup=1))
+        r["batch_scoring"] = {"p50_ms": round(lat["p50_ms"], 1), "rows_per_s": round(args.batch_rows / lat["p50_ms"] * 1000),
+                              "peak_mb": round(peak, 1)}
+
+        # 5) Saved preprocessed features (preprocessed_train_data / user_uploaded_preprocessed)
+        names = full.named_steps["preprocessing"].get_feature_names_out()[selected]
+        r["postgres"] = db_write(pd.DataFrame(pipeline.transform(batch), columns=names))
+
+        print(f"[{dtype}] preprocess {r['preprocess']['s']:.2f}s peak {r['preprocess']['peak_mb']:.0f}MB "
+              f"out {r['preprocess']['output_mb']:.0f}MB | RFE round {r['rfe_round']['s']:.1f}s "
+              f"peak {r['rfe_round']['peak_mb']:.0f}MB | batch {r['batch_scoring']['rows_per_s']} rows/s "
+              f"peak {r['batch_scoring']['peak_mb']:.0f}MB | pg {r['postgres']}")
+        for name, m in r["models"].items():
+            print(f"    {name:18s} fit {m['fit_s']:.2f}s peak {m['fit_peak_mb']:.0f}MB  "
+                  f"acc {m['accuracy']:.4f} F1 {m['f1']:.4f} AUC {m['auc']:.4f}")
+
+    # 6) Parity: float32 vs float64 on the same holdout
+    results["parity"] = {}
+    for name in models():
+        a, b = results["float64"]["models"][name], results["float32"]["models"][name]
+        results["parity"][name] = {
+            "abs_diff_accuracy": round(abs(a["accuracy"] - b["accuracy"]), 5),
+            "abs_diff_f1": round(abs(a["f1"] - b["f1"]), 5),
+            "max_abs_diff_proba": float(np.max(np.abs(proba["float64"][name] - proba["float32"][name]))),
+            "label_agreement": float(np.mean((proba["float64"][name] > 0.5) == (proba["float32"][name] > 0.5))),
+        }
+        print(f"[parity] {name:18s} {results['parity'][name]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# scripts/benchmark_model_swap.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+import mlflow
+import mlflow.sklearn
+from mlflow.tracking import MlflowClient
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary
+from src.ml.registry.model_registry import register_and_promote, PAIRED_PREPROCESSOR_TAG
+from app.utils.model_manager import ModelManager, _mlflow_loader
+
+PREPROCESSOR_NAME = "LeadScoringPreprocessor"
+MODEL_NAME = "LeadScoringBestModel"
+
+
+def promote_model(model) -> None:
+    """Log a classifier in its own run and promote it the way train_all_models does."""
+    mlflow.set_experiment("Lead Scoring Model")
+    with mlflow.start_run(run_name="standin_model") as run:
+        mlflow.sklearn.log_model(sk_model=model, artifact_path="model")
+    register_and_promote(
+        registry_name=MODEL_NAME,
+        run_id=run.info.run_id,
+        model_uri=f"runs:/{run.info.run_id}/model",
+        is_pipeline=False
+    )
+
+
+def wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-swap check + timings against a local file-based MLflow store")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mlflow.set_tracking_uri(f"file://{tmp}/mlruns")
+
+        train_df = generate_leads(20000, seed=1)
+        pipe_v1, model_v1 = build_standin_pipeline(train_df, top_n=50, seed=1)
+        pipe_v2, model_v2 = build_standin_pipeline(train_df, top_n=40, seed=2)
+
+        # 1) Version 1 of both, promoted to Production
+        register_and_promote(PREPROCESSOR_NAME, model_object=pipe_v1, is_pipeline=True)
+        promote_model(model_v1)
+
+        manager = ModelManager(PREPROCESSOR_NAME, MODEL_NAME, poll_interval=args.poll_interval)
+        manager.load_initial()
+        manager.start()
+
+        # 2) Request threads: each call uses exactly one bundle, like predict_lead
+        requests = generate_leads(500, seed=3, with_target=False)
+        rows = [requests.iloc[[i]] for i in range(len(requests))]
+        stop = threading.Event()
+        errors, seen, latencies = [], set(), []
+
+        def client(i: int):
+            j = i
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                bundle = manager.current()
+                try:
+                    bundle.model.predict_proba(bundle.preprocessor.transform(rows[j % len(rows)]))
+                except Exception as e:
+                    errors.append(f"{bundle.versions}: {e}")
+                latencies.append(time.perf_counter() - t0)
+                seen.add(tuple(sorted(bundle.versions.items())))
+                j += args.threads
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+        for t in threads:
+            t.start()
+        time.sleep(1.0)
+
+        # 3) Promote only the new preprocessor: incompatible with model v1, must not swap
+        register_and_promote(PREPROCESSOR_NAME, model_object=pipe_v2, is_pipeline=True)
+        wait_for(lambda: manager.pending is not None, timeout=10)
+        half_promoted = manager.status()
+        assert half_promoted["active"] == {"preprocessor": "1", "model": "1"}, half_promoted
+
+        # 4) Promote the matching model: manager swaps to v2/v2 off the request path
+        promote_model(model_v2)
+        swapped = wait_for(lambda: manager.current().versions == {"preprocessor": "2", "model": "2"}, timeout=30)
+        time.sleep(1.0)
+        stop.set()
+        for t in threads:
+            t.join()
+        manager.stop()
+
+        status = manager.status()
+        assert swapped, status
+        assert not errors, errors[:5]
+
+        # 5) A load-side ValueError (not a mismatched pair) is retried on the next poll
+        failures = []
+
+        def flaky_loader(name, version):
+            if not failures:
+                failures.append(name)
+                raise ValueError("transient deserialization error")
+            return _mlflow_loader(name, version)
+
+        retried = ModelManager(PREPROCESSOR_NAME, MODEL_NAME, poll_interval=0, loader=flaky_loader)
+        assert not retried.check_for_update() and retried.pending is not None
+        assert retried.check_for_update(), retried.status()
+
+        # 6) A model tagged for another preprocessor version is refused even if the features match
+        MlflowClient().set_model_version_tag(MODEL_NAME, "2", PAIRED_PREPROCESSOR_TAG, "1")
+        mistagged = ModelManager(PREPROCESSOR_NAME, MODEL_NAME, poll_interval=0)
+        assert not mistagged.check_for_update(), mistagged.status()
+        assert mistagged.pending["versions"] == {"preprocessor": "2", "model": "2"}, mistagged.status()
+        assert "built for preprocessor v1" in mistagged.pending["error"], mistagged.status()
+
+        print(json.dumps({
+            "pending_while_half_promoted": half_promoted["pending"],
+            "active": status["active"],
+            "versions_seen_by_requests": [dict(v) for v in sorted(seen)],
+            "swaps": status["swaps"],
+            "request_latency_during_run": latency_summary(latencies),
+            "request_errors": len(errors),
+            "load_error_retried": retried.status()["active"],
+            "mistagged_pair_refused": mistagged.pending["error"],
+        }, indent=2))
+        print("✅ No request saw a mixed preprocessor/model pair")
+
+
+if __name__ == "__main__":
+    main()
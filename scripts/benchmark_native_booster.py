@@ -0,0 +1,75 @@
+# scripts/benchmark_native_booster.py
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary, time_calls
+from app.utils.compiled_scorer import CompiledScorer
+from app.utils.native_booster import NativeBoosterPredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parity and latency: sklearn-wrapper vs native booster predict_proba")
+    parser.add_argument("--single", type=int, default=3000, help="Single-lead calls timed")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    parser.add_argument("--batch-repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=1, help="Native booster threads")
+    args = parser.parse_args()
+
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+
+    candidates = {
+        # Same estimators/grids as train_utils.get_models_with_params
+        "XGBoost": XGBClassifier(eval_metric="logloss", n_estimators=100, learning_rate=0.1),
+        "LightGBM": LGBMClassifier(verbose=-1, n_estimators=100, learning_rate=0.1),
+    }
+    train_df = generate_leads(20000, seed=1)
+    leads_df = generate_leads(max(args.batch_rows, args.single), seed=3, with_target=False)
+    records = leads_df.astype(object).where(pd.notnull(leads_df), None).to_dict(orient="records")
+
+    results = {}
+    for name, estimator in candidates.items():
+        pipeline, model = build_standin_pipeline(train_df, model=estimator)
+        native = NativeBoosterPredictor(model, n_threads=args.threads)
+        X_batch = pipeline.transform(leads_df.head(args.batch_rows))
+
+        # 1) Parity on every row of the batch
+        diff = np.abs(native.predict_proba(X_batch)[:, 1] - model.predict_proba(X_batch)[:, 1])
+        assert diff.max() <= 1e-6, f"{name}: max |diff| {diff.max():.3e}"
+
+        # 2) Single lead through the compiled transform, then each predictor
+        rows = [CompiledScorer(pipeline).transform_one(r) for r in records[: args.single]]
+        single = {
+            "wrapper": latency_summary(time_calls(model.predict_proba, rows)),
+            "native": latency_summary(time_calls(native.predict_proba, rows)),
+        }
+
+        # 3) One 10k-row batch (already preprocessed)
+        batch = {
+            "wrapper": latency_summary(time_calls(model.predict_proba, [X_batch] * args.batch_repeats, warmup=2)),
+            "native": latency_summary(time_calls(native.predict_proba, [X_batch] * args.batch_repeats, warmup=2)),
+        }
+
+        results[name] = {"max_abs_diff": float(diff.max()), "single_row": single, f"batch_{args.batch_rows}": batch}
+        print(f"[{name:8s}] parity max|diff|={diff.max():.2e}  "
+              f"single p50 {single['wrapper']['p50_ms']:.3f}ms → {single['native']['p50_ms']:.3f}ms  "
+              f"{args.batch_rows}-row p50 {batch['wrapper']['p50_ms']:.1f}ms → {batch['native']['p50_ms']:.1f}ms")
+
+    print(json.dumps(results, indent=2))
+    print("✅ Native booster probabilities match the sklearn wrappers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# scripts/benchmark_predict_batch.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, standin_app_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rows/sec of /predict/batch vs looping /predict (Flask test client)")
+    parser.add_argument("--loop-rows", type=int, default=2000, help="Leads sent one by one to /predict")
+    parser.add_argument("--batch-sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Prediction cache off so every lead is really scored
+        client = standin_app_client(tmp, {"PREDICTION_CACHE": "0"})
+        from app import routes
+
+        leads_df = generate_leads(max(args.loop_rows, max(int(b) for b in args.batch_sizes.split(","))),
+                                  seed=3, with_target=False)
+        leads = leads_df.astype(object).where(pd.notnull(leads_df), None).to_dict(orient="records")
+
+        results = {}
+
+        # 1) Baseline: one /predict request per lead
+        t0 = time.perf_counter()
+        looped = [client.post("/predict", json=lead).get_json()["conversion_probability"]
+                  for lead in leads[: args.loop_rows]]
+        elapsed = time.perf_counter() - t0
+        results["loop_predict"] = {"rows": args.loop_rows, "rows_per_s": round(args.loop_rows / elapsed, 1)}
+
+        # 2) /predict/batch, row-oriented and columnar payloads
+        for size in (int(b) for b in args.batch_sizes.split(",")):
+            batch = leads[:size]
+            columnar = {col: [lead.get(col) for lead in batch] for col in leads_df.columns}
+            for layout, payload in (("rows", batch), ("columnar", columnar)):
+                timings = []
+                for _ in range(args.repeats):
+                    t0 = time.perf_counter()
+                    resp = client.post("/predict/batch?threshold=0.5", json=payload)
+                    timings.append(time.perf_counter() - t0)
+                    assert resp.status_code == 200, resp.get_json()
+                body = resp.get_json()
+                assert body["count"] == size and len(body["labels"]) == size
+                best = min(timings)
+                results[f"batch_{layout}_{size}"] = {"rows": size, "rows_per_s": round(size / best, 1),
+                                                     "ms_per_request": round(1000 * best, 2)}
+
+                # Same probabilities as scoring each lead on its own
+                n = min(size, args.loop_rows)
+                assert np.allclose(body["probabilities"][:n], looped[:n], rtol=0, atol=1e-9), layout
+
+        # 3) Leads that omit keys score the same on both sides of COMPILED_BATCH_MAX_ROWS
+        from app.utils.prediction import COMPILED_BATCH_MAX_ROWS
+        sparse_leads = [{k: v for k, v in lead.items() if i % 3 or k not in ("TotalVisits", "Lead Source")}
+                        for i, lead in enumerate(leads[: COMPILED_BATCH_MAX_ROWS + 1])]
+        compiled = client.post("/predict/batch", json=sparse_leads[:COMPILED_BATCH_MAX_ROWS])
+        pandas_path = client.post("/predict/batch", json=sparse_leads)
+        assert compiled.status_code == 200 and pandas_path.status_code == 200, compiled.get_json()
+        assert np.allclose(compiled.get_json()["probabilities"],
+                           pandas_path.get_json()["probabilities"][:COMPILED_BATCH_MAX_ROWS], rtol=0, atol=1e-9)
+
+        # 4) Limits and validation
+        too_many = [leads[0]] * (routes.PREDICT_BATCH_MAX_ROWS + 1)
+        assert client.post("/predict/batch", json=too_many).status_code == 413
+        assert client.post("/predict/batch", json={"a": [1, 2], "b": [1]}).status_code == 400
+        assert client.post("/predict/batch?threshold=2", json=leads[:2]).status_code == 400
+        assert client.post("/predict/batch", json=[]).status_code == 400
+
+        base = results["loop_predict"]["rows_per_s"]
+        for name, r in results.items():
+            print(f"[{name:22s}] {r['rows_per_s']:>11,.1f} rows/s  ({r['rows_per_s'] / base:6.1f}x loop)")
+        print(json.dumps(results, indent=2))
+        print("✅ Batch probabilities match per-lead /predict and across batch paths; size limits enforced")
+
+
+if __name__ == "__main__":
+    main()
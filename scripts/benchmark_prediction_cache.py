@@ -0,0 +1,110 @@
+# scripts/benchmark_prediction_cache.py
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary
+from app.utils.compiled_scorer import CompiledScorer
+from app.utils.prediction_cache import PredictionCache, RedisBackend, canonical_key
+
+
+def main():
+    parser = argparse.ArgumentParser(description="predict_lead latency with and without the prediction cache")
+    parser.add_argument("--distinct", type=int, default=5000, help="Distinct leads the CRM re-scores")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--zipf", type=float, default=1.2, help="Skew of how often each lead is re-scored")
+    parser.add_argument("--max-mb", type=float, default=64)
+    parser.add_argument("--pandas-requests", type=int, default=5000,
+                        help="Requests for the (slow) pipeline.transform fallback path")
+    parser.add_argument("--redis-url", help="Also measure a second worker sharing hits through Redis")
+    args = parser.parse_args()
+
+    pipeline, model = build_standin_pipeline(generate_leads(20000, seed=1))
+    scorer = CompiledScorer(pipeline, model)
+    leads_df = generate_leads(args.distinct, seed=2, with_target=False)
+    leads = leads_df.astype(object).where(pd.notnull(leads_df), None).to_dict(orient="records")
+
+    rng = np.random.default_rng(0)
+    order = (rng.zipf(args.zipf, args.requests) - 1) % args.distinct
+    # A CRM re-send carries the same attributes but a fresh sync timestamp
+    stream = [dict(leads[i], synced_at=f"t{n}") for n, i in enumerate(order)]
+
+    versions = {"preprocessor": "1", "model": "1"}
+
+    def score(record):
+        return float(model.predict_proba(scorer.transform_one(record))[0, 1])
+
+    def score_pandas(record):
+        return float(model.predict_proba(pipeline.transform(pd.DataFrame([record])))[0, 1])
+
+    def cached_score(cache, record, versions, fn=score):
+        key = canonical_key(record, versions, scorer.required_columns)
+        value = cache.get(key)
+        if value is None:
+            value = fn(record)
+            cache.set(key, value)
+        return value
+
+    def run(call, n=None) -> dict:
+        latencies = []
+        for record in stream[:n]:
+            t0 = time.perf_counter()
+            call(record)
+            latencies.append(time.perf_counter() - t0)
+        return latency_summary(latencies)
+
+    results = {"uncached": run(score)}
+    results["uncached_pandas_path"] = run(score_pandas, args.pandas_requests)
+    pandas_cache = PredictionCache()
+    results["cached_pandas_path"] = run(lambda r: cached_score(pandas_cache, r, versions, score_pandas),
+                                        args.pandas_requests)
+    results["cached_pandas_path"]["stats"] = pandas_cache.stats()
+
+    cache = PredictionCache(max_bytes=int(args.max_mb * 1024 * 1024))
+    results["cached"] = run(lambda r: cached_score(cache, r, versions))
+    results["cached"]["stats"] = cache.stats()
+
+    # Cached results must equal the uncached scorer exactly
+    for record in stream[:2000]:
+        assert cached_score(cache, record, versions) == score(record)
+
+    # A promotion changes the versions in every key: no stale hits afterwards
+    hits_before = cache.stats()["hits"]
+    cached_score(cache, stream[0], {"preprocessor": "2", "model": "2"})
+    assert cache.stats()["hits"] == hits_before, "stale hit after a version change"
+
+    # A small budget keeps the cache within bounds by evicting
+    small = PredictionCache(max_bytes=200 * 1024)
+    results["cached_200kb"] = run(lambda r: cached_score(small, r, versions))
+    results["cached_200kb"]["stats"] = small.stats()
+    assert small.stats()["bytes"] <= 200 * 1024
+
+    if args.redis_url:
+        worker_a = PredictionCache(shared=RedisBackend(args.redis_url, ttl_s=3600))
+        worker_b = PredictionCache(shared=RedisBackend(args.redis_url, ttl_s=3600))
+        for record in stream[: args.requests // 2]:
+            cached_score(worker_a, record, versions)
+        results["shared_second_worker"] = run(lambda r: cached_score(worker_b, r, versions))
+        results["shared_second_worker"]["stats"] = worker_b.stats()
+
+    for name, r in results.items():
+        stats = r.get("stats", {})
+        print(f"[{name:22s}] p50={r['p50_ms']:.4f}ms p99={r['p99_ms']:.4f}ms "
+              f"hit_ratio={stats.get('hit_ratio', 0):.2%} evictions={stats.get('evictions', 0)}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# scripts/benchmark_pruned_pipeline.py
+
+import os
+import sys
+import json
+import pickle
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, build_standin_pipeline, latency_summary, time_calls
+from src.ml.pipeline.pruning import prune_pipeline
+from app.utils.compiled_scorer import CompiledScorer
+
+
+def peak_mb(fn, *args) -> float:
+    """Peak traced allocation (MB) while running `fn(*args)`."""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 ** 2
+
+
+def shape(pipeline) -> dict:
+    preprocessing = pipeline.named_steps["preprocessing"]
+    return {
+        "raw_inputs": len(preprocessing.feature_names_in_),
+        "computed_outputs": len(preprocessing.get_feature_names_out()),
+        "selected": len(pipeline.named_steps["feature_selection"].selected_features),
+        "pickle_kb": round(len(pickle.dumps(pipeline)) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full vs selection-pruned preprocessing pipeline: parity, time, memory")
+    parser.add_argument("--train-rows", type=int, default=20000)
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    parser.add_argument("--batch-repeats", type=int, default=20)
+    parser.add_argument("--single", type=int, default=2000, help="Single-lead calls timed")
+    args = parser.parse_args()
+
+    full, _ = build_standin_pipeline(generate_leads(args.train_rows, seed=1), prune=False)
+    variants = {
+        "full": full,
+        "pruned": prune_pipeline(full, prune_categories=False),
+        "pruned_categories": prune_pipeline(full, prune_categories=True),
+    }
+    leads_df = generate_leads(max(args.batch_rows, args.single), seed=3, with_target=False)
+    batch = leads_df.head(args.batch_rows)
+
+    # 1) Identical output on every row (values and order), via sklearn and the compiled scorer
+    records = leads_df.astype(object).where(pd.notnull(leads_df), None).to_dict(orient="records")
+    compiled = {name: CompiledScorer(pipeline) for name, pipeline in variants.items()}
+    expected = full.transform(batch)
+    for name, pipeline in variants.items():
+        got = pipeline.transform(batch)
+        assert expected.shape == got.shape and np.array_equal(expected, got, equal_nan=True), f"{name} differs"
+        assert np.array_equal(compiled[name].transform_many(records[:1000]), expected[:1000], equal_nan=True)
+
+    results = {"batch_rows": args.batch_rows}
+    for name, pipeline in variants.items():
+        single_frames = [leads_df.iloc[[i]] for i in range(args.single)]
+        results[name] = {
+            **shape(pipeline),
+            f"transform_{args.batch_rows}": latency_summary(
+                time_calls(pipeline.transform, [batch] * args.batch_repeats, warmup=2)),
+            "transform_single_row": latency_summary(time_calls(pipeline.transform, single_frames)),
+            "compiled_single_row": latency_summary(time_calls(compiled[name].transform_one, records[:args.single])),
+            f"transform_{args.batch_rows}_peak_mb": round(peak_mb(pipeline.transform, batch), 1),
+        }
+        r = results[name]
+        print(f"[{name:17s}] inputs={r['raw_inputs']:3d} outputs={r['computed_outputs']:3d}  "
+              f"{args.batch_rows}-row p50 {r[f'transform_{args.batch_rows}']['p50_ms']:.1f}ms "
+              f"peak {r[f'transform_{args.batch_rows}_peak_mb']:.1f}MB  "
+              f"single p50 {r['transform_single_row']['p50_ms']:.2f}ms  "
+              f"compiled p50 {r['compiled_single_row']['p50_ms'] * 1000:.0f}µs")
+
+    print(json.dumps(results, indent=2))
+    print("✅ Pruned pipelines' output is identical to the full pipeline")
+
+
+if __name__ == "__main__":
+    main()
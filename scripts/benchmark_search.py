@@ -0,0 +1,86 @@
+# scripts/benchmark_search.py
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from sklearn.metrics import f1_score
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.benchmark_training_scheduler import training_data
+from src.ml.training.train_utils import get_models_with_params, build_search
+from src.ml.training.search import SuccessiveHalvingSearch
+
+
+def wide_grids(families: dict) -> dict:
+    """Larger grids, the kind a search that discards candidates early can afford."""
+    grids = {
+        "LogisticRegression": {"C": [0.01, 0.1, 1.0, 10, 100], "class_weight": [None, "balanced"]},
+        "RandomForest": {"n_estimators": [300], "max_depth": [None, 10, 20], "min_samples_leaf": [1, 5, 20]},
+        "GradientBoosting": {"n_estimators": [300], "learning_rate": [0.03, 0.1, 0.3], "max_depth": [2, 3, 5]},
+        "XGBoost": {"n_estimators": [500], "learning_rate": [0.03, 0.1, 0.3], "max_depth": [3, 6, 9]},
+        "LightGBM": {"n_estimators": [500], "learning_rate": [0.03, 0.1, 0.3], "num_leaves": [15, 31, 63]},
+    }
+    return {name: (model, grids[name]) for name, (model, _) in families.items() if name in grids}
+
+
+def run(name, model, grid, mode, data, **options) -> dict:
+    search = build_search(name, model, grid, n_jobs=1, mode=mode)
+    for key, value in options.items():
+        setattr(search, key, value)
+    t0 = time.perf_counter()
+    search.fit(data["X_train"], data["y_train"])
+    seconds = time.perf_counter() - t0
+    f1 = f1_score(data["y_test"], search.best_estimator_.predict(data["X_test"]))
+    result = {"seconds": round(seconds, 2), "test_f1": round(f1, 4)}
+    if isinstance(search, SuccessiveHalvingSearch):
+        result["fits"] = len(search.cv_results_["params"]) + int(search.refitted_)
+        result["budget_exhausted"] = search.budget_exhausted_
+    else:
+        result["fits"] = len(search.cv_results_["params"]) * search.cv + 1  # CV fits + refit
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid/Randomized search vs budgeted successive halving: "
+                                                 "test F1 and time per model family")
+    parser.add_argument("--rows", type=int, default=6000)
+    parser.add_argument("--budget", type=float, default=1.0, help="Budget (s) of the exhausted-budget demo")
+    args = parser.parse_args()
+
+    data = training_data(args.rows)
+    results = {"rows": args.rows, "cpu_count": os.cpu_count()}
+
+    for label, families in (("repo_grids", get_models_with_params()),
+                            ("wide_grids", wide_grids(get_models_with_params()))):
+        results[label] = {}
+        totals = {"grid": 0.0, "halving": 0.0}
+        for name, (model, grid) in families.items():
+            row = {mode: run(name, model, grid, mode, data) for mode in ("grid", "halving")}
+            results[label][name] = row
+            for mode in totals:
+                totals[mode] += row[mode]["seconds"]
+            print(f"[{label} {name:18s}] grid {row['grid']['seconds']:6.1f}s F1 {row['grid']['test_f1']:.4f} "
+                  f"({row['grid']['fits']:2d} fits) | halving {row['halving']['seconds']:6.1f}s "
+                  f"F1 {row['halving']['test_f1']:.4f} ({row['halving']['fits']:2d} fits)")
+        results[label]["total_seconds"] = {mode: round(value, 1) for mode, value in totals.items()}
+        print(f"[{label} total             ] grid {totals['grid']:6.1f}s | halving {totals['halving']:6.1f}s")
+
+    # Budget running out: the best model so far is returned, and it is usable
+    model, grid = get_models_with_params()["SVM"]
+    results["svm_budget"] = run("SVM", model, grid, "halving", data, budget_s=args.budget)
+    assert results["svm_budget"]["budget_exhausted"], results["svm_budget"]
+    print(f"[SVM with a {args.budget:.0f}s budget] {results['svm_budget']}")
+
+    print(json.dumps(results, indent=2))
+    print("✅ Successive halving returns a fitted best model within its budget")
+
+
+if __name__ == "__main__":
+    main()
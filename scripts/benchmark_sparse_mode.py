@@ -0,0 +1,160 @@
+# scripts/benchmark_sparse_mode.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.benchmark_utils import generate_leads
+from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
+from src.ml.pipeline.feature_selection import apply_feature_selection, rfe_input
+from src.ml.pipeline.feature_selector import FeatureSelector
+
+LEAD_CSV = os.path.join(PROJECT_ROOT, "uploads", "Lead_Scoring.csv")
+
+
+def load_lead_data() -> tuple:
+    """
+    The `lead_data` table, or the CSV it is loaded from when Postgres isn't reachable.
+
+    The shipped CSV has the real feature columns but almost no `Converted`
+    labels; missing labels are drawn at the dataset's ~38% conversion rate
+    (timings and memory don't depend on label signal).
+    """
+    try:
+        from src.ml.data_loader.data_loader import load_data_from_postgres
+        return load_data_from_postgres("lead_data"), "postgres:lead_data"
+    except Exception as e:
+        print(f"⚠️ lead_data unavailable ({type(e).__name__}); reading {LEAD_CSV}")
+        df = pd.read_csv(LEAD_CSV)
+        missing = df["Converted"].isna()
+        df.loc[missing, "Converted"] = (np.random.default_rng(0).random(missing.sum()) < 0.38).astype(float)
+        df["Converted"] = df["Converted"].astype(np.int64)
+        return df, "uploads/Lead_Scoring.csv"
+
+
+def nbytes(X) -> int:
+    if sparse.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return np.asarray(X).nbytes
+
+
+def measure(fn, *args) -> tuple:
+    """(result, seconds, peak traced MB). Native xgboost/lightgbm buffers aren't traced."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+
+def sparse_ready(name: str, model):
+    # Same adjustment train_utils.prepare_for_sparse makes (imported here without shap/mlflow)
+    if name == "XGBoost":
+        model.set_params(missing=0.0)
+    return model
+
+
+def models() -> dict:
+    from sklearn.linear_model import LogisticRegression
+    from xgboost import XGBClassifier
+    from lightgbm import LGBMClassifier
+    # Models that take CSR in sparse mode (train_utils.SPARSE_INPUT_MODELS), one grid point each
+    return {
+        "LogisticRegression": lambda: LogisticRegression(max_iter=1000),
+        "XGBoost": lambda: XGBClassifier(eval_metric="logloss", n_estimators=100, learning_rate=0.1),
+        "LightGBM": lambda: LGBMClassifier(verbose=-1, n_estimators=100, learning_rate=0.1),
+    }
+
+
+def run_mode(df: pd.DataFrame, sparse_mode: bool, args) -> dict:
+    y = df["Converted"]
+    X = df.drop(columns=["Converted"])
+    numeric = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    categorical = X.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+    out = {}
+
+    # 1) Preprocessing fit_transform (the ~190-wide matrix RFE works on)
+    full = get_full_pipeline(numeric, categorical, sparse=sparse_mode)
+    X_t, secs, peak = measure(full.fit_transform, X, y)
+    out["preprocess_fit_transform"] = {"s": round(secs, 3), "peak_mb": round(peak, 1),
+                                       "shape": list(X_t.shape), "output_mb": round(nbytes(X_t) / 1024 ** 2, 2)}
+
+    # 2) RFE: one elimination round (RandomForest fit, as in apply_feature_selection) or the full run
+    if args.full_rfe:
+        (_, _), secs, peak = measure(apply_feature_selection, X_t, y)
+        out["rfe_full"] = {"s": round(secs, 2), "peak_mb": round(peak, 1)}
+    else:
+        from sklearn.ensemble import RandomForestClassifier
+        forest = RandomForestClassifier(n_estimators=args.rfe_trees, random_state=42)
+        _, secs, peak = measure(lambda: forest.fit(rfe_input(X_t), y))
+        out["rfe_round"] = {"s": round(secs, 2), "peak_mb": round(peak, 1)}
+
+    # 3) Inference transform (feature engineering → preprocessing → FeatureSelector);
+    #    a fixed spread of 50 columns so both modes score the same features
+    selected = [int(i) for i in np.linspace(0, X_t.shape[1] - 1, min(50, X_t.shape[1])).round()]
+    selector = FeatureSelector(selected_features=selected)
+    X_sel = selector.transform(X_t)
+    batch = X.head(args.batch_rows)
+    inference = lambda frame: selector.transform(full.transform(frame))
+    inference(batch)
+    _, secs, peak = measure(inference, batch)
+    out[f"transform_{len(batch)}"] = {"s": round(secs, 3), "peak_mb": round(peak, 1),
+                                      "output_mb": round(nbytes(inference(batch)) / 1024 ** 2, 2)}
+
+    # 4) Model fit + predict_proba on the selected features
+    for name, make in models().items():
+        model = sparse_ready(name, make()) if sparse_mode else make()
+        _, fit_s, fit_peak = measure(model.fit, X_sel, y)
+        _, pred_s, _ = measure(model.predict_proba, X_sel)
+        out[name] = {"fit_s": round(fit_s, 2), "fit_peak_mb": round(fit_peak, 1), "predict_proba_s": round(pred_s, 3)}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs sparse preprocessing: memory and fit/transform time")
+    parser.add_argument("--scale", type=int, default=10, help="Synthetic scale-up factor over lead_data")
+    parser.add_argument("--rfe-trees", type=int, default=100)
+    parser.add_argument("--full-rfe", action="store_true", help="Run the whole RFE instead of one round")
+    parser.add_argument("--batch-rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    lead_data, source = load_lead_data()
+    datasets = {
+        source: lead_data,
+        f"synthetic_x{args.scale}": generate_leads(args.scale * len(lead_data), seed=1),
+    }
+
+    results = {}
+    for name, df in datasets.items():
+        df = clean_columns(df)
+        results[name] = {"rows": len(df)}
+        for mode in ("dense", "sparse"):
+            r = results[name][mode] = run_mode(df, mode == "sparse", args)
+            rfe = r.get("rfe_full") or r["rfe_round"]
+            pre = r["preprocess_fit_transform"]
+            print(f"[{name:26s} {mode:6s}] preprocess {pre['s']:.2f}s peak {pre['peak_mb']:.0f}MB "
+                  f"out {pre['output_mb']:.1f}MB | RFE {rfe['s']:.1f}s | "
+                  + " ".join(f"{m} fit {r[m]['fit_s']:.2f}s" for m in models()))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# scripts/benchmark_table_loading.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# ─────────────────────────────────────────────
+# Ensure project root is on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.db.db_utils import get_db_engine
+from src.ml.data_loader.data_loader import write_dataframe, load_data_from_postgres
+
+TABLE = "bench_user_uploaded_preprocessed"
+
+# What each measured process loads (run in a fresh interpreter for a clean peak RSS)
+MODES = {
+    "select_star": None,  # previous implementation: one pd.read_sql("SELECT * ...")
+    "streamed": {},
+    "streamed_float32": {"float_dtype": "float32"},
+    "projected_10_float32": {"columns": [f"f{i}" for i in range(10)], "float_dtype": "float32"},
+    "sampled_10pct_float32": {"sample_percent": 10, "float_dtype": "float32"},
+}
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def create_table(rows: int, cols: int, block: int = 250_000) -> None:
+    """Preprocessed-feature-shaped table: `cols` float columns (like user_uploaded_preprocessed)."""
+    engine = get_db_engine()
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        df = pd.DataFrame(rng.standard_normal((n, cols)), columns=[f"f{i}" for i in range(cols)])
+        write_dataframe(df, TABLE, engine, if_exists="replace" if start == 0 else "append")
+        print(f"[INFO] wrote {start + n:,}/{rows:,} rows", flush=True)
+
+
+def run_worker(mode: str) -> dict:
+    baseline = peak_rss_mb()
+    t0 = time.perf_counter()
+    if MODES[mode] is None:
+        with get_db_engine().connect() as conn:
+            df = pd.read_sql(f"SELECT * FROM {TABLE}", conn)
+    else:
+        df = load_data_from_postgres(TABLE, **MODES[mode])
+    elapsed = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "rows": len(df),
+        "columns": df.shape[1],
+        "seconds": round(elapsed, 2),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 1024 / 1024, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_over_baseline_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of full vs streamed/projected/sampled table loads (needs DB_* env)")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--reuse", action="store_true", help="Keep an existing benchmark table")
+    parser.add_argument("--keep", action="store_true", help="Don't drop the table afterwards")
+    parser.add_argument("--worker", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker)))
+        return
+
+    if not args.reuse:
+        create_table(args.rows, args.cols)
+
+    results = []
+    for mode in MODES:
+        proc = subprocess.run([sys.executable, __file__, "--worker", mode], capture_output=True, text=True)
+        if proc.returncode != 0:
+            # SIGKILL here is almost always the OOM killer
+            results.append({"mode": mode, "error": f"worker exited with {proc.returncode}"})
+            print(f"[{mode:22s}] failed: exit code {proc.returncode} (-9 = killed, likely out of memory)")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"[{mode:22s}] {result['rows']:>9,} rows x {result['columns']:>3} cols  "
+              f"{result['seconds']:6.1f}s  frame {result['frame_mb']:7.1f}MB  "
+              f"peak RSS {result['peak_rss_mb']:7.1f}MB (+{result['peak_rss_over_baseline_mb']:.0f}MB)")
+
+    if not args.keep:
+        with get_db_engine().begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# scripts/benchmark_upload_jobs.py
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from scripts.benchmark_utils import generate_leads, standin_app_client, latency_summary
+
+
+def upload(client, csv_bytes: bytes, mode: str):
+    return client.post(f"/upload?mode={mode}", data={"file": (io.BytesIO(csv_bytes), "leads.csv")},
+                       content_type="multipart/form-data")
+
+
+def wait_for(client, job_id: str, poll_s: float = 0.05) -> dict:
+    """Poll /jobs/<id> until the job finishes; returns the final status and the number of polls."""
+    polls = 0
+    while True:
+        status = client.get(f"/jobs/{job_id}").get_json()
+        polls += 1
+        if status["state"] in ("succeeded", "failed"):
+            status["polls"] = polls
+            return status
+        time.sleep(poll_s)
+
+
+def predict_latencies(client, records: list, background=None) -> dict:
+    """
+    Sequential /predict calls, optionally while `background()` runs in another
+    thread; calls continue until it returns.
+    """
+    samples, done = [], threading.Event()
+    thread = None
+    if background is not None:
+        thread = threading.Thread(target=lambda: (background(), done.set()))
+        thread.start()
+        time.sleep(0.05)
+    i = 0
+    while (thread is not None and not done.is_set()) or (thread is None and i < len(records)):
+        t0 = time.perf_counter()
+        response = client.post("/predict", json=records[i % len(records)])
+        samples.append(time.perf_counter() - t0)
+        assert response.status_code == 200, response.get_json()
+        i += 1
+    if thread is not None:
+        thread.join()
+    return latency_summary(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronous vs async /upload: response time, job time, "
+                                                 "/predict latency under bulk load")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--predict-calls", type=int, default=300)
+    args = parser.parse_args()
+
+    leads = generate_leads(args.rows, seed=5, with_target=False)
+    csv_bytes = leads.to_csv(index=False).encode()
+    sample = generate_leads(500, seed=6, with_target=False)
+    records = sample.astype(object).where(pd.notnull(sample), None).to_dict(orient="records")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = standin_app_client(tmp, {
+            "PREDICTION_CACHE": "0", "UPLOAD_DIR": tmp, "UPLOAD_JOB_DIR": os.path.join(tmp, "jobs"),
+            "UPLOAD_JOB_WORKERS": "1", "UPLOAD_JOB_MAX_QUEUED": "2",
+        })
+        from app import routes
+        from app.utils.jobs import UploadJobs
+        results = {"rows": args.rows, "file_mb": round(len(csv_bytes) / 1024 ** 2, 1)}
+
+        # 1) Synchronous upload: the client waits for the whole ingest
+        t0 = time.perf_counter()
+        response = upload(client, csv_bytes, "buffered")
+        results["sync_response_s"] = round(time.perf_counter() - t0, 2)
+        assert response.status_code == 200, response.get_json()
+        sync_predictions = [row["prediction"] for row in response.get_json()["predictions"]]
+
+        # 2) Async upload: 202 right away, then poll and download the same predictions
+        t0 = time.perf_counter()
+        response = upload(client, csv_bytes, "async")
+        results["async_response_s"] = round(time.perf_counter() - t0, 3)
+        assert response.status_code == 202, response.get_json()
+        job = response.get_json()
+        status = wait_for(client, job["job_id"])
+        results["async_job_s"] = round(status["finished_at"] - status["submitted_at"], 2)
+        results["async_polls"] = status["polls"]
+        assert status["state"] == "succeeded", status
+        download = client.get(job["result_url"])
+        scored = pd.read_csv(io.BytesIO(download.data))
+        assert len(scored) == args.rows and scored["prediction"].tolist() == sync_predictions
+        assert scored.drop(columns=["prediction"]).shape == leads.shape
+
+        # 3) Bounded queue: 1 running + 2 queued per worker, the next submission gets 503
+        small = leads.head(20000).to_csv(index=False).encode()
+        codes = [upload(client, small, "async").status_code for _ in range(4)]
+        results["burst_status_codes"] = codes
+        assert codes == [202, 202, 202, 503], codes
+        while routes.upload_jobs.stats()["running"] or routes.upload_jobs.stats()["queued"]:
+            time.sleep(0.1)
+
+        # 4) /predict latency: idle, beside a synchronous upload, beside async jobs at nice 0 / 10
+        job_seconds = {}
+
+        def run_job():
+            status = wait_for(client, upload(client, csv_bytes, "async").get_json()["job_id"], poll_s=0.5)
+            assert status["state"] == "succeeded", status
+            job_seconds[routes.upload_jobs.nice] = round(status["finished_at"] - status["started_at"], 2)
+
+        results["predict_idle"] = predict_latencies(client, records[:args.predict_calls])
+        results["predict_during_sync_upload"] = predict_latencies(client, records,
+                                                                  lambda: upload(client, csv_bytes, "buffered"))
+        for nice in (0, 10):
+            routes.upload_jobs.close()
+            routes.upload_jobs = UploadJobs(routes._run_upload_job, root=os.path.join(tmp, "jobs"),
+                                            max_workers=1, max_queued=2, nice=nice)
+            results[f"predict_during_async_job_nice{nice}"] = predict_latencies(client, records, run_job)
+            results[f"async_job_nice{nice}_s"] = job_seconds[nice]
+
+        for key in [k for k in results if k.startswith("predict_")]:
+            r = results[key]
+            print(f"[{key:34s}] n={r['count']:5d} p50 {r['p50_ms']:7.1f}ms p95 {r['p95_ms']:7.1f}ms "
+                  f"p99 {r['p99_ms']:7.1f}ms")
+        print(f"[upload {results['rows']} rows / {results['file_mb']}MB] sync response {results['sync_response_s']}s, "
+              f"async response {results['async_response_s']}s (job {results['async_job_s']}s; beside /predict "
+              f"traffic {results['async_job_nice0_s']}s at nice 0, {results['async_job_nice10_s']}s at nice 10)")
+        print(json.dumps(results, indent=2))
+        print("✅ Async job result matches the synchronous upload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# scripts/benchmark_utils.py
+
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ─────────────────────────────────────────────
+# Ensure project root is on PYTHONPATH so local modules can be imported
+# ─────────────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
+from src.ml.pipeline.feature_selector import FeatureSelector
+from src.ml.pipeline.pruning import prune_pipeline
+
+SCHEMA_PATH = os.path.join(PROJECT_ROOT, "lead_data_schema.txt")
+
+# ─────────────────────────────────────────────
+# Category vocabularies and rough frequencies observed in `lead_data`
+# (None = NULL in Postgres)
+# ─────────────────────────────────────────────
+_NO = {"No": 1.0}
+CATEGORY_VOCAB: Dict[str, Dict[Optional[str], float]] = {
+    "Lead Origin": {"Landing Page Submission": .53, "API": .39, "Lead Add Form": .075, "Lead Import": .005},
+    "Lead Source": {"Google": .31, "Direct Traffic": .28, "Olark Chat": .19, "Organic Search": .12,
+                    "Reference": .06, "Welingak Website": .015, "Referral Sites": .013, "Facebook": .006, None: .006},
+    "Do Not Email": {"No": .92, "Yes": .08},
+    "Do Not Call": {"No": .999, "Yes": .001},
+    "Last Activity": {"Email Opened": .37, "SMS Sent": .30, "Olark Chat Conversation": .11,
+                      "Page Visited on Website": .07, "Converted to Lead": .05, "Email Bounced": .035,
+                      "Email Link Clicked": .03, "Form Submitted on Website": .013, "Unreachable": .01,
+                      "Unsubscribed": .007, None: .008},
+    "Country": {"India": .70, None: .27, "United States": .01, "United Arab Emirates": .01, "Singapore": .01},
+    "Specialization": {"Select": .21, None: .16, "Finance Management": .11, "Human Resource Management": .09,
+                       "Marketing Management": .09, "Operations Management": .05, "Business Administration": .04,
+                       "IT Projects Management": .04, "Supply Chain Management": .04,
+                       "Banking, Investment And Insurance": .04, "Travel and Tourism": .02,
+                       "Media and Advertising": .02, "International Business": .02, "Healthcare Management": .02,
+                       "Hospitality Management": .01, "E-COMMERCE": .01, "Retail Management": .01,
+                       "Rural and Agribusiness": .01, "E-Business": .005, "Services Excellence": .005},
+    "How did you hear about X Education": {"Select": .55, None: .24, "Online Search": .09, "Word Of Mouth": .04,
+                                           "Student of SomeSchool": .03, "Other": .02, "Multiple Sources": .01,
+                                           "Advertisements": .01, "Social Media": .01},
+    "What is your current occupation": {"Unemployed": .61, None: .29, "Working Professional": .07,
+                                        "Student": .02, "Other": .005, "Housewife": .003, "Businessman": .002},
+    "What matters most to you in choosing a course": {"Better Career Prospects": .71, None: .29},
+    "Search": _NO, "Magazine": _NO, "Newspaper Article": _NO, "X Education Forums": _NO,
+    "Newspaper": _NO, "Digital Advertisement": _NO, "Through Recommendations": _NO,
+    "Receive More Updates About Our Courses": _NO, "Update me on Supply Chain Content": _NO,
+    "Get updates on DM Content": _NO, "I agree to pay the amount through cheque": _NO,
+    "Tags": {None: .36, "Will revert after reading the email": .22, "Ringing": .13,
+             "Interested in other courses": .055, "Already a student": .05, "Closed by Horizzon": .04,
+             "switched off": .026, "Busy": .02, "Lost to EINS": .019, "Not doing further education": .016,
+             "Interested  in full time MBA": .013, "Graduation in progress": .012, "invalid number": .009,
+             "Diploma holder (Not Eligible)": .007, "wrong number given": .005, "opp hangup": .003},
+    "Lead Quality": {None: .52, "Might be": .17, "Not Sure": .12, "High in Relevance": .07,
+                     "Worst": .06, "Low in Relevance": .06},
+    "Lead Profile": {"Select": .45, None: .29, "Potential Lead": .17, "Other Leads": .05,
+                     "Student of SomeSchool": .026, "Lateral Student": .014},
+    "City": {"Mumbai": .35, "Select": .24, None: .15, "Thane & Outskirts": .08, "Other Cities": .07,
+             "Other Cities of Maharashtra": .05, "Other Metro Cities": .04, "Tier II Cities": .02},
+    "Asymmetrique Activity Index": {"02.Medium": .42, "01.High": .09, "03.Low": .04, None: .45},
+    "Asymmetrique Profile Index": {"02.Medium": .30, "01.High": .24, "03.Low": .01, None: .45},
+    "A free copy of Mastering The Interview": {"No": .69, "Yes": .31},
+    "Last Notable Activity": {"Modified": .37, "Email Opened": .31, "SMS Sent": .24,
+                              "Page Visited on Website": .03, "Olark Chat Conversation": .02,
+                              "Email Link Clicked": .02, "Email Bounced": .01},
+}
+
+
+def read_schema(path: str = SCHEMA_PATH) -> Dict[str, str]:
+    """
+    Parse the `\\d lead_data` dump in lead_data_schema.txt.
+
+    Returns:
+        dict: Column name → Postgres type (e.g. 'text', 'bigint', 'double precision').
+    """
+    schema = {}
+    with open(path, "r") as f:
+        for line in f:
+            parts = [p.strip() for p in line.split("|")]
+            if len(parts) < 2 or not parts[0] or parts[0] == "Column" or set(parts[0]) <= {"-", "+"}:
+                continue
+            schema[parts[0]] = parts[1]
+    return schema
+
+
+def _choice(rng: np.random.Generator, vocab: Dict[Optional[str], float], n: int) -> np.ndarray:
+    values = list(vocab.keys())
+    probs = np.array(list(vocab.values()), dtype=float)
+    idx = rng.choice(len(values), size=n, p=probs / probs.sum())
+    return np.array(values, dtype=object)[idx]
+
+
+def generate_leads(n: int, seed: int = 42, with_target: bool = True) -> pd.DataFrame:
+    """
+    Generate `n` synthetic leads following the `lead_data` schema, dtypes,
+    vocabularies and missing-value rates.
+
+    Args:
+        n (int): Number of rows.
+        seed (int): Random seed.
+        with_target (bool): Include the 'Converted' label.
+
+    Returns:
+        pd.DataFrame: Rows shaped like `SELECT * FROM lead_data`.
+    """
+    rng = np.random.default_rng(seed)
+    schema = read_schema()
+    data = {}
+
+    visits = rng.geometric(0.3, n).astype(float) - 1
+    visits[rng.random(n) < 0.015] = np.nan
+    time_spent = np.where(rng.random(n) < 0.24, 0, rng.gamma(1.6, 420, n)).astype(np.int64)
+    page_views = np.round(np.where(visits > 0, rng.gamma(2.0, 1.2, n), 0), 2)
+    activity = np.clip(np.round(rng.normal(14.3, 1.4, n)), 7, 18)
+    profile = np.clip(np.round(rng.normal(16.3, 1.8, n)), 11, 20)
+    asym_missing = rng.random(n) < 0.45
+    activity[asym_missing] = np.nan
+    profile[asym_missing] = np.nan
+
+    numeric = {
+        "Lead Number": 579533 + rng.permutation(n * 10)[:n],
+        "TotalVisits": visits,
+        "Total Time Spent on Website": time_spent,
+        "Page Views Per Visit": page_views,
+        "Asymmetrique Activity Score": activity,
+        "Asymmetrique Profile Score": profile,
+    }
+
+    for col, pg_type in schema.items():
+        if col == "Prospect ID":
+            data[col] = [str(uuid.UUID(int=int(x))) for x in rng.integers(0, 2**63, n)]
+        elif col == "Converted":
+            continue
+        elif col in numeric:
+            data[col] = numeric[col]
+        elif pg_type == "text":
+            data[col] = _choice(rng, CATEGORY_VOCAB.get(col, _NO), n)
+        else:
+            data[col] = rng.random(n)
+
+    df = pd.DataFrame(data, columns=[c for c in schema if c in data or c == "Converted"])
+
+    if with_target:
+        logit = (
+            -1.2
+            + 0.0018 * time_spent
+            + 2.5 * (df["Tags"] == "Will revert after reading the email")
+            + 2.0 * (df["Lead Origin"] == "Lead Add Form")
+            - 1.5 * (df["Tags"] == "Ringing")
+            + 1.0 * (df["What is your current occupation"] == "Working Professional")
+            - 0.8 * (df["Do Not Email"] == "Yes")
+        )
+        proba = 1.0 / (1.0 + np.exp(-logit.astype(float)))
+        df["Converted"] = (rng.random(n) < proba).astype(np.int64)
+    else:
+        df = df.drop(columns=["Converted"])
+    return df
+
+
+def build_standin_pipeline(df: pd.DataFrame, target_col: str = "Converted", top_n: int = 50,
+                           model=None, seed: int = 42, prune: bool = True):
+    """
+    Fit a local stand-in for the registered LeadScoringPreprocessor + best model,
+    built from the same pipeline code as `run_pipeline`.
+
+    Feature selection uses a single random-forest importance ranking instead of
+    the full RFE so benchmarks start in seconds; the resulting pipeline has the
+    same structure as the production one.
+
+    Args:
+        df (pd.DataFrame): Raw rows including `target_col`.
+        target_col (str): Label column.
+        top_n (int): Number of selected features.
+        model: Unfitted classifier (defaults to LogisticRegression).
+        seed (int): Random seed.
+        prune (bool): Prune the pipeline to the selected features' inputs, as
+            `run_pipeline` does.
+
+    Returns:
+        Tuple[Pipeline, classifier]: Fitted preprocessing pipeline and model.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    df = clean_columns(df)
+    y = df[target_col]
+    X = df.drop(columns=[target_col])
+    numeric_features = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    categorical_features = X.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
+
+    full_pipeline = get_full_pipeline(numeric_features, categorical_features)
+    X_transformed = full_pipeline.fit_transform(X, y)
+
+    forest = RandomForestClassifier(n_estimators=50, random_state=seed, n_jobs=-1)
+    forest.fit(X_transformed, y)
+    top_n = min(top_n, X_transformed.shape[1])
+    selected = sorted(int(i) for i in np.argsort(forest.feature_importances_)[::-1][:top_n])
+
+    final_pipeline = Pipeline([
+        ("feature_engineering", full_pipeline.named_steps["feature_engineering"]),
+        ("preprocessing",       full_pipeline.named_steps["preprocessing"]),
+        ("feature_selection",   FeatureSelector(selected_features=selected)),
+    ])
+    if prune:
+        final_pipeline = prune_pipeline(final_pipeline, X_check=X.head(2000))
+
+    model = model if model is not None else LogisticRegression(max_iter=1000)
+    model.fit(X_transformed[:, selected], y)
+    return final_pipeline, model
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """
+    Summarize per-call latencies given in seconds.
+
+    Returns:
+        dict: count, mean and p50/p95/p99/max in milliseconds.
+    """
+    arr = np.asarray(samples, dtype=float) * 1000.0
+    if arr.size == 0:
+        return {"count": 0}
+    return {
+        "count": int(arr.size),
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "max_ms": float(arr.max()),
+    }
+
+
+def time_calls(fn, args_list: list, warmup: int = 50) -> List[float]:
+    """
+    Call `fn(arg)` for each argument and return per-call wall times (seconds).
+    """
+    for arg in args_list[:warmup]:
+        fn(arg)
+    samples = []
+    for arg in args_list:
+        t0 = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def register_standin(tmp: str, model=None) -> Dict[str, str]:
+    """
+    Register a stand-in pipeline/model pair as Production in a file-based MLflow
+    store under `tmp`.
+
+    Returns:
+        dict: Environment that points the app at that store.
+    """
+    import mlflow
+    from scripts.benchmark_model_swap import PREPROCESSOR_NAME, promote_model
+    from src.ml.registry.model_registry import register_and_promote
+
+    tracking_uri = f"file://{tmp}/mlruns"
+    mlflow.set_tracking_uri(tracking_uri)
+    pipeline, model = build_standin_pipeline(generate_leads(20000, seed=1), model=model)
+    register_and_promote(PREPROCESSOR_NAME, model_object=pipeline, is_pipeline=True)
+    promote_model(model)
+    return {
+        "MLFLOW_TRACKING_URI": tracking_uri,
+        "MODEL_CACHE_DIR": os.path.join(tmp, "cache"),
+        "MODEL_POLL_INTERVAL_SECONDS": "0",
+    }
+
+
+def standin_app(tmp: str, env: Optional[Dict[str, str]] = None):
+    """
+    Register the stand-in pair (see `register_standin`), point the app at it
+    and return `create_app()`.
+
+    The app reads its settings at import, so this must run before anything
+    imports `app.routes`. `env` overrides the defaults.
+    """
+    os.environ.update({**register_standin(tmp), **(env or {})})
+    sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+    from app import create_app
+    return create_app()
+
+
+def standin_app_client(tmp: str, env: Optional[Dict[str, str]] = None):
+    """Flask test client for `standin_app(tmp, env)`."""
+    return standin_app(tmp, env).test_client()
@@ -0,0 +1,150 @@
+# scripts/benchmark_workers.py
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+import requests
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from scripts.benchmark_utils import register_standin
+from scripts.load_test import build_payloads, run_load, summarize
+
+CONF = os.path.join(PROJECT_ROOT, "src", "app", "gunicorn.conf.py")
+
+# Memory layouts compared at a fixed worker count
+LAYOUTS = {
+    "no_preload": {"GUNICORN_PRELOAD": "0"},                           # every worker loads its own copy
+    "preload": {"GUNICORN_PRELOAD": "1", "GUNICORN_GC_FREEZE": "0"},
+    "preload_gc_freeze": {"GUNICORN_PRELOAD": "1", "GUNICORN_GC_FREEZE": "1"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid: int) -> dict:
+    """Rss/Pss/private (USS) in MB from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024.0
+    return {
+        "rss_mb": round(fields.get("Rss", 0), 1),
+        "pss_mb": round(fields.get("Pss", 0), 1),
+        "uss_mb": round(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0), 1),
+    }
+
+
+def worker_pids(master: int) -> list:
+    out = subprocess.run(["ps", "-o", "pid=", "--ppid", str(master)], capture_output=True, text=True).stdout
+    return [int(p) for p in out.split()]
+
+
+def start_gunicorn(env: dict, workers: int) -> tuple:
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", CONF, "app.wsgi:app"],
+        env={**os.environ, **env, "WEB_CONCURRENCY": str(workers), "GUNICORN_BIND": f"127.0.0.1:{port}"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/models/status", timeout=2).ok and len(worker_pids(proc.pid)) == workers:
+                return proc, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    proc.kill()
+    raise RuntimeError("❌ gunicorn did not come up")
+
+
+def stop(proc) -> None:
+    proc.send_signal(signal.SIGTERM)
+    proc.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory (preload/gc.freeze) and throughput vs gunicorn workers")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--memory-workers", type=int, default=4, help="Worker count for the memory comparison")
+    parser.add_argument("--trees", type=int, default=300, help="Stand-in RandomForest size (model memory)")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency-per-worker", type=int, default=2)
+    args = parser.parse_args()
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    results = {"cpu_count": os.cpu_count(), "memory": {}, "throughput": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**register_standin(tmp, model=RandomForestClassifier(n_estimators=args.trees, random_state=0)),
+               "PREDICTION_CACHE": "0"}
+
+        # 1) Memory: same traffic, three layouts
+        load_args = SimpleNamespace(distinct_leads=5000, batch_rows=100, upload_rows=10, seed=7,
+                                    mix={"predict": 1.0}, requests=0, rate=0.0, warmup=1.0,
+                                    duration=5.0, timeout=60.0, concurrency=2 * args.memory_workers)
+        payloads = build_payloads(load_args)
+        for name, layout in LAYOUTS.items():
+            proc, url = start_gunicorn({**env, **layout}, args.memory_workers)
+            try:
+                run_load(url, load_args, payloads)  # touch the serving path in every worker
+                per_worker = [smaps(pid) for pid in worker_pids(proc.pid)]
+                master = smaps(proc.pid)
+            finally:
+                stop(proc)
+            n = len(per_worker)
+            results["memory"][name] = {
+                "workers": n,
+                "master": master,
+                "worker_mean_rss_mb": round(sum(w["rss_mb"] for w in per_worker) / n, 1),
+                "worker_mean_pss_mb": round(sum(w["pss_mb"] for w in per_worker) / n, 1),
+                "worker_mean_uss_mb": round(sum(w["uss_mb"] for w in per_worker) / n, 1),
+                "total_pss_mb": round(master["pss_mb"] + sum(w["pss_mb"] for w in per_worker), 1),
+            }
+            r = results["memory"][name]
+            print(f"[{name:18s}] per worker: RSS {r['worker_mean_rss_mb']:7.1f}MB  PSS {r['worker_mean_pss_mb']:7.1f}MB  "
+                  f"private {r['worker_mean_uss_mb']:7.1f}MB   total PSS {r['total_pss_mb']:7.1f}MB")
+
+        # 2) Throughput vs worker count (preload + gc.freeze)
+        for workers in (int(w) for w in args.workers.split(",")):
+            proc, url = start_gunicorn({**env, **LAYOUTS["preload_gc_freeze"]}, workers)
+            try:
+                load_args.concurrency = args.concurrency_per_worker * workers
+                load_args.duration = args.duration
+                report = summarize(run_load(url, load_args, payloads), load_args.warmup)["all"]
+            finally:
+                stop(proc)
+            results["throughput"][workers] = {
+                "throughput_rps": report["throughput_rps"],
+                "latency_ms": report["latency_ms"],
+                "error_rate": report["error_rate"],
+            }
+            print(f"[{workers} worker(s)] {report['throughput_rps']:8.1f} req/s  "
+                  f"p50={report['latency_ms']['p50']:.2f}ms p99={report['latency_ms']['p99']:.2f}ms")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
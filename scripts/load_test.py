@@ -0,0 +1,305 @@
+# scripts/load_test.py
+"""
+HTTP load test for the scoring service.
+
+By default starts the app (`create_app()` against a locally trained stand-in
+model registered in a temporary MLflow store) in a separate server process,
+then drives /predict, /predict/batch and /upload with schema-shaped leads at
+a fixed concurrency, either as fast as possible (closed loop) or at a target
+request rate (open loop). Results are written as JSON so runs can be compared
+across commits.
+
+Examples:
+    python scripts/load_test.py --duration 30 --concurrency 8
+    python scripts/load_test.py --rate 200 --mix predict=0.9,upload=0.1 --output run.json
+    python scripts/load_test.py --url http://127.0.0.1:5001 --duration 60
+
+/upload persists raw rows, so it needs the DB_* environment of a reachable
+Postgres; without one those requests count as errors.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+# ─────────────────────────────────────────────
+# Ensure project root and src/ are on PYTHONPATH
+# ─────────────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "src"))
+
+from scripts.benchmark_utils import generate_leads
+
+ENDPOINTS = ("predict", "predict_batch", "upload")
+
+
+# ─────────────────────────────────────────────
+# Server side (runs in its own process)
+# ─────────────────────────────────────────────
+def serve(port: int, threads: bool) -> None:
+    """Serve the stand-in app with werkzeug and announce the bound port on stdout."""
+    from werkzeug.serving import make_server
+    from scripts.benchmark_utils import standin_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = standin_app(tmp)
+        server = make_server("127.0.0.1", port, app, threaded=threads)
+        print(f"READY {server.port}", flush=True)
+        server.serve_forever()
+
+
+def start_server(args) -> tuple:
+    """Launch `serve` in a child process; returns (process, base_url)."""
+    cmd = [sys.executable, __file__, "--serve", "--port", str(args.port)]
+    if args.single_threaded:
+        cmd.append("--single-threaded")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    deadline = time.monotonic() + args.startup_timeout
+    for line in proc.stdout:
+        if line.startswith("READY "):
+            # Keep draining the server's log output so a full pipe never blocks it
+            threading.Thread(target=lambda: [None for _ in proc.stdout], daemon=True).start()
+            return proc, f"http://127.0.0.1:{int(line.split()[1])}"
+        if time.monotonic() > deadline:
+            break
+    proc.kill()
+    raise RuntimeError("❌ Server process did not become ready")
+
+
+# ─────────────────────────────────────────────
+# Client side
+# ─────────────────────────────────────────────
+def parse_mix(spec: str) -> dict:
+    """'predict=0.9,upload=0.1' → normalized weights per endpoint."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items() if w > 0}
+
+
+def build_payloads(args) -> dict:
+    """Pre-generate request bodies so the client spends its time sending, not building."""
+    leads_df = generate_leads(args.distinct_leads, seed=args.seed, with_target=False)
+    leads = leads_df.astype(object).where(pd.notnull(leads_df), None).to_dict(orient="records")
+    batch_df = generate_leads(args.batch_rows, seed=args.seed + 1, with_target=False)
+    upload_df = generate_leads(args.upload_rows, seed=args.seed + 2, with_target=False)
+    return {
+        "predict": leads,
+        "predict_batch": batch_df.astype(object).where(pd.notnull(batch_df), None).to_dict(orient="records"),
+        "upload": upload_df.to_csv(index=False).encode("utf-8"),
+    }
+
+
+def send(session: requests.Session, base_url: str, endpoint: str, payloads: dict, i: int, timeout: float):
+    """Issue one request; returns the HTTP status code."""
+    if endpoint == "predict":
+        lead = payloads["predict"][i % len(payloads["predict"])]
+        resp = session.post(f"{base_url}/predict", json=lead, timeout=timeout)
+    elif endpoint == "predict_batch":
+        resp = session.post(f"{base_url}/predict/batch", json=payloads["predict_batch"], timeout=timeout)
+    else:
+        files = {"file": ("leads.csv", payloads["upload"], "text/csv")}
+        resp = session.post(f"{base_url}/upload", files=files, timeout=timeout)
+    resp.content  # read the full (possibly streamed) body
+    ok = resp.status_code < 400
+    if ok and endpoint == "predict":
+        ok = "error" not in resp.json()  # /predict reports scoring failures in a 200 body
+    return resp.status_code, ok
+
+
+def run_load(base_url: str, args, payloads: dict) -> list:
+    """
+    Drive the server from `args.concurrency` threads.
+
+    Open loop (--rate > 0): request i is due at start + i/rate and its latency
+    is measured from that due time, so server-side queueing is not hidden by
+    a stalled client. Closed loop (--rate 0): each thread sends back to back.
+
+    Returns:
+        list: (endpoint, due_offset_s, latency_s, status, ok) per request.
+    """
+    mix = args.mix
+    names, weights = list(mix), np.array(list(mix.values()))
+    rng = np.random.default_rng(args.seed)
+    max_requests = args.requests or 10 ** 9
+    plan = rng.choice(len(names), size=min(max_requests, 1_000_000), p=weights)
+
+    counter = iter(range(max_requests))
+    counter_lock = threading.Lock()
+    results, results_lock = [], threading.Lock()
+    start = time.perf_counter() + 0.1
+    end = start + args.warmup + args.duration
+
+    def worker():
+        session = requests.Session()
+        local = []
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            due = start + i / args.rate if args.rate > 0 else time.perf_counter()
+            if due >= end:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint = names[plan[i % len(plan)]]
+            try:
+                status, ok = send(session, base_url, endpoint, payloads, i, args.timeout)
+            except requests.RequestException:
+                status, ok = 0, False
+            local.append((endpoint, due - start, time.perf_counter() - due, status, ok))
+        with results_lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def summarize(results: list, warmup: float) -> dict:
+    """Throughput, latency percentiles and error rate per endpoint and overall (warmup excluded)."""
+    measured = [r for r in results if r[1] >= warmup]
+    groups = {"all": measured}
+    for endpoint in ENDPOINTS:
+        rows = [r for r in measured if r[0] == endpoint]
+        if rows:
+            groups[endpoint] = rows
+
+    report = {}
+    for name, rows in groups.items():
+        if not rows:
+            report[name] = {"requests": 0}
+            continue
+        latencies = np.array([r[2] for r in rows]) * 1000.0
+        span = max(r[1] + r[2] for r in rows) - min(r[1] for r in rows)
+        errors = sum(1 for r in rows if not r[4])
+        statuses = {}
+        for r in rows:
+            statuses[str(r[3])] = statuses.get(str(r[3]), 0) + 1
+        report[name] = {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / span, 2) if span > 0 else None,
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "status_codes": statuses,
+            "latency_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+                "mean": round(float(latencies.mean()), 3),
+                "max": round(float(latencies.max()), 3),
+            },
+        }
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test /predict, /predict/batch and /upload")
+    parser.add_argument("--url", help="Target an already running server instead of starting the stand-in app")
+    parser.add_argument("--port", type=int, default=0, help="Port for the stand-in server (0 = any free port)")
+    parser.add_argument("--single-threaded", action="store_true", help="Stand-in server handles one request at a time")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target requests/s across all threads (0 = closed loop)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds excluded from the report")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = duration only)")
+    parser.add_argument("--mix", type=parse_mix, default="predict=1", help="e.g. predict=0.8,predict_batch=0.15,upload=0.05")
+    parser.add_argument("--distinct-leads", type=int, default=5000, help="Distinct /predict payloads cycled through")
+    parser.add_argument("--batch-rows", type=int, default=500, help="Leads per /predict/batch request")
+    parser.add_argument("--upload-rows", type=int, default=1000, help="Rows per uploaded CSV")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--startup-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, threads=not args.single_threaded)
+        return
+
+    payloads = build_payloads(args)
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_server(args)
+        print(f"[INFO] stand-in app serving on {base_url}")
+
+    try:
+        try:
+            models = requests.get(f"{base_url}/models/status", timeout=10).json().get("active")
+        except Exception:
+            models = None
+
+        t0 = time.perf_counter()
+        results = run_load(base_url, args, payloads)
+        wall = time.perf_counter() - t0
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "stand-in",
+        "models": models,
+        "config": {
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "mode": "open_loop" if args.rate > 0 else "closed_loop",
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": args.mix,
+            "batch_rows": args.batch_rows,
+            "upload_rows": args.upload_rows,
+            "cpu_count": os.cpu_count(),
+        },
+        "wall_s": round(wall, 2),
+        "results": summarize(results, args.warmup),
+    }
+
+    for name, r in report["results"].items():
+        if r["requests"]:
+            print(f"[{name:13s}] {r['requests']:>7,} req  {r['throughput_rps'] or 0:>9,.1f} req/s  "
+                  f"p50={r['latency_ms']['p50']:.2f}ms p95={r['latency_ms']['p95']:.2f}ms "
+                  f"p99={r['latency_ms']['p99']:.2f}ms  errors={r['error_rate']:.2%}")
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Report written to {args.output}")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
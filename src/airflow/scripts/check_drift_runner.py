@@ -22,6 +22,7 @@ load_dotenv()
 # Import helper for loading data from Postgres and drift-check logic
 # ─────────────────────────────────────────────
 from src.airflow.utils.airflow_loader import load_data
+from src.ml.data_loader.data_loader import table_columns
 from src.drift.check_drift import check_drift
 
 def run_drift_check():
@@ -49,10 +50,21 @@ def run_drift_check():
 
     # ─────────────────────────────────────────
     # 3) Load datasets from Postgres
+    #    Only the columns both tables share (the drift check ignores the rest),
+    #    as float32; DRIFT_SAMPLE_PERCENT optionally samples the ever-growing
+    #    uploads table with TABLESAMPLE.
     # ─────────────────────────────────────────
+    sample_percent = os.getenv("DRIFT_SAMPLE_PERCENT")
     try:
-        ref_df = load_data(ref_table)
-        new_df = load_data(new_table)
+        new_cols = set(table_columns(new_table))
+        common = [c for c in table_columns(ref_table) if c in new_cols]
+        ref_df = load_data(ref_table, columns=common, float_dtype="float32")
+        new_df = load_data(
+            new_table,
+            columns=common,
+            float_dtype="float32",
+            sample_percent=float(sample_percent) if sample_percent else None,
+        )
     except Exception as e:
         raise AirflowException(f"❌ Failed to load tables '{ref_table}' or '{new_table}': {e}")
 
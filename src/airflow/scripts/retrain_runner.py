@@ -1,13 +1,160 @@
 # src/airflow/scripts/retrain_runner.py
 
 import os
-from src.ml.pipeline.pipeline_runner import run_pipeline
+import json
+from datetime import datetime
+from typing import List
+
+import joblib
+import mlflow
+import mlflow.sklearn
+import pandas as pd
+from mlflow.tracking import MlflowClient
+
+from src.ml.data_loader.data_loader import load_data_from_postgres, save_dataframe_to_postgres
+from src.ml.pipeline.pipeline_runner import PIPELINE_PATH
+from src.ml.pipeline.preprocessing import clean_columns
+from src.ml.registry.artifact_cache import get_artifact_cache
+from src.ml.registry.model_registry import promote_pair, PAIRED_PREPROCESSOR_TAG
+from src.ml.training.incremental import check_incremental, incremental_update, model_input, selected_feature_names
+
+# ─────────────────────────────────────────────
+# "incremental": fold the rows added since the last retrain into the
+# production preprocessor and model, falling back to a full retrain when
+# that is not possible; "full": always retrain from the whole table
+# ─────────────────────────────────────────────
+RETRAIN_MODE = os.getenv("RETRAIN_MODE", "incremental").lower()
+
+# Increasing column that tells new rows apart. The highest value a model has
+# been trained on is kept as a tag on its registered version, so it survives
+# worker restarts and always describes the model actually in Production.
+RETRAIN_WATERMARK_COLUMN = os.getenv("RETRAIN_WATERMARK_COLUMN", "Lead Number")
+WATERMARK_TAG = "retrain_watermark"
+
+PREPROCESSOR_NAME = "LeadScoringPreprocessor"
+MODEL_NAME = "LeadScoringBestModel"
+
+
+def _table_watermark(table_name: str):
+    """Highest watermark value in the table (None if the column is missing or the table empty)."""
+    try:
+        values = load_data_from_postgres(table_name, columns=[RETRAIN_WATERMARK_COLUMN])[RETRAIN_WATERMARK_COLUMN]
+    except RuntimeError as e:
+        print(f"⚠️ No '{RETRAIN_WATERMARK_COLUMN}' watermark in '{table_name}': {e}")
+        return None
+    return None if values.empty else values.max().item()
+
+
+def _up_to(watermark) -> dict:
+    """`load_data_from_postgres` options selecting the rows at or below `watermark`."""
+    return {"where": f'"{RETRAIN_WATERMARK_COLUMN}" <= :watermark', "params": {"watermark": watermark}}
+
+
+def run_full_retrain(table_name: str) -> None:
+    """
+    Rebuilds preprocessing, feature selection and every model family from the
+    rows present when the retrain starts, then registers the pipeline and
+    best model with that watermark.
+
+    Rows inserted while training runs are above the recorded watermark, so
+    the next incremental retrain picks them up.
+    """
+    from src.ml.training.train import train_all_models  # heavy (SHAP, Evidently): only on this path
+
+    watermark = _table_watermark(table_name)
+    if watermark is None:
+        train_all_models(table_name=table_name)
+        return
+    train_all_models(table_name=table_name, load_options=_up_to(watermark),
+                     model_tags={WATERMARK_TAG: json.dumps(watermark), "retrain_mode": "full"})
+
+
+def run_incremental_retrain(table_name: str, target_col: str = "Converted") -> List[str]:
+    """
+    Folds the rows added since the Production model's watermark into the
+    production preprocessor and model (see `src.ml.training.incremental`),
+    then saves, registers and promotes both (model first, see `promote_pair`).
+
+    Returns:
+        List[str]: Reasons a full retrain is needed instead (empty when the
+        incremental retrain was done, or when there was nothing new).
+    """
+    # Production versions, loaded through the host-local artifact cache
+    cache = get_artifact_cache()
+    try:
+        versions = {"preprocessor": cache.resolve(PREPROCESSOR_NAME), "model": cache.resolve(MODEL_NAME)}
+        tags = MlflowClient().get_model_version(MODEL_NAME, versions["model"]).tags or {}
+    except Exception as e:
+        return [f"production versions could not be resolved: {e}"]
+
+    if WATERMARK_TAG not in tags:
+        return [f"Production model v{versions['model']} has no '{WATERMARK_TAG}' tag"]
+    if tags.get(PAIRED_PREPROCESSOR_TAG) not in (None, versions["preprocessor"]):
+        return [f"Production model v{versions['model']} was built for preprocessor "
+                f"v{tags[PAIRED_PREPROCESSOR_TAG]}, not v{versions['preprocessor']}"]
+    watermark = json.loads(tags[WATERMARK_TAG])
+
+    # Only the new rows are read
+    df = load_data_from_postgres(table_name, where=f'"{RETRAIN_WATERMARK_COLUMN}" > :watermark',
+                                 params={"watermark": watermark})
+    if df.empty:
+        print(f"[INFO] No rows added to '{table_name}' since the last retrain; models unchanged")
+        return []
+    new_watermark = df[RETRAIN_WATERMARK_COLUMN].max().item()
+    df = clean_columns(df)
+    y_new = df[target_col]
+    X_new = df.drop(columns=[target_col])
+
+    try:
+        pipeline = cache.load_model(PREPROCESSOR_NAME, versions["preprocessor"])
+        model = cache.load_model(MODEL_NAME, versions["model"])
+    except Exception as e:
+        return [f"production preprocessor/model could not be loaded: {e}"]
+
+    reasons = check_incremental(pipeline, model, X_new, y_new)
+    if reasons:
+        return reasons
+
+    started = datetime.now()
+    pipeline, model, summary = incremental_update(pipeline, model, X_new, y_new, reasons=reasons)
+    seconds = (datetime.now() - started).total_seconds()
+
+    # Pipeline: local copy and drift reference rows, as `run_pipeline` does
+    os.makedirs(os.path.dirname(PIPELINE_PATH), exist_ok=True)
+    joblib.dump(pipeline, PIPELINE_PATH, compress=3)
+    names = selected_feature_names(pipeline)
+    X_sel = model_input(model, pipeline.transform(X_new), names)
+    save_dataframe_to_postgres(pd.DataFrame(X_sel, columns=names), table_name="preprocessed_train_data",
+                               if_exists="append")
+
+    # Model: its own run in the training experiment; then the pair is
+    # registered, the model promoted first and the preprocessor after it
+    mlflow.set_experiment("Lead Scoring Model")
+    with mlflow.start_run(run_name="Incremental_Retrain") as run:
+        mlflow.set_tag("retrain_mode", "incremental")
+        mlflow.log_params({"continuation": summary["continuation"], "watermark": new_watermark,
+                           "base_model_version": versions["model"]})
+        mlflow.log_metrics({"new_rows": summary["new_rows"], "rows_seen_before": summary["rows_seen_before"],
+                            "rescaled_features": summary["rescaled_features"],
+                            "added_categories": sum(len(v) for v in summary["added_categories"].values()),
+                            "incremental_seconds": seconds})
+        artifact = type(model).__name__
+        mlflow.sklearn.log_model(sk_model=model, artifact_path=artifact)
+    promote_pair(pipeline, run_id=run.info.run_id, model_uri=f"runs:/{run.info.run_id}/{artifact}",
+                 preprocessor_name=PREPROCESSOR_NAME, model_name=MODEL_NAME,
+                 model_tags={WATERMARK_TAG: json.dumps(new_watermark), "retrain_mode": "incremental"})
+
+    print(f"✅ Incremental retrain on {len(X_new)} new rows finished in {seconds:.2f}s")
+    return []
+
 
 def run_retrain():
     """
-    Retrains the lead scoring model using the full reference dataset,
-    saves artifacts, and registers/promotes the pipeline in MLflow.
-    
+    Retrains the lead scoring model: incrementally on the rows added since the
+    last retrain when possible (RETRAIN_MODE=incremental), otherwise from the
+    full reference dataset; saves artifacts and registers/promotes the
+    pipeline and model in MLflow.
+
     Returns:
         bool: True when retraining completes successfully.
     """
@@ -19,23 +166,36 @@ def run_retrain():
         raise EnvironmentError("❌ MLFLOW_TRACKING_URI environment variable is not set")
     # Set it explicitly in case Airflow's environment needs it at runtime
     os.environ["MLFLOW_TRACKING_URI"] = mlflow_uri
+    mlflow.set_tracking_uri(mlflow_uri)
+    table_name = os.getenv("REFERENCE_TABLE", "lead_data")
+
+    # ────────────────────────────────────────────
+    # 2️⃣ Incremental retrain on the new rows only
+    #    - Updates scaler statistics and one-hot vocabularies
+    #    - Continues training the production model on the new rows
+    #    - Falls through to the full retrain when the schema, vocabulary
+    #      or model rule it out (reasons are printed)
+    # ────────────────────────────────────────────
+    if RETRAIN_MODE == "incremental":
+        reasons = run_incremental_retrain(table_name)
+        if not reasons:
+            return True
+        print("⚠️ Falling back to a full retrain: " + "; ".join(reasons))
 
     # ────────────────────────────────────────────
-    # 2️⃣ Execute the full training pipeline
-    #    - Loads data from `REFERENCE_TABLE` (default 'lead_data')
+    # 3️⃣ Execute the full training pipeline
+    #    - Loads the rows of `REFERENCE_TABLE` (default 'lead_data') up to
+    #      the current watermark
     #    - Cleans, engineers features, selects, trains, and logs to MLflow
     #    - Saves artifacts locally and to Postgres (if configured)
-    #    - Registers/promotes the pipeline as 'LeadScoringPreprocessor'
+    #    - Registers the pipeline as 'LeadScoringPreprocessor' and the best
+    #      model as 'LeadScoringBestModel' (tagged with its watermark), and
+    #      promotes the model, then the pipeline
     # ────────────────────────────────────────────
-    run_pipeline(
-        table_name=os.getenv("REFERENCE_TABLE", "lead_data"),
-        target_col="Converted",
-        save=True,
-        register=True
-    )
+    run_full_retrain(table_name)
 
     # ────────────────────────────────────────────
-    # 3️⃣ Return True to signal successful retraining
+    # 4️⃣ Return True to signal successful retraining
     #    (used by Airflow's BranchPythonOperator)
     # ────────────────────────────────────────────
     return True
@@ -21,6 +21,7 @@ LAST_RUN_PATH = os.getenv("LAST_RUN_FILE", "/tmp/last_upload_check.txt")
 # Import data-loading utility after PYTHONPATH is set by Airflow
 # ─────────────────────────────────────────────
 from src.airflow.utils.airflow_loader import load_data
+from src.ml.data_loader.data_loader import table_columns
 
 def has_new_upload():
     """
@@ -38,18 +39,18 @@ def has_new_upload():
     print(f"[INFO] Checking for new uploads in table: {table_name}")
 
     # ─────────────────────────────────────────
-    # 2️⃣ Load the table into a DataFrame
+    # 2️⃣ Ensure the 'uploaded_at' column exists
     # ─────────────────────────────────────────
-    df = load_data(table_name)
-
-    # ─────────────────────────────────────────
-    # 3️⃣ Ensure the 'uploaded_at' column exists
-    # ─────────────────────────────────────────
-    if "uploaded_at" not in df.columns:
+    if "uploaded_at" not in table_columns(table_name):
         raise AirflowSkipException(
             f"[SKIP] Table '{table_name}' missing required 'uploaded_at' column."
         )
 
+    # ─────────────────────────────────────────
+    # 3️⃣ Load only the timestamp column
+    # ─────────────────────────────────────────
+    df = load_data(table_name, columns=["uploaded_at"])
+
     # ─────────────────────────────────────────
     # 4️⃣ Parse timestamps and find the latest one
     # ─────────────────────────────────────────
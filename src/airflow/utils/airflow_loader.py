@@ -1,15 +1,23 @@
 # src/airflow/utils/airflow_loader.py
 
 import os
+import sys
 import pandas as pd
-from sqlalchemy import create_engine
 from airflow.exceptions import AirflowException
 
-def load_data(table_name: str) -> pd.DataFrame:
+# ─────────────────────────────────────────────
+# Add project root to PYTHONPATH for local imports
+# ─────────────────────────────────────────────
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from src.ml.data_loader.data_loader import load_data_from_postgres  # ✅ Streaming loader
+
+def load_data(table_name: str, **options) -> pd.DataFrame:
     """
-    Load an entire PostgreSQL table into a pandas DataFrame.
+    Load a PostgreSQL table (or a projection/filter/sample of it) into a pandas DataFrame.
     
-    Expects the following environment variables to be set:
+    Rows are streamed through a server-side cursor on the process-wide pooled
+    engine from `src.db.db_utils`, which expects:
       • DB_HOST:     hostname or IP of the Postgres server
       • DB_PORT:     port number (defaults to '5432' if unset)
       • DB_NAME:     database name
@@ -18,6 +26,9 @@ def load_data(table_name: str) -> pd.DataFrame:
     
     Args:
         table_name (str): Name of the table to load.
+        **options: columns, where, params, dtypes, float_dtype, sample_percent,
+            sample_method, sample_seed, limit, chunksize
+            (see `src.ml.data_loader.data_loader.iter_data_from_postgres`).
         
     Returns:
         pd.DataFrame: Contents of the table.
@@ -25,44 +36,8 @@ def load_data(table_name: str) -> pd.DataFrame:
     Raises:
         AirflowException: If credentials are missing or the load fails.
     """
-    # ─────────────────────────────────────────
-    # 1) Read database credentials from environment
-    # ─────────────────────────────────────────
-    host = os.getenv("DB_HOST")
-    port = os.getenv("DB_PORT", "5432")
-    db   = os.getenv("DB_NAME")
-    user = os.getenv("DB_USER")
-    pwd  = os.getenv("DB_PASSWORD")
-
-    # ─────────────────────────────────────────
-    # 2) Verify all required credentials are present
-    # ─────────────────────────────────────────
-    if not all([host, port, db, user, pwd]):
-        raise AirflowException(
-            "Postgres credentials not fully set. "
-            "Please define DB_HOST, DB_PORT, DB_NAME, DB_USER, and DB_PASSWORD."
-        )
-
-    # ─────────────────────────────────────────
-    # 3) Construct SQLAlchemy connection string & engine
-    # ─────────────────────────────────────────
-    conn_str = f"postgresql://{user}:{pwd}@{host}:{port}/{db}"
-    engine = create_engine(conn_str)
-
     try:
-        # ─────────────────────────────────────────
-        # 4) Load table into DataFrame
-        # ─────────────────────────────────────────
-        df = pd.read_sql_table(table_name, engine)
+        return load_data_from_postgres(table_name, **options)
     except Exception as e:
-        # ─────────────────────────────────────────
-        # 5) Wrap any failure in an AirflowException
-        # ─────────────────────────────────────────
+        # Wrap any failure (missing credentials, SQL errors) in an AirflowException
         raise AirflowException(f"Failed to load table '{table_name}': {e}")
-    finally:
-        # ─────────────────────────────────────────
-        # 6) Dispose of the engine to close connections
-        # ─────────────────────────────────────────
-        engine.dispose()
-
-    return df
@@ -0,0 +1,77 @@
+# src/app/gunicorn.conf.py
+"""
+Production gunicorn settings for the scoring service.
+
+    gunicorn -c src/app/gunicorn.conf.py app.wsgi:app
+
+The master loads the app (pipeline + model) once (`preload_app`) and forks
+the workers, which share those pages copy-on-write. To keep them shared:
+  • GC is disabled while loading and everything alive is moved to the
+    permanent generation (`gc.freeze()`) before forking, so collections in
+    the workers never write to the parent's object headers;
+  • each worker gets an equal share of the cores for BLAS/OpenMP and the
+    classifier's n_jobs, so N workers don't each start one thread per core.
+
+Environment:
+  GUNICORN_BIND (0.0.0.0:5001), WEB_CONCURRENCY (workers, default = cores),
+  GUNICORN_THREADS (1 = sync workers, >1 = gthread), GUNICORN_TIMEOUT (120),
+  GUNICORN_PRELOAD (1), GUNICORN_GC_FREEZE (1),
+  WORKER_NATIVE_THREADS (default = cores // (workers * threads), at least 1).
+"""
+
+import gc
+import os
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_cores = os.cpu_count() or 1
+
+# ─────────────────────────────────────────────
+# Server
+# ─────────────────────────────────────────────
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("WEB_CONCURRENCY", str(_cores)))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+pythonpath = os.path.abspath(os.path.join(_here, ".."))  # src/, so `app.wsgi` imports
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").lower() in ("1", "true", "yes")
+GC_FREEZE = preload_app and os.getenv("GUNICORN_GC_FREEZE", "1").lower() in ("1", "true", "yes")
+
+# ─────────────────────────────────────────────
+# Native thread budget per worker
+#   Set before the app is imported so BLAS/OpenMP pools are sized once;
+#   threadpoolctl re-applies it in each worker after fork.
+# ─────────────────────────────────────────────
+NATIVE_THREADS = int(os.getenv("WORKER_NATIVE_THREADS", str(max(1, _cores // (workers * threads)))))
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+             "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"):
+    os.environ.setdefault(_var, str(NATIVE_THREADS))
+os.environ.setdefault("MODEL_N_JOBS", str(NATIVE_THREADS))
+
+# Loading with GC off avoids freed "holes" scattered across pages the workers will share
+if GC_FREEZE:
+    gc.disable()
+
+
+def when_ready(server):
+    """Master has loaded the app: freeze everything alive so worker GCs leave it untouched."""
+    if GC_FREEZE:
+        gc.collect()
+        gc.freeze()
+        gc.enable()  # the master's own poller still allocates; it just won't scan frozen objects
+        server.log.info(f"gc.freeze(): {gc.get_freeze_count()} objects moved to the permanent generation")
+    server.log.info(f"{workers} {worker_class} worker(s) x {threads} thread(s), "
+                    f"{NATIVE_THREADS} native thread(s) each, preload={preload_app}")
+
+
+def pre_fork(server, worker):
+    """Also freeze whatever the master created since (e.g. a hot-swapped model) before each fork."""
+    if GC_FREEZE:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Worker side: cap BLAS/OpenMP pools (prediction.py re-arms its own threads via os.register_at_fork)."""
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=NATIVE_THREADS)
+    gc.enable()
@@ -1,15 +1,25 @@
 # src/app/routes.py
 
 import os
+import time
+import atexit
 import pandas as pd
-from flask import Blueprint, request, render_template, jsonify
+from flask import Blueprint, Response, g, request, render_template, jsonify, send_file, stream_with_context, url_for
 from werkzeug.utils import secure_filename
 
 # ─────────────────────────────────────────────
 # Import utility functions for prediction and CSV handling
 # ─────────────────────────────────────────────
-from .utils.prediction import predict_lead, predict_batch
-from .utils.upload import handle_csv_upload
+from .utils.prediction import (
+    predict_lead, predict_batch, predict_proba_batch, input_text_columns, model_status, writer_status
+)
+from .utils.upload import handle_csv_upload, StagedUpload, publish_when_done
+from .utils.ingest import iter_csv_chunks, ingest_chunks, stream_predictions_json
+from .utils.jobs import UploadJobs, JobQueueFull, score_csv_file, SUCCEEDED, FINISHED
+from .utils.metrics import (
+    registry, CallbackMetric, CONTENT_TYPE, REQUESTS, REQUEST_SECONDS, ERRORS, STAGE_SECONDS, timed_iter
+)
+from src.db.db_utils import pool_status
 
 # ─────────────────────────────────────────────
 # Initialize blueprint and configuration
@@ -17,6 +27,103 @@ from .utils.upload import handle_csv_upload
 bp = Blueprint("routes", __name__)
 ALLOWED_EXTENSIONS = {"csv"}
 
+# /upload ingest mode: "buffered" (save → parse → persist → score),
+# "chunked" (single streaming pass) or "async" (background job, poll /jobs/<id>);
+# overridable per request with ?mode=
+UPLOAD_INGEST_MODE = os.getenv("UPLOAD_INGEST_MODE", "buffered")
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "50000"))
+
+# Where buffered uploads are saved before parsing
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# Async upload jobs, per worker process: UPLOAD_JOB_WORKERS run at once at a lower
+# CPU priority (UPLOAD_JOB_NICE), UPLOAD_JOB_MAX_QUEUED wait, further uploads get 503
+UPLOAD_JOB_DIR = os.getenv("UPLOAD_JOB_DIR", os.path.join(UPLOAD_DIR, "jobs"))
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "1"))
+UPLOAD_JOB_MAX_QUEUED = int(os.getenv("UPLOAD_JOB_MAX_QUEUED", "8"))
+UPLOAD_JOB_CHUNK_ROWS = int(os.getenv("UPLOAD_JOB_CHUNK_ROWS", "10000"))
+UPLOAD_JOB_TTL_S = float(os.getenv("UPLOAD_JOB_TTL_S", "3600"))
+UPLOAD_JOB_NICE = int(os.getenv("UPLOAD_JOB_NICE", "10"))
+
+# /predict/batch request limits (413 beyond either)
+PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "10000"))
+PREDICT_BATCH_MAX_BYTES = int(float(os.getenv("PREDICT_BATCH_MAX_MB", "16")) * 1024 * 1024)
+
+
+# Shared Postgres pool occupancy and checkout waits, read at scrape time
+registry.register(CallbackMetric(
+    "lead_scoring_db_pool_connections", "Pooled Postgres connections by state.", ("state",),
+    lambda: {(state,): pool_status().get(key) for state, key in
+             (("checked_out", "checked_out"), ("idle", "idle"), ("overflow", "overflow"))}))
+registry.register(CallbackMetric(
+    "lead_scoring_db_pool_checkout_wait_seconds_total", "Total time spent waiting for a pooled connection.", (),
+    lambda: {(): pool_status()["wait_s_total"]}, kind="counter"))
+
+
+def _run_upload_job(input_path: str, result_path: str, on_chunk) -> int:
+    """
+    One async upload: the chunked ingest (persist raw rows, score) into a result CSV.
+    Raw rows are staged and replace 'uploaded_leads' only once the job succeeds.
+    """
+    staged = StagedUpload("uploaded_leads")
+
+    def persist(chunk, if_exists):
+        with STAGE_SECONDS.time("upload_job", "raw_save"):
+            staged.write(chunk, if_exists=if_exists)
+
+    def score(chunk):
+        with STAGE_SECONDS.time("upload_job", "score"):
+            return predict_batch(chunk)
+
+    try:
+        with STAGE_SECONDS.time("upload_job", "total"):
+            rows = score_csv_file(input_path, result_path, score_chunk=score, persist_chunk=persist,
+                                  chunk_rows=UPLOAD_JOB_CHUNK_ROWS, text_columns=input_text_columns(),
+                                  on_chunk=on_chunk)
+            staged.publish()
+            return rows
+    except Exception:
+        ERRORS.inc("upload_job")
+        raise
+    finally:
+        staged.discard()
+
+
+upload_jobs = UploadJobs(
+    _run_upload_job,
+    root=UPLOAD_JOB_DIR,
+    max_workers=UPLOAD_JOB_WORKERS,
+    max_queued=UPLOAD_JOB_MAX_QUEUED,
+    ttl_s=UPLOAD_JOB_TTL_S,
+    nice=UPLOAD_JOB_NICE,
+)
+atexit.register(upload_jobs.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=upload_jobs.after_fork)
+
+registry.register(CallbackMetric(
+    "lead_scoring_upload_jobs", "Async upload jobs held by this worker, by state.", ("state",),
+    lambda: {(state,): upload_jobs.stats()[state] for state in ("running", "queued")}))
+registry.register(CallbackMetric(
+    "lead_scoring_upload_jobs_total", "Async upload jobs by outcome.", ("outcome",),
+    lambda: {(outcome,): upload_jobs.stats()[outcome] for outcome in ("succeeded", "failed", "rejected")},
+    kind="counter"))
+
+
+@bp.before_request
+def _start_timer():
+    g.request_t0 = time.perf_counter()
+
+
+@bp.after_request
+def _record_request(response):
+    """Count every request and time it by route pattern (bounded label set)."""
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    if "request_t0" in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_t0, endpoint, request.method)
+    return response
+
 
 def allowed_file(filename: str) -> bool:
     """
@@ -62,9 +169,129 @@ def predict():
         proba = predict_lead(data)
         return jsonify({"conversion_probability": proba})
     except Exception as e:
+        ERRORS.inc("/predict")
         return jsonify({"error": str(e)}), 500
 
 
+@bp.route("/predict/batch", methods=["POST"])
+def predict_many():
+    """
+    Score many leads in one vectorized call.
+    
+    Expects:
+      - JSON body, either row-oriented:  [ {<feature>: <value>, ...}, ... ]
+        or columnar:                     { "<feature>": [<value>, ...], ... }
+      - Optional ?threshold=<0..1> to also return 0/1 labels (proba >= threshold).
+    
+    Returns:
+      - JSON with { "count", "model_versions", "probabilities": [<float>, ...] }
+        plus "threshold" and "labels" when a threshold was given
+      - 400 on invalid JSON, payload shape or threshold
+      - 411 without a Content-Length header
+      - 413 above PREDICT_BATCH_MAX_MB bytes or PREDICT_BATCH_MAX_ROWS leads
+      - 500 on prediction error
+    """
+    # 1) Enforce the byte limit before parsing anything
+    if request.content_length is None:
+        return jsonify({"error": "Content-Length header required"}), 411
+    if request.content_length > PREDICT_BATCH_MAX_BYTES:
+        return jsonify({"error": f"Request body exceeds {PREDICT_BATCH_MAX_BYTES} bytes"}), 413
+
+    threshold = request.args.get("threshold")
+    if threshold is not None:
+        try:
+            threshold = float(threshold)
+        except ValueError:
+            threshold = None
+        if threshold is None or not 0.0 <= threshold <= 1.0:
+            return jsonify({"error": "threshold must be a number between 0 and 1"}), 400
+
+    # 2) Validate the payload: a list of lead objects or equal-length feature arrays
+    with STAGE_SECONDS.time("/predict/batch", "json_parse"):
+        data = request.get_json(silent=True)
+    if isinstance(data, list):
+        if not all(isinstance(row, dict) for row in data):
+            return jsonify({"error": "Every element of a JSON array payload must be an object"}), 400
+        leads, n_rows = data, len(data)
+    elif isinstance(data, dict):
+        if not all(isinstance(col, list) for col in data.values()):
+            return jsonify({"error": "Every value of a columnar payload must be an array"}), 400
+        lengths = {len(col) for col in data.values()}
+        if len(lengths) > 1:
+            return jsonify({"error": "Columnar payload arrays must all have the same length"}), 400
+        n_rows = lengths.pop() if lengths else 0
+        leads = data
+    else:
+        return jsonify({"error": "Invalid or missing JSON payload"}), 400
+
+    if n_rows == 0:
+        return jsonify({"error": "No leads in payload"}), 400
+    if n_rows > PREDICT_BATCH_MAX_ROWS:
+        return jsonify({"error": f"Batch of {n_rows} leads exceeds the limit of {PREDICT_BATCH_MAX_ROWS}"}), 413
+
+    # 3) One transform + predict_proba for the whole batch
+    try:
+        proba, versions = predict_proba_batch(leads)
+    except Exception as e:
+        ERRORS.inc("/predict/batch")
+        return jsonify({"error": str(e)}), 500
+
+    with STAGE_SECONDS.time("/predict/batch", "json_serialize"):
+        result = {"count": n_rows, "model_versions": versions, "probabilities": proba.tolist()}
+        if threshold is not None:
+            result["threshold"] = threshold
+            result["labels"] = (proba >= threshold).astype(int).tolist()
+        return jsonify(result)
+
+
+@bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus scrape endpoint for this worker process.
+    
+    Returns:
+      - text/plain exposition: request counts/latency per endpoint, per-stage
+        latency histograms, batch sizes, error counts, active model versions,
+        cache/writer/pool gauges
+    """
+    return Response(registry.render(), mimetype=CONTENT_TYPE)
+
+
+@bp.route("/models/status", methods=["GET"])
+def models_status():
+    """
+    Report the serving model pair.
+    
+    Returns:
+      - JSON with active preprocessor/model versions, registry polling state,
+        any pending (not yet swappable) promotion, and recent swap timings.
+    """
+    return jsonify(model_status())
+
+
+@bp.route("/writer/status", methods=["GET"])
+def feature_writer_status():
+    """
+    Report the background writer for preprocessed features.
+    
+    Returns:
+      - JSON with write mode, queue depth, written/dropped/failed rows and flush latency.
+    """
+    return jsonify(writer_status())
+
+
+@bp.route("/db/status", methods=["GET"])
+def db_status():
+    """
+    Report the shared Postgres connection pool.
+    
+    Returns:
+      - JSON with pool size, checked-out/idle/overflow connections, checkout
+        count, pool timeouts and checkout wait time.
+    """
+    return jsonify(pool_status())
+
+
 @bp.route("/upload", methods=["POST"])
 def upload():
     """
@@ -78,9 +305,19 @@ def upload():
       5) Generate batch predictions and append to DataFrame.
       6) Return JSON list of records with predictions.
     
+    With ?mode=chunked (or UPLOAD_INGEST_MODE=chunked) the upload stream is
+    parsed once in UPLOAD_CHUNK_ROWS-row chunks; each chunk is persisted,
+    scored and streamed back before the next is read. See `_chunked_upload`.
+    
+    With ?mode=async (or UPLOAD_INGEST_MODE=async) the file is saved and
+    queued as a background job; poll /jobs/<id> and download the scored CSV
+    from /jobs/<id>/result. See `_async_upload`.
+    
     Returns:
       - JSON with { "predictions": [ {<row>..., "prediction": 0|1}, ... ] }
+      - 202 with the job status plus "status_url"/"result_url" (async mode)
       - 400 on missing file, empty file, or wrong extension
+      - 503 when this worker's async job queue is full (async mode)
       - 500 on server or processing errors
     """
     # 1) Check file part
@@ -95,28 +332,145 @@ def upload():
     if not allowed_file(file.filename):
         return jsonify({"error": "Unsupported file type. Only .csv allowed"}), 400
 
+    mode = request.args.get("mode", UPLOAD_INGEST_MODE)
+    if mode == "chunked":
+        return _chunked_upload(file)
+    if mode == "async":
+        return _async_upload(file)
+
     filename = secure_filename(file.filename)
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-    upload_path = os.path.join(upload_dir, filename)
-    file.save(upload_path)
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    upload_path = os.path.join(UPLOAD_DIR, filename)
+    with STAGE_SECONDS.time("/upload", "file_save"):
+        file.save(upload_path)
 
     try:
         # 3) Load CSV into DataFrame
-        df = pd.read_csv(upload_path)
+        with STAGE_SECONDS.time("/upload", "csv_read"):
+            df = pd.read_csv(upload_path)
         if df.empty:
             return jsonify({"error": "Uploaded file is empty."}), 400
 
         # 4) Save raw data to Postgres for monitoring/auditing
-        handle_csv_upload(upload_path, table_name="uploaded_leads")
+        with STAGE_SECONDS.time("/upload", "raw_save"):
+            handle_csv_upload(upload_path, table_name="uploaded_leads")
 
         # 5) Generate batch predictions
         predictions = predict_batch(df)
         df["prediction"] = predictions
 
         # 6) Prepare JSON-serializable output
-        response_data = df.where(pd.notnull(df), None).to_dict(orient="records")
-        return jsonify({"predictions": response_data})
+        with STAGE_SECONDS.time("/upload", "json_serialize"):
+            response_data = df.where(pd.notnull(df), None).to_dict(orient="records")
+            return jsonify({"predictions": response_data})
+
+    except Exception as e:
+        ERRORS.inc("/upload")
+        return jsonify({"error": str(e)}), 500
+
+
+def _chunked_upload(file):
+    """
+    Single-pass ingest: read the upload stream in bounded chunks and, per chunk,
+    persist raw rows to a staging table (replace, then append), score them
+    (which also appends preprocessed features), and stream the rows back.
+    The staging table replaces 'uploaded_leads' once the last chunk is done.
+
+    The first chunk is processed before the response starts so that empty or
+    unreadable files still get a 400/500 status; later failures are reported
+    as a trailing "error" key in the streamed JSON.
+    """
+    staged = StagedUpload("uploaded_leads")
+
+    def persist(chunk, if_exists):
+        with STAGE_SECONDS.time("/upload", "raw_save"):
+            staged.write(chunk, if_exists=if_exists)
+
+    chunks = publish_when_done(ingest_chunks(
+        timed_iter(
+            iter_csv_chunks(file.stream, UPLOAD_CHUNK_ROWS, text_columns=input_text_columns()),
+            STAGE_SECONDS, "/upload", "csv_read"
+        ),
+        score_chunk=predict_batch,
+        persist_chunk=persist,
+    ), staged)
 
+    try:
+        first = next(chunks, None)
+    except pd.errors.EmptyDataError:
+        first = None
     except Exception as e:
+        ERRORS.inc("/upload")
         return jsonify({"error": str(e)}), 500
+
+    if first is None:
+        return jsonify({"error": "Uploaded file is empty."}), 400
+
+    return Response(
+        stream_with_context(stream_predictions_json(first, chunks)),
+        mimetype="application/json"
+    )
+
+
+def _async_upload(file):
+    """
+    Save the upload and queue it as a background job; respond immediately.
+
+    The job runs the chunked ingest (UPLOAD_JOB_CHUNK_ROWS-row chunks: persist
+    raw rows to 'uploaded_leads', score, append to the job's result CSV).
+    """
+    try:
+        with STAGE_SECONDS.time("/upload", "job_submit"):
+            job = upload_jobs.submit(file.save, secure_filename(file.filename))
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "30"}
+    except Exception as e:
+        ERRORS.inc("/upload")
+        return jsonify({"error": str(e)}), 500
+
+    job_id = job["job_id"]
+    job["status_url"] = url_for("routes.job_status", job_id=job_id)
+    job["result_url"] = url_for("routes.job_result", job_id=job_id)
+    return jsonify(job), 202, {"Location": job["status_url"]}
+
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """
+    Report an async upload job (submitted to any worker on this host).
+    
+    Returns:
+      - JSON with state (queued | running | succeeded | failed), rows_done,
+        bytes_read/bytes_total, progress (0..1), timestamps, and result_rows
+        plus "result_url" on success or "error" on failure
+      - 404 for unknown or expired jobs
+    """
+    status = upload_jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if status["state"] == SUCCEEDED:
+        status["result_url"] = url_for("routes.job_result", job_id=job_id)
+    return jsonify(status)
+
+
+@bp.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    """
+    Download the scored rows of a finished async upload job.
+    
+    Returns:
+      - CSV attachment: the uploaded rows plus a "prediction" column (0|1)
+      - 404 for unknown or expired jobs
+      - 409 while the job is still queued/running, or if it failed
+    """
+    status = upload_jobs.status(job_id)
+    if status is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    path = upload_jobs.result_path(job_id)
+    if path is None:
+        message = status["error"] if status["state"] in FINISHED else f"Job is {status['state']}"
+        return jsonify({"error": message, "state": status["state"]}), 409
+
+    stem = os.path.splitext(status["filename"] or "upload")[0]
+    return send_file(os.path.abspath(path), mimetype="text/csv", as_attachment=True,
+                     download_name=f"{stem}_predictions.csv")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/batching.py
+
+Micro-batching request coalescer for single-lead scoring.
+
+Callers block in `submit(record)`; a dispatcher thread gathers every request
+that arrives within `max_wait_ms` of the first one (or until `max_batch`
+requests are queued), scores them with one vectorized call, and hands each
+caller its own result.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Sequence
+
+
+class _PendingRequest:
+    """One queued record plus the slot its caller is waiting on."""
+
+    __slots__ = ("record", "event", "result", "error")
+
+    def __init__(self, record: dict):
+        self.record = record
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class RequestCoalescer:
+    """
+    Coalesce concurrent single-record requests into batched scoring calls.
+
+    Args:
+        score_batch (Callable[[List[dict]], Sequence[float]]): Scores a list of
+            records and returns one result per record, in order.
+        max_wait_ms (float): How long to hold the first request of a batch
+            waiting for more to arrive.
+        max_batch (int): Flush as soon as this many requests are queued.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[dict]], Sequence[float]],
+        max_wait_ms: float = 2.0,
+        max_batch: int = 64,
+        name: str = "predict-coalescer",
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.score_batch = score_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Counters (read via stats())
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+        self._fallbacks = 0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ─────────────────────────────────────────
+    # Caller side
+    # ─────────────────────────────────────────
+    def submit(self, record: dict, timeout: Optional[float] = None):
+        """
+        Queue one record and block until its batch has been scored.
+
+        Args:
+            record (dict): Raw feature values for one lead.
+            timeout (float, optional): Seconds to wait before giving up.
+
+        Returns:
+            The result `score_batch` produced for this record.
+
+        Raises:
+            RuntimeError: If the coalescer has been closed.
+            TimeoutError: If no result arrived within `timeout`.
+            Exception: Whatever scoring raised for this record.
+        """
+        pending = _PendingRequest(record)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("RequestCoalescer is closed")
+            self._queue.append(pending)
+            # Wake the dispatcher for the first request of a batch or a full batch
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._cond.notify()
+
+        if not pending.event.wait(timeout):
+            raise TimeoutError(f"No prediction within {timeout}s")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    # ─────────────────────────────────────────
+    # Dispatcher side
+    # ─────────────────────────────────────────
+    def _next_batch(self) -> Optional[List[_PendingRequest]]:
+        """Block until a batch is ready; None once closed and drained."""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            deadline = time.monotonic() + self.max_wait
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._queue), self.max_batch)
+            return [self._queue.popleft() for _ in range(size)]
+
+    def _dispatch(self, batch: List[_PendingRequest]) -> None:
+        """Score one batch; on failure rescore records one by one to isolate bad inputs."""
+        try:
+            results = list(self.score_batch([p.record for p in batch]))
+            if len(results) != len(batch):
+                raise ValueError(f"score_batch returned {len(results)} results for {len(batch)} records")
+            for pending, result in zip(batch, results):
+                pending.result = result
+        except Exception as batch_error:
+            if len(batch) == 1:
+                batch[0].error = batch_error
+            else:
+                self._fallbacks += 1
+                for pending in batch:
+                    try:
+                        pending.result = list(self.score_batch([pending.record]))[0]
+                    except Exception as e:
+                        pending.error = e
+        finally:
+            self._batches += 1
+            self._rows += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            for pending in batch:
+                pending.event.set()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._dispatch(batch)
+
+    # ─────────────────────────────────────────
+    # Lifecycle & introspection
+    # ─────────────────────────────────────────
+    def after_fork(self) -> None:
+        """Re-arm in a forked child: fresh queue, condition and dispatcher thread."""
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._batches = self._rows = self._largest_batch = self._fallbacks = 0
+        if not self._closed:
+            self._thread = threading.Thread(target=self._run, name=self._thread.name, daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop accepting requests, score whatever is queued, and stop the dispatcher."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: batches, rows, mean/largest batch size, fallbacks and current queue depth.
+        """
+        batches = self._batches
+        return {
+            "batches": batches,
+            "rows": self._rows,
+            "mean_batch_size": (self._rows / batches) if batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "fallbacks": self._fallbacks,
+            "queue_depth": len(self._queue),
+        }
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/compiled_scorer.py
+
+Compiles a fitted Lead Scoring preprocessing pipeline
+(feature_engineering → preprocessing → feature_selection) into flat lookup
+tables so a single raw JSON lead can be mapped straight into the model's
+feature vector without building a pandas DataFrame.
+
+Only the RFE-selected output columns are computed:
+  • numeric:     (value or median - mean) / scale
+  • categorical: category → output slot lookup (unknown categories stay 0)
+
+Pipelines built with PIPELINE_DTYPE=float32 get float32 rows, rounded after
+each step exactly as the sklearn transformers round them.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+# ─────────────────────────────────────────────
+# Engineered columns produced by FeatureEngineeringTransformer
+# ─────────────────────────────────────────────
+_VISITS = "TotalVisits"
+_TIME = "Total Time Spent on Website"
+
+
+def _is_missing(value) -> bool:
+    """True for None and float NaN (the values pandas treats as missing)."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _to_float(value) -> float:
+    """Convert a raw numeric value the way pandas/sklearn would (None → NaN)."""
+    if value is None:
+        return math.nan
+    return float(value)
+
+
+def _engineered_value(name: str, record: dict):
+    """
+    Recompute a FeatureEngineeringTransformer column from the raw record.
+
+    Returns:
+        float, or None when `name` is not an engineered column (or its inputs are absent).
+    """
+    if name in (f"{_VISITS}_is_zero", f"{_TIME}_is_zero"):
+        source = name[: -len("_is_zero")]
+        if source not in record:
+            return None
+        value = record[source]
+        return 0.0 if _is_missing(value) else float(_to_float(value) == 0)
+    if name == "EngagementScore":
+        if _VISITS not in record or _TIME not in record:
+            return None
+        return _to_float(record[_VISITS]) * _to_float(record[_TIME])
+    return None
+
+
+def _split_steps(transformer):
+    """
+    Break a ColumnTransformer branch into (caster dtype, imputer, scaler, encoder).
+
+    Raises:
+        ValueError: If the branch contains anything the compiler cannot reproduce.
+    """
+    steps = transformer.steps if isinstance(transformer, Pipeline) else [(None, transformer)]
+    cast = imputer = scaler = encoder = None
+    for _, step in steps:
+        if type(step).__name__ == "DtypeCaster" and cast is None and imputer is None and scaler is None:
+            cast = np.dtype(step.dtype)
+            if cast not in (np.float32, np.float64):
+                raise ValueError(f"Unsupported DtypeCaster dtype: {cast}")
+        elif isinstance(step, SimpleImputer) and imputer is None and scaler is None and encoder is None:
+            if step.add_indicator or not _is_missing(step.missing_values):
+                raise ValueError("SimpleImputer with indicators or custom missing_values is not supported")
+            imputer = step
+        elif isinstance(step, StandardScaler) and scaler is None and encoder is None:
+            scaler = step
+        elif isinstance(step, OneHotEncoder) and encoder is None and scaler is None:
+            if step.drop_idx_ is not None or getattr(step, "infrequent_categories_", None):
+                raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+            encoder = step
+        else:
+            raise ValueError(f"Unsupported preprocessing step: {type(step).__name__}")
+    return cast, imputer, scaler, encoder
+
+
+def _round32(value: float) -> float:
+    """Round a Python float to the nearest float32 (what a float32 array store does)."""
+    return float(np.float32(value))
+
+
+class CompiledScorer:
+    """
+    Precomputed single-lead featurizer (and optional scorer) for a fitted pipeline.
+
+    Build it once after loading the pipeline; `transform_one` then fills a
+    preallocated (1, n_selected) buffer per thread, float64 or float32 like
+    the pipeline's own output.
+    """
+
+    def __init__(self, pipeline: Pipeline, model=None):
+        """
+        Args:
+            pipeline (Pipeline): Fitted pipeline with 'preprocessing' (ColumnTransformer)
+                and 'feature_selection' (FeatureSelector) steps.
+            model: Optional fitted classifier used by `predict_proba_one`.
+
+        Raises:
+            ValueError: If the pipeline layout cannot be compiled; callers should
+                fall back to `pipeline.transform`.
+        """
+        steps = dict(pipeline.steps)
+        preprocessing = steps.get("preprocessing")
+        if not isinstance(preprocessing, ColumnTransformer):
+            raise ValueError("Pipeline has no fitted 'preprocessing' ColumnTransformer")
+
+        selector = steps.get("feature_selection")
+        n_outputs = len(preprocessing.get_feature_names_out())
+        selected = (
+            list(selector.selected_features) if selector is not None else list(range(n_outputs))
+        )
+        slot_of = {int(pos): slot for slot, pos in enumerate(selected)}
+        if len(slot_of) != len(selected):
+            raise ValueError("Duplicate indices in feature selection are not supported")
+
+        self.model = model
+        self.n_features = len(selected)
+        self.engineered = "feature_engineering" in steps
+        self.required_columns: List[str] = []
+        self.numeric_specs = []      # (column, slot, fill, mean, scale, float32)
+        self.categorical_specs = []  # (column, fill, {category: slot}, nan_slot)
+        output_dtypes = []
+
+        for name, transformer, columns in preprocessing.transformers_:
+            if isinstance(transformer, str) and transformer == "drop":
+                continue
+            if isinstance(transformer, str) or isinstance(columns, slice):
+                raise ValueError(f"Unsupported ColumnTransformer branch '{name}'")
+            columns = list(columns)
+            if not columns:
+                continue
+            self.required_columns.extend(columns)
+            start = preprocessing.output_indices_[name].start
+            cast, imputer, scaler, encoder = _split_steps(transformer)
+
+            fills = list(imputer.statistics_) if imputer is not None else [None] * len(columns)
+            if imputer is not None and len(fills) != len(columns):
+                raise ValueError(f"Imputer in '{name}' dropped empty features")
+
+            if encoder is None:
+                # float64 unless cast: sklearn's imputer/scaler keep float32 input float32
+                single = cast == np.float32
+                output_dtypes.append(np.float32 if single else np.float64)
+                means = scaler.mean_ if scaler is not None and scaler.with_mean else np.zeros(len(columns))
+                scales = scaler.scale_ if scaler is not None and scaler.with_std else np.ones(len(columns))
+                for j, col in enumerate(columns):
+                    slot = slot_of.get(start + j)
+                    if slot is None:
+                        continue
+                    fill = math.nan if fills[j] is None else float(fills[j])
+                    if single:
+                        fill = _round32(fill)
+                    self.numeric_specs.append(
+                        (col, slot, fill, float(means[j]), float(scales[j]), single)
+                    )
+            else:
+                output_dtypes.append(np.dtype(encoder.dtype))
+                offset = start
+                for j, col in enumerate(columns):
+                    lookup: Dict[object, int] = {}
+                    nan_slot = None
+                    for k, category in enumerate(encoder.categories_[j]):
+                        slot = slot_of.get(offset + k)
+                        if slot is None:
+                            continue
+                        if isinstance(category, float) and math.isnan(category):
+                            nan_slot = slot
+                        else:
+                            lookup[category] = slot
+                    offset += len(encoder.categories_[j])
+                    if lookup or nan_slot is not None:
+                        self.categorical_specs.append((col, fills[j], lookup, nan_slot))
+
+        # Engineered columns are produced by the pipeline, not supplied by callers
+        derived = set()
+        if self.engineered:
+            derived = {f"{_VISITS}_is_zero", f"{_TIME}_is_zero", "EngagementScore"}
+        self.required_columns = [c for c in self.required_columns if c not in derived]
+
+        self.dtype = np.result_type(*output_dtypes) if output_dtypes else np.dtype(np.float64)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"Unsupported output dtype: {self.dtype}")
+        self._local = threading.local()
+
+    # ─────────────────────────────────────────
+    # Featurization
+    # ─────────────────────────────────────────
+    def _fill_row(self, record: dict, row: np.ndarray) -> None:
+        """Write the selected features for one raw record into `row` (zeroed by caller)."""
+        missing = [c for c in self.required_columns if c not in record]
+        if missing:
+            raise ValueError(f"columns are missing: {set(missing)}")
+
+        for col, slot, fill, mean, scale, single in self.numeric_specs:
+            value = _engineered_value(col, record) if self.engineered else None
+            if value is None:
+                value = _to_float(record.get(col))
+            if math.isnan(value):
+                value = fill
+            if single:
+                # caster, then the scaler's in-place `-= mean`, `/= scale` on float32
+                row[slot] = _round32(_round32(_round32(value) - mean) / scale)
+            else:
+                row[slot] = (value - mean) / scale
+
+        for col, fill, lookup, nan_slot in self.categorical_specs:
+            value = record[col]
+            # SimpleImputer only treats NaN as missing; None reaches the encoder as-is
+            if isinstance(value, float) and math.isnan(value):
+                value = fill
+            if isinstance(value, float) and math.isnan(value):
+                slot = nan_slot
+            else:
+                try:
+                    slot = lookup.get(value)
+                except TypeError:  # unhashable values are unknown categories
+                    slot = None
+            if slot is not None:
+                row[slot] = 1.0
+
+    def transform_one(self, record: dict) -> np.ndarray:
+        """
+        Map one raw lead into the selected feature vector.
+
+        Args:
+            record (dict): Raw feature values for one lead.
+
+        Returns:
+            np.ndarray: (1, n_features) view of this thread's reusable buffer
+                (`self.dtype`). It is overwritten by the next call on the same thread.
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = np.zeros((1, self.n_features), dtype=self.dtype)
+        else:
+            buffer.fill(0.0)
+        self._fill_row(record, buffer[0])
+        return buffer
+
+    def transform_many(self, records: Iterable[dict]) -> np.ndarray:
+        """
+        Map several raw leads into a fresh (n_records, n_features) matrix.
+
+        Args:
+            records (Iterable[dict]): Raw feature dicts.
+
+        Returns:
+            np.ndarray: Selected features, one row per record.
+        """
+        records = list(records)
+        out = np.zeros((len(records), self.n_features), dtype=self.dtype)
+        for i, record in enumerate(records):
+            self._fill_row(record, out[i])
+        return out
+
+    # ─────────────────────────────────────────
+    # Scoring
+    # ─────────────────────────────────────────
+    def predict_proba_one(self, record: dict) -> np.ndarray:
+        """
+        Run the attached model on one raw lead.
+
+        Returns:
+            np.ndarray: Raw `predict_proba` output for the single row.
+        """
+        if self.model is None:
+            raise RuntimeError("CompiledScorer was built without a model")
+        return np.asarray(self.model.predict_proba(self.transform_one(record)))
+
+
+def try_compile(pipeline: Pipeline, model=None) -> Optional[CompiledScorer]:
+    """
+    Build a CompiledScorer, or return None if the pipeline layout is unsupported.
+    """
+    try:
+        scorer = CompiledScorer(pipeline, model)
+        print(f"✅ Compiled single-lead scorer ({scorer.n_features} features)")
+        return scorer
+    except Exception as e:
+        print(f"⚠️ Compiled scorer unavailable, using pipeline.transform: {e}")
+        return None
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/feature_writer.py
+
+Background writer for preprocessed feature blocks.
+
+The serving path hands each preprocessed DataFrame to `submit()` and returns
+immediately; a writer thread gathers queued blocks until `flush_rows` rows are
+pending or `flush_interval_s` has passed, and appends them with one bulk write.
+The queue is bounded in rows: when it is full `submit()` blocks for up to
+`put_timeout_s` (backpressure) and then drops the block, counting it, rather
+than failing the prediction request.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FLUSH_LATENCY_WINDOW = 200
+
+
+class BackgroundWriter:
+    """
+    Bounded, coalescing, asynchronous DataFrame writer.
+
+    Args:
+        write (Callable[[pd.DataFrame], None]): Persists one coalesced block
+            (e.g. an append to Postgres).
+        flush_interval_s (float): Max time the first queued block waits for more.
+        flush_rows (int): Flush as soon as this many rows are queued.
+        max_queue_rows (int): Queue bound; a single larger block is still accepted
+            into an empty queue.
+        put_timeout_s (float): How long `submit()` waits for room before dropping.
+        max_retries (int): Extra attempts for a failed write before its rows are discarded.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[pd.DataFrame], None],
+        flush_interval_s: float = 1.0,
+        flush_rows: int = 10_000,
+        max_queue_rows: int = 200_000,
+        put_timeout_s: float = 5.0,
+        max_retries: int = 2,
+        name: str = "feature-writer",
+    ):
+        if flush_rows < 1 or max_queue_rows < 1:
+            raise ValueError("flush_rows and max_queue_rows must be >= 1")
+        if flush_interval_s < 0:
+            raise ValueError("flush_interval_s must be >= 0")
+
+        self.write = write
+        self.flush_interval = flush_interval_s
+        self.flush_rows = flush_rows
+        self.max_queue_rows = max_queue_rows
+        self.put_timeout = put_timeout_s
+        self.max_retries = max_retries
+
+        self._queue: deque = deque()
+        self._queued_rows = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Counters (read via stats())
+        self._submitted_rows = 0
+        self._written_rows = 0
+        self._dropped_rows = 0
+        self._failed_rows = 0
+        self._flushes = 0
+        self._blocked_s = 0.0
+        self._flush_latencies: deque = deque(maxlen=FLUSH_LATENCY_WINDOW)
+        self.last_error: Optional[str] = None
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ─────────────────────────────────────────
+    # Producer side
+    # ─────────────────────────────────────────
+    def submit(self, df: pd.DataFrame) -> bool:
+        """
+        Queue one block for writing.
+
+        Returns:
+            bool: False if the block was dropped because the queue stayed full.
+
+        Raises:
+            RuntimeError: If the writer has been closed.
+        """
+        rows = len(df)
+        if rows == 0:
+            return True
+
+        t0 = time.monotonic()
+        deadline = t0 + self.put_timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackgroundWriter is closed")
+            while self._queued_rows and self._queued_rows + rows > self.max_queue_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    self._dropped_rows += rows
+                    self._blocked_s += time.monotonic() - t0
+                    print(f"⚠️ Feature writer queue full ({self._queued_rows} rows); dropped {rows} rows")
+                    return False
+                self._cond.wait(remaining)
+            self._blocked_s += time.monotonic() - t0
+
+            self._queue.append(df)
+            self._queued_rows += rows
+            self._submitted_rows += rows
+            if len(self._queue) == 1 or self._queued_rows >= self.flush_rows:
+                self._cond.notify_all()
+        return True
+
+    # ─────────────────────────────────────────
+    # Writer side
+    # ─────────────────────────────────────────
+    def _next_blocks(self) -> Optional[List[pd.DataFrame]]:
+        """Block until a flush is due; None once closed and drained."""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+
+            deadline = time.monotonic() + self.flush_interval
+            while self._queued_rows < self.flush_rows and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Take up to flush_rows rows, but only blocks with the same columns
+            # (a model swap changes the selected features mid-stream)
+            columns = tuple(self._queue[0].columns)
+            blocks, rows = [], 0
+            while self._queue and tuple(self._queue[0].columns) == columns \
+                    and (not blocks or rows + len(self._queue[0]) <= self.flush_rows):
+                block = self._queue.popleft()
+                blocks.append(block)
+                rows += len(block)
+            self._queued_rows -= rows
+            self._in_flight = rows
+            self._cond.notify_all()  # room for blocked producers
+            return blocks
+
+    def _flush(self, blocks: List[pd.DataFrame]) -> None:
+        df = blocks[0] if len(blocks) == 1 else pd.concat(blocks, ignore_index=True)
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter()
+            try:
+                self.write(df)
+                self._flush_latencies.append(time.perf_counter() - t0)
+                self._written_rows += len(df)
+                self._flushes += 1
+                self.last_error = None
+                return
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Feature write failed (attempt {attempt + 1}/{self.max_retries + 1}): {self.last_error}")
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt, 10))
+        self._failed_rows += len(df)
+        print(f"❌ [ERROR] Discarded {len(df)} preprocessed rows after repeated write failures")
+
+    def _run(self) -> None:
+        while True:
+            blocks = self._next_blocks()
+            if blocks is None:
+                return
+            try:
+                self._flush(blocks)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    # ─────────────────────────────────────────
+    # Lifecycle & introspection
+    # ─────────────────────────────────────────
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far has been written (or given up on).
+
+        Returns:
+            bool: False if `timeout` expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def after_fork(self) -> None:
+        """
+        Re-arm in a forked child (e.g. a gunicorn worker of a preloaded app).
+
+        Threads don't survive fork and the inherited queue belongs to the
+        parent's writer, so the child starts empty with its own lock and thread.
+        """
+        self._queue = deque()
+        self._queued_rows = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._submitted_rows = self._written_rows = self._dropped_rows = self._failed_rows = 0
+        self._flushes = 0
+        self._blocked_s = 0.0
+        self._flush_latencies.clear()
+        if not self._closed:
+            self._thread = threading.Thread(target=self._run, name=self._thread.name, daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Stop accepting blocks, write whatever is queued, and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"⚠️ Feature writer did not drain within {timeout}s ({self._queued_rows} rows queued)")
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Queue depth, row counters and recent flush latency (ms).
+        """
+        latencies = np.asarray(self._flush_latencies, dtype=float) * 1000.0
+        return {
+            "queue_blocks": len(self._queue),
+            "queue_rows": self._queued_rows,
+            "max_queue_rows": self.max_queue_rows,
+            "submitted_rows": self._submitted_rows,
+            "written_rows": self._written_rows,
+            "dropped_rows": self._dropped_rows,
+            "failed_rows": self._failed_rows,
+            "flushes": self._flushes,
+            "producer_blocked_s": round(self._blocked_s, 4),
+            "flush_ms": {
+                "count": int(latencies.size),
+                "mean": float(latencies.mean()) if latencies.size else 0.0,
+                "p95": float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+                "max": float(latencies.max()) if latencies.size else 0.0,
+            },
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/ingest.py
+
+Single-pass, chunked ingest of uploaded lead CSVs.
+
+The upload stream is parsed once in bounded-size chunks; every chunk is
+persisted (raw rows) and scored before the next one is read, so peak memory
+depends on the chunk size rather than on the file size.
+"""
+
+import json
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def categorical_columns(pipeline) -> List[str]:
+    """
+    Columns a fitted preprocessing pipeline one-hot encodes.
+
+    Reading these as text in every chunk keeps column types stable across
+    chunks (a chunk where a column is entirely empty would otherwise be
+    inferred as float).
+    """
+    try:
+        preprocessing = pipeline.named_steps["preprocessing"]
+    except (AttributeError, KeyError):
+        return []
+
+    columns = []
+    for _, transformer, cols in getattr(preprocessing, "transformers_", []):
+        steps = getattr(transformer, "steps", [(None, transformer)])
+        if any(type(step).__name__ == "OneHotEncoder" for _, step in steps):
+            columns.extend(list(cols))
+    return columns
+
+
+def iter_csv_chunks(stream, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    text_columns: Optional[Iterable[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Parse a CSV stream in chunks of at most `chunk_rows` rows.
+
+    Args:
+        stream: Binary or text file-like object (e.g. werkzeug FileStorage.stream).
+        chunk_rows (int): Rows per chunk.
+        text_columns (Iterable[str], optional): Columns to always read as text.
+
+    Yields:
+        pd.DataFrame: Non-empty chunks, with all-empty columns typed as object.
+    """
+    dtype = {col: object for col in text_columns} if text_columns else None
+    reader = pd.read_csv(stream, chunksize=chunk_rows, dtype=dtype)
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        empty_cols = chunk.columns[chunk.isna().all()]
+        if len(empty_cols):
+            chunk[empty_cols] = chunk[empty_cols].astype(object)
+        yield chunk
+
+
+def ingest_chunks(
+    chunks: Iterable[pd.DataFrame],
+    score_chunk: Callable[[pd.DataFrame], list],
+    persist_chunk: Optional[Callable[[pd.DataFrame, str], None]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Persist and score each chunk, yielding it with a 'prediction' column.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Raw input chunks.
+        score_chunk (Callable): Returns one prediction per row, or a dict with "error".
+        persist_chunk (Callable, optional): Called as persist_chunk(chunk, if_exists);
+            the first chunk gets 'replace', later chunks 'append'.
+
+    Yields:
+        pd.DataFrame: Scored chunk.
+
+    Raises:
+        RuntimeError: If scoring reports an error.
+    """
+    for i, chunk in enumerate(chunks):
+        if persist_chunk is not None:
+            persist_chunk(chunk, "replace" if i == 0 else "append")
+
+        predictions = score_chunk(chunk)
+        if isinstance(predictions, dict):
+            raise RuntimeError(predictions.get("error", "Prediction failed"))
+
+        chunk["prediction"] = predictions
+        yield chunk
+
+
+def _records_json(chunk: pd.DataFrame) -> str:
+    """Serialize a chunk as comma-separated JSON objects (NaN → null), without brackets."""
+    body = chunk.to_json(orient="records", double_precision=15, force_ascii=False)
+    return body[1:-1]
+
+
+def stream_predictions_json(first: pd.DataFrame, rest: Iterator[pd.DataFrame]) -> Iterator[str]:
+    """
+    Render scored chunks as the same `{"predictions": [...]}` document the
+    buffered /upload returns, one chunk at a time.
+
+    A failure after the response has started is reported as a trailing
+    "error" key, since the status code can no longer change.
+    """
+    yield '{"predictions": ['
+    yield _records_json(first)
+    try:
+        for chunk in rest:
+            body = _records_json(chunk)
+            if body:
+                yield "," + body
+        yield "]}"
+    except Exception as e:
+        print("❌ [ERROR] during chunked upload:", e)
+        yield "], " + json.dumps({"error": str(e)})[1:]
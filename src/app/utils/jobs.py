@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/jobs.py
+
+Asynchronous upload jobs.
+
+`/upload?mode=async` saves the file, registers a job and returns its id at
+once; a small pool of job threads then ingests the file chunk by chunk
+(persist raw rows, score, append to a result CSV). Each job lives in its own
+directory under the job root:
+
+    <root>/<job_id>/input.csv      the uploaded file
+    <root>/<job_id>/status.json    state and progress, rewritten atomically per chunk
+    <root>/<job_id>/result.csv     scored rows (written as result.csv.part until done)
+
+Status is kept on disk rather than in memory so any worker process on the
+host can answer `/jobs/<id>`, whichever one accepted the upload. Concurrency
+is capped per process (`max_workers` running, `max_queued` waiting; beyond
+that `submit` raises `JobQueueFull`) and job threads run at a lower OS
+priority (`nice`, Linux) so bulk scoring yields the CPU to interactive
+`/predict` requests.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import threading
+from collections import deque
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+from .ingest import iter_csv_chunks, ingest_chunks
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobQueueFull(Exception):
+    """Raised by `UploadJobs.submit` when this process already holds its maximum of jobs."""
+
+
+def score_csv_file(
+    input_path: str,
+    result_path: str,
+    score_chunk: Callable[[pd.DataFrame], list],
+    persist_chunk: Optional[Callable[[pd.DataFrame, str], None]] = None,
+    chunk_rows: int = 10_000,
+    text_columns: Optional[Iterable[str]] = None,
+    on_chunk: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Ingest a CSV file chunk by chunk into a scored CSV file.
+
+    Args:
+        input_path (str): Uploaded CSV.
+        result_path (str): Destination; rows are appended with a 'prediction' column.
+        score_chunk (Callable): Returns one prediction per row, or a dict with "error".
+        persist_chunk (Callable, optional): Called as persist_chunk(chunk, if_exists).
+        chunk_rows (int): Rows per chunk.
+        text_columns (Iterable[str], optional): Columns to always read as text.
+        on_chunk (Callable, optional): Called as on_chunk(rows_done, bytes_read) after each chunk.
+
+    Returns:
+        int: Number of scored rows.
+
+    Raises:
+        ValueError: If the file has no rows.
+        RuntimeError: If scoring reports an error.
+    """
+    rows = 0
+    with open(input_path, "rb") as stream, open(result_path, "w", newline="") as out:
+        chunks = ingest_chunks(iter_csv_chunks(stream, chunk_rows, text_columns=text_columns),
+                               score_chunk=score_chunk, persist_chunk=persist_chunk)
+        try:
+            for chunk in chunks:
+                chunk.to_csv(out, index=False, header=(rows == 0))
+                rows += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(rows, stream.tell())
+        except pd.errors.EmptyDataError:
+            pass
+    if rows == 0:
+        raise ValueError("Uploaded file is empty.")
+    return rows
+
+
+class _Job:
+    """One submitted job: its directory and the status this process last wrote."""
+
+    __slots__ = ("job_id", "directory", "status")
+
+    def __init__(self, job_id: str, directory: str, status: dict):
+        self.job_id = job_id
+        self.directory = directory
+        self.status = status
+
+
+class UploadJobs:
+    """
+    Bounded pool of background threads running upload jobs, with on-disk status.
+
+    Args:
+        run (Callable[[str, str, Callable], int]): Processes one job as
+            run(input_path, result_path, on_chunk) and returns the scored row
+            count (see `score_csv_file`); on_chunk(rows_done, bytes_read)
+            reports progress.
+        root (str): Directory holding one subdirectory per job.
+        max_workers (int): Jobs run concurrently by this process.
+        max_queued (int): Jobs waiting for a worker before `submit` refuses more.
+        ttl_s (float): Finished jobs (files included) are removed after this long.
+        nice (int): Niceness added to job threads (0 = same priority as requests).
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, str, Callable[[int, int], None]], int],
+        root: str = os.path.join("uploads", "jobs"),
+        max_workers: int = 1,
+        max_queued: int = 8,
+        ttl_s: float = 3600.0,
+        nice: int = 10,
+        name: str = "upload-job",
+    ):
+        if max_workers < 1 or max_queued < 0:
+            raise ValueError("max_workers must be >= 1 and max_queued >= 0")
+
+        self.run = run
+        self.root = root
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.ttl_s = ttl_s
+        self.nice = nice
+        self.name = name
+
+        self._queue: deque = deque()
+        self._running = 0
+        self._reserved = 0  # slots held by uploads still being saved
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # Counters (read via stats())
+        self._submitted = 0
+        self._rejected = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._rows = 0
+
+        self._threads = []
+        self._start_threads()
+
+    def _start_threads(self) -> None:
+        self._threads = [threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+                         for i in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    # ─────────────────────────────────────────
+    # Status files
+    # ─────────────────────────────────────────
+    def _directory(self, job_id: str) -> Optional[str]:
+        """Job directory for a well-formed id (never a path outside the root)."""
+        if not isinstance(job_id, str) or not _JOB_ID.match(job_id):
+            return None
+        return os.path.join(self.root, job_id)
+
+    @staticmethod
+    def _write_status(directory: str, status: dict) -> None:
+        tmp = os.path.join(directory, f"status.json.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp, "w") as f:
+            json.dump(status, f)
+        os.replace(tmp, os.path.join(directory, "status.json"))
+
+    def _update(self, job: _Job, **changes) -> None:
+        job.status.update(changes)
+        self._write_status(job.directory, job.status)
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """
+        Current status of a job submitted by any process on this host.
+
+        Returns:
+            dict: job_id, state, filename, timestamps, rows_done, bytes_read,
+            bytes_total, progress (0..1), and result_rows or error once
+            finished; None for an unknown or expired job.
+        """
+        directory = self._directory(job_id)
+        if directory is None:
+            return None
+        try:
+            with open(os.path.join(directory, "status.json")) as f:
+                status = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # The owning worker process died (restart, OOM kill): the job will never finish
+        if status["state"] not in FINISHED and not self._process_alive(status["pid"]):
+            status.update(state=FAILED, error="Worker process exited before the job finished")
+        return status
+
+    def result_path(self, job_id: str) -> Optional[str]:
+        """Path of a succeeded job's scored CSV, else None."""
+        status = self.status(job_id)
+        if status is None or status["state"] != SUCCEEDED:
+            return None
+        return os.path.join(self._directory(job_id), "result.csv")
+
+    # ─────────────────────────────────────────
+    # Submission
+    # ─────────────────────────────────────────
+    def submit(self, save_input: Callable[[str], None], filename: str) -> dict:
+        """
+        Register a job: store its input via `save_input(path)` and queue it.
+
+        Args:
+            save_input (Callable[[str], None]): Writes the uploaded file to the given path
+                (e.g. werkzeug `FileStorage.save`).
+            filename (str): Original file name (reported in the status).
+
+        Returns:
+            dict: The initial (queued) status.
+
+        Raises:
+            JobQueueFull: If this process already runs `max_workers` and queues `max_queued` jobs.
+            RuntimeError: If the pool has been closed.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("UploadJobs is closed")
+            if self._running + len(self._queue) + self._reserved >= self.max_workers + self.max_queued:
+                self._rejected += 1
+                raise JobQueueFull(f"Too many upload jobs in progress ({self._running} running, "
+                                   f"{len(self._queue) + self._reserved} queued); retry later")
+            # Hold the slot while the file is being saved
+            self._reserved += 1
+
+        try:
+            self._purge_expired()
+            job_id = uuid.uuid4().hex
+            directory = os.path.join(self.root, job_id)
+            os.makedirs(directory)
+            input_path = os.path.join(directory, "input.csv")
+            save_input(input_path)
+            job = _Job(job_id, directory, {
+                "job_id": job_id, "state": QUEUED, "filename": filename, "pid": os.getpid(),
+                "submitted_at": time.time(), "started_at": None, "finished_at": None,
+                "rows_done": 0, "bytes_read": 0, "bytes_total": os.path.getsize(input_path),
+                "progress": 0.0, "result_rows": None, "error": None,
+            })
+            self._write_status(directory, job.status)
+        except BaseException:
+            with self._cond:
+                self._reserved -= 1
+            raise
+
+        with self._cond:
+            self._reserved -= 1
+            self._queue.append(job)
+            self._submitted += 1
+            self._cond.notify()
+        return dict(job.status)
+
+    def _purge_expired(self) -> None:
+        """Remove job directories whose job finished more than `ttl_s` ago (any process's)."""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - self.ttl_s
+        for job_id in os.listdir(self.root):
+            status = self.status(job_id)
+            if status is None:
+                continue
+            finished = status["finished_at"] or (status["submitted_at"] if status["state"] == FAILED else None)
+            if finished is not None and finished < cutoff:
+                shutil.rmtree(os.path.join(self.root, job_id), ignore_errors=True)
+
+    # ─────────────────────────────────────────
+    # Job threads
+    # ─────────────────────────────────────────
+    def _lower_priority(self) -> None:
+        """Best effort: on Linux niceness is per thread, so only job threads are deprioritized."""
+        if self.nice and hasattr(os, "setpriority") and hasattr(threading, "get_native_id"):
+            try:
+                tid = threading.get_native_id()
+                os.setpriority(os.PRIO_PROCESS, tid, os.getpriority(os.PRIO_PROCESS, tid) + self.nice)
+            except OSError as e:
+                print(f"⚠️ Could not lower upload job thread priority: {e}")
+
+    def _next_job(self) -> Optional[_Job]:
+        """Block until a job is queued; None once closed and drained."""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            self._running += 1
+            return self._queue.popleft()
+
+    def _execute(self, job: _Job) -> None:
+        directory = job.directory
+        input_path = os.path.join(directory, "input.csv")
+        partial_path = os.path.join(directory, "result.csv.part")
+        total = job.status["bytes_total"]
+
+        def on_chunk(rows_done: int, bytes_read: int) -> None:
+            self._update(job, rows_done=rows_done, bytes_read=bytes_read,
+                         progress=round(min(bytes_read / total, 1.0), 4) if total else 0.0)
+
+        self._update(job, state=RUNNING, started_at=time.time())
+        try:
+            rows = self.run(input_path, partial_path, on_chunk)
+            os.replace(partial_path, os.path.join(directory, "result.csv"))
+            self._update(job, state=SUCCEEDED, finished_at=time.time(), progress=1.0,
+                         rows_done=rows, result_rows=rows)
+            self._succeeded += 1
+            self._rows += rows
+        except Exception as e:
+            print(f"❌ [ERROR] upload job {job.job_id}: {e}")
+            self._update(job, state=FAILED, finished_at=time.time(), error=str(e))
+            self._failed += 1
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+
+    def _worker(self) -> None:
+        self._lower_priority()
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._execute(job)
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+    # ─────────────────────────────────────────
+    # Lifecycle & introspection
+    # ─────────────────────────────────────────
+    def after_fork(self) -> None:
+        """Re-arm in a forked child: fresh queue, condition and job threads."""
+        self._queue = deque()
+        self._running = self._reserved = 0
+        self._cond = threading.Condition()
+        self._submitted = self._rejected = self._succeeded = self._failed = self._rows = 0
+        if not self._closed:
+            self._start_threads()
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop accepting jobs and let the threads exit once the queue is drained."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: This process's running/queued jobs, limits and submitted,
+            rejected, succeeded, failed and scored-row counters.
+        """
+        return {
+            "running": self._running,
+            "queued": len(self._queue) + self._reserved,
+            "max_workers": self.max_workers,
+            "max_queued": self.max_queued,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "succeeded": self._succeeded,
+            "failed": self._failed,
+            "rows": self._rows,
+        }
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/metrics.py
+
+Minimal in-process metrics with Prometheus text exposition (format 0.0.4).
+
+Counters and histograms are plain lock-protected dicts keyed by label
+values, so recording costs a bisect and a few additions; callback metrics
+read existing stats (writer queue, pool, caches) only when /metrics is
+scraped. Each worker process exposes its own series, as with any
+per-process Prometheus target. METRICS_ENABLED=0 turns recording into a
+no-op.
+"""
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: 100µs (compiled single-lead transform) up to 30s (large CSV uploads)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._children[labelvalues] = self._children.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._children.get(labelvalues, 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._children.items())
+        for labelvalues, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class _Timer:
+    """Context manager observing elapsed wall time into a histogram."""
+
+    __slots__ = ("histogram", "labelvalues", "t0")
+
+    def __init__(self, histogram: "Histogram", labelvalues: tuple):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.t0, *self.labelvalues)
+        return False
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket distribution (count, sum, le buckets) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues) -> None:
+        if not METRICS_ENABLED:
+            return
+        i = bisect_left(self.buckets, value)  # first bucket with value <= bound
+        with self._lock:
+            child = self._children.get(labelvalues)
+            if child is None:
+                child = self._children[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            child[0][i] += 1
+            child[1] += value
+            child[2] += 1
+
+    def time(self, *labelvalues) -> _Timer:
+        """`with histogram.time("predict_lead", "transform"): ...`"""
+        return _Timer(self, labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        child = self._children.get(labelvalues)
+        return child[2] if child is not None else 0
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._children.items())
+        for labelvalues, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = (("le", _number(bound)),)
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {n}"
+
+
+class CallbackMetric(_Metric):
+    """
+    Gauge or counter whose values are read at scrape time.
+
+    Args:
+        collect (Callable): Returns {labelvalues tuple: value}; a failing
+            callback simply contributes no samples.
+        kind (str): "gauge" or "counter".
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str],
+                 collect: Callable[[], Dict[tuple, float]], kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def _samples(self):
+        try:
+            values = self.collect()
+        except Exception:
+            return
+        for labelvalues, value in sorted(values.items()):
+            if value is not None:
+                yield f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Registry:
+    """Ordered set of metrics rendered together by /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def after_fork(self) -> None:
+        """Forked child: fresh locks and empty series (workers report only their own traffic)."""
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+            metric._children = {}
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def timed_iter(iterable: Iterable, histogram: Histogram, *labelvalues) -> Iterator:
+    """Yield from `iterable`, observing how long each item took to produce."""
+    it = iter(iterable)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        histogram.observe(time.perf_counter() - t0, *labelvalues)
+        yield item
+
+
+# ─────────────────────────────────────────────
+# Application metrics (shared by prediction.py and routes.py)
+# ─────────────────────────────────────────────
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    "lead_scoring_requests_total", "HTTP requests by endpoint, method and status code.",
+    ("endpoint", "method", "status")))
+REQUEST_SECONDS = registry.register(Histogram(
+    "lead_scoring_request_duration_seconds",
+    "Time to produce the response (streamed uploads: until the body starts).",
+    ("endpoint", "method")))
+ERRORS = registry.register(Counter(
+    "lead_scoring_errors_total", "Failed scoring or ingest operations.", ("operation",)))
+STAGE_SECONDS = registry.register(Histogram(
+    "lead_scoring_stage_duration_seconds", "Time spent in each stage of a scoring operation.",
+    ("operation", "stage")))
+BATCH_ROWS = registry.register(Histogram(
+    "lead_scoring_batch_rows", "Leads per batch scoring call.", ("operation",), buckets=ROW_BUCKETS))
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.after_fork)
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/model_manager.py
+
+Hot-swappable holder for the serving preprocessor + classifier pair.
+
+A background thread polls the MLflow registry for the versions currently in
+`stage`. When either changes, the new pair is checked for pairing (a model
+version tagged `preprocessor_version` only runs with that preprocessor),
+loaded, checked for compatibility and warmed off the request path, then published with a single
+reference assignment. Request code grabs one `ModelBundle` via `current()` and
+uses only that bundle, so it never mixes a preprocessor from one version with
+a model from another.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.ml.registry.model_registry import PAIRED_PREPROCESSOR_TAG
+from .compiled_scorer import try_compile
+from .native_booster import try_native
+
+
+class ModelBundle:
+    """
+    Immutable snapshot of a matched preprocessor/model pair and its compiled scorer.
+
+    `predictor` is what serving calls `predict_proba` on: the model itself, or
+    a NativeBoosterPredictor wrapping it.
+    """
+
+    __slots__ = ("preprocessor", "model", "predictor", "scorer", "preprocessor_version", "model_version",
+                 "loaded_at")
+
+    def __init__(self, preprocessor, model, preprocessor_version: str, model_version: str, predictor=None):
+        self.preprocessor = preprocessor
+        self.model = model
+        self.predictor = predictor if predictor is not None else model
+        self.preprocessor_version = str(preprocessor_version)
+        self.model_version = str(model_version)
+        self.scorer = try_compile(preprocessor, self.predictor)
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+
+    @property
+    def versions(self) -> dict:
+        return {"preprocessor": self.preprocessor_version, "model": self.model_version}
+
+
+class IncompatiblePair(ValueError):
+    """The registered preprocessor and model were not built for each other (e.g. half-promoted)."""
+
+
+def check_compatible(preprocessor, model) -> None:
+    """
+    Ensure the model was trained on exactly the features the preprocessor emits.
+
+    Raises:
+        IncompatiblePair: If feature counts or (when recorded) feature names differ.
+    """
+    preprocessing = preprocessor.named_steps["preprocessing"]
+    selected = list(preprocessor.named_steps["feature_selection"].selected_features)
+    names = [str(n) for n in np.asarray(preprocessing.get_feature_names_out())[selected]]
+
+    n_model = getattr(model, "n_features_in_", None)
+    if n_model is not None and n_model != len(names):
+        raise IncompatiblePair(f"Model expects {n_model} features, preprocessor emits {len(names)}")
+
+    model_names = getattr(model, "feature_names_in_", None)
+    if model_names is not None and [str(n) for n in model_names] != names:
+        raise IncompatiblePair("Model feature names do not match the preprocessor's selected features")
+
+
+def warmup_record(preprocessor) -> dict:
+    """An all-missing raw lead covering every column the preprocessor reads."""
+    columns = preprocessor.named_steps["preprocessing"].feature_names_in_
+    return {col: None for col in columns}
+
+
+def limit_n_jobs(estimator, n_jobs: int) -> None:
+    """Cap an estimator's own parallelism (`n_jobs`, incl. nested estimators) at `n_jobs`."""
+    if not hasattr(estimator, "get_params"):
+        return
+    keys = [k for k in estimator.get_params(deep=True) if k == "n_jobs" or k.endswith("__n_jobs")]
+    if keys:
+        estimator.set_params(**{k: n_jobs for k in keys})
+
+
+def _mlflow_loader(name: str, version: str):
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(f"models:/{name}/{version}")
+
+
+class ModelManager:
+    """
+    Load, poll and atomically swap the serving preprocessor + model pair.
+
+    Args:
+        preprocessor_name (str): Registry name of the preprocessing pipeline.
+        model_name (str): Registry name of the classifier.
+        stage (str): Registry stage to follow (e.g. "Production").
+        poll_interval (float): Seconds between registry polls; 0 disables polling.
+        loader (Callable[[str, str], object], optional): Loads (name, version);
+            defaults to `mlflow.sklearn.load_model("models:/name/version")`.
+        resolver (Callable[[str, str], str], optional): Returns the version of
+            (name, stage); defaults to asking the registry client.
+        client (MlflowClient, optional): Registry client (created lazily).
+        model_n_jobs (int, optional): Cap applied to each loaded model's `n_jobs`
+            so per-request predict_proba doesn't fan out across every core.
+            Also the thread count of native booster scoring.
+        native_boosters (bool): Score XGBoost/LightGBM classifiers through their
+            native booster API (after a parity check against the wrapper).
+    """
+
+    def __init__(
+        self,
+        preprocessor_name: str,
+        model_name: str,
+        stage: str = "Production",
+        poll_interval: float = 60.0,
+        loader: Optional[Callable[[str, str], object]] = None,
+        resolver: Optional[Callable[[str, str], str]] = None,
+        client=None,
+        model_n_jobs: Optional[int] = None,
+        native_boosters: bool = True,
+    ):
+        self.preprocessor_name = preprocessor_name
+        self.model_name = model_name
+        self.stage = stage
+        self.poll_interval = poll_interval
+        self.loader = loader or _mlflow_loader
+        self.resolver = resolver
+        self._client = client
+        self.model_n_jobs = model_n_jobs
+        self.native_boosters = native_boosters
+
+        self._bundle: Optional[ModelBundle] = None
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.swaps: List[dict] = []
+        self.last_poll: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.pending: Optional[dict] = None
+        self._rejected: Optional[dict] = None
+        self._paired: dict = {}  # model version → preprocessor version it was built for (or None)
+
+    # ─────────────────────────────────────────
+    # Registry access
+    # ─────────────────────────────────────────
+    @property
+    def client(self):
+        if self._client is None:
+            from mlflow.tracking import MlflowClient
+            self._client = MlflowClient()
+        return self._client
+
+    def _latest_version(self, name: str) -> str:
+        if self.resolver is not None:
+            return str(self.resolver(name, self.stage))
+        versions = self.client.get_latest_versions(name, stages=[self.stage])
+        if not versions:
+            raise LookupError(f"No '{self.stage}' version registered for '{name}'")
+        return str(max(int(v.version) for v in versions))
+
+    def paired_preprocessor(self, model_version: str) -> Optional[str]:
+        """
+        Preprocessor version the model version was built for (its
+        `preprocessor_version` tag), or None if untagged or the registry
+        cannot be reached (the feature check in `check_compatible` still applies).
+        """
+        if model_version not in self._paired:
+            try:
+                tags = self.client.get_model_version(self.model_name, model_version).tags or {}
+            except Exception:
+                return None
+            self._paired[model_version] = tags.get(PAIRED_PREPROCESSOR_TAG)
+        return self._paired[model_version]
+
+    def check_paired(self, versions: dict) -> None:
+        """
+        Raises:
+            IncompatiblePair: If the model version is tagged for another preprocessor version.
+        """
+        paired = self.paired_preprocessor(versions["model"])
+        if paired is not None and str(paired) != versions["preprocessor"]:
+            raise IncompatiblePair(f"Model v{versions['model']} was built for preprocessor v{paired}, "
+                                   f"'{self.stage}' has v{versions['preprocessor']}")
+
+    def registry_versions(self) -> dict:
+        """Versions currently in `stage` for both registry names."""
+        return {
+            "preprocessor": self._latest_version(self.preprocessor_name),
+            "model": self._latest_version(self.model_name),
+        }
+
+    # ─────────────────────────────────────────
+    # Loading & swapping
+    # ─────────────────────────────────────────
+    def current(self) -> ModelBundle:
+        """
+        The active bundle. Grab it once per request and use only its members.
+
+        Raises:
+            RuntimeError: If no bundle has been loaded yet.
+        """
+        bundle = self._bundle
+        if bundle is None:
+            raise RuntimeError("No model loaded yet")
+        return bundle
+
+    def install(self, preprocessor, model, preprocessor_version: str = "local",
+                model_version: str = "local") -> ModelBundle:
+        """
+        Publish an in-memory pair directly (local runs, load tests, benchmarks).
+        """
+        check_compatible(preprocessor, model)
+        predictor = self._predictor_for(model, preprocessor)
+        bundle = ModelBundle(preprocessor, model, preprocessor_version, model_version, predictor)
+        with self._swap_lock:
+            self._bundle = bundle
+        return bundle
+
+    def _predictor_for(self, model, preprocessor):
+        """Native booster wrapper for `model` if enabled and it matches the wrapper, else None."""
+        if not self.native_boosters:
+            return None
+        X_warm = preprocessor.transform(pd.DataFrame([warmup_record(preprocessor)]))
+        if sparse.issparse(X_warm):
+            X_warm = X_warm.toarray()
+        X_check = np.vstack([
+            np.asarray(X_warm, dtype=np.float64),
+            np.random.default_rng(0).standard_normal((256, X_warm.shape[1])),
+        ])
+        return try_native(model, X_check, n_threads=self.model_n_jobs)
+
+    def _build(self, versions: dict):
+        """
+        Load (or reuse) both halves for `versions`, verify and warm them.
+
+        Returns:
+            Tuple[ModelBundle, dict]: The new bundle and its load/warm timings.
+        """
+        current = self._bundle
+        timings = {}
+        self.check_paired(versions)
+
+        t0 = time.perf_counter()
+        if current is not None and current.preprocessor_version == versions["preprocessor"]:
+            preprocessor = current.preprocessor
+        else:
+            preprocessor = self.loader(self.preprocessor_name, versions["preprocessor"])
+        if current is not None and current.model_version == versions["model"]:
+            model = current.model
+        else:
+            model = self.loader(self.model_name, versions["model"])
+            if self.model_n_jobs is not None:
+                limit_n_jobs(model, self.model_n_jobs)
+        timings["load_s"] = time.perf_counter() - t0
+
+        check_compatible(preprocessor, model)
+
+        t0 = time.perf_counter()
+        if current is not None and current.model is model:
+            predictor = current.predictor
+        else:
+            predictor = self._predictor_for(model, preprocessor)
+        bundle = ModelBundle(preprocessor, model, versions["preprocessor"], versions["model"], predictor)
+        record = warmup_record(preprocessor)
+        bundle.predictor.predict_proba(preprocessor.transform(pd.DataFrame([record])))
+        if bundle.scorer is not None:
+            bundle.scorer.predict_proba_one(record)
+        timings["warm_s"] = time.perf_counter() - t0
+        return bundle, timings
+
+    def load_initial(self) -> ModelBundle:
+        """
+        Synchronously load the pair currently in `stage` (call once at startup).
+
+        Raises:
+            Exception: Any registry/load/compatibility error.
+        """
+        t0 = time.perf_counter()
+        versions = self.registry_versions()
+        bundle, timings = self._build(versions)
+        with self._swap_lock:
+            self._bundle = bundle
+        self._record_swap(None, bundle, timings, time.perf_counter() - t0)
+        print(f"✅ Loaded preprocessor v{bundle.preprocessor_version} and model v{bundle.model_version} (stage={self.stage})")
+        return bundle
+
+    def check_for_update(self) -> bool:
+        """
+        Poll the registry once; load, warm and swap if the versions changed.
+
+        Returns:
+            bool: True if a new bundle was published.
+        """
+        self.last_poll = datetime.now().isoformat(timespec="seconds")
+        t0 = time.perf_counter()
+        versions = None
+        try:
+            versions = self.registry_versions()
+            current = self._bundle
+            if current is not None and versions == current.versions:
+                self.pending = None
+                return False
+            if versions == self._rejected:
+                return False  # same mismatched pair as last poll; wait for the other half
+
+            bundle, timings = self._build(versions)
+        except IncompatiblePair as e:
+            # Half-promoted pair (e.g. new preprocessor, old model): keep serving the current one
+            self._rejected = versions
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.pending = {"versions": versions, "error": self.last_error}
+            print(f"⚠️ Model update deferred until both halves match: {self.last_error}")
+            return False
+        except Exception as e:
+            # Registry/load/warmup failures (incl. other ValueErrors): keep serving the current pair and retry next poll
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.pending = {"versions": versions, "error": self.last_error}
+            print(f"⚠️ Model update skipped: {self.last_error}")
+            return False
+
+        with self._swap_lock:
+            previous, self._bundle = self._bundle, bundle
+        self.pending = None
+        self.last_error = None
+        self._record_swap(previous, bundle, timings, time.perf_counter() - t0)
+        print(f"🔄 Swapped to preprocessor v{bundle.preprocessor_version} / model v{bundle.model_version}")
+        return True
+
+    def _record_swap(self, previous: Optional[ModelBundle], bundle: ModelBundle,
+                     timings: dict, total: float) -> None:
+        self.swaps.append({
+            "at": bundle.loaded_at,
+            "from": previous.versions if previous is not None else None,
+            "to": bundle.versions,
+            "load_s": round(timings["load_s"], 4),
+            "warm_s": round(timings["warm_s"], 4),
+            "total_s": round(total, 4),
+        })
+        del self.swaps[:-20]
+
+    # ─────────────────────────────────────────
+    # Background polling
+    # ─────────────────────────────────────────
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.check_for_update()
+
+    def start(self) -> None:
+        """Start the background poller (no-op if polling is disabled or already running)."""
+        if self.poll_interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="model-manager-poller", daemon=True)
+        self._thread.start()
+
+    def after_fork(self) -> None:
+        """
+        Re-arm in a forked child: new lock/event and, if the parent was polling,
+        a poller of its own (the inherited bundle keeps being served meanwhile).
+        """
+        was_polling = self._thread is not None and not self._stop.is_set()
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if was_polling:
+            self.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        """
+        Returns:
+            dict: Active versions, stage, polling info, pending/failed update and recent swap timings.
+        """
+        bundle = self._bundle
+        return {
+            "stage": self.stage,
+            "active": bundle.versions if bundle is not None else None,
+            "loaded_at": bundle.loaded_at if bundle is not None else None,
+            "compiled_scorer": bundle is not None and bundle.scorer is not None,
+            "predictor": repr(bundle.predictor) if bundle is not None and bundle.predictor is not bundle.model
+            else "sklearn",
+            "poll_interval_s": self.poll_interval,
+            "last_poll": self.last_poll,
+            "last_error": self.last_error,
+            "pending": self.pending,
+            "swaps": list(self.swaps),
+        }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/native_booster.py
+
+Serve XGBoost / LightGBM classifiers through their native booster API.
+
+The sklearn wrappers' `predict_proba` validates input, handles DataFrames and
+converts dtypes on every call. For a binary classifier the booster itself can
+score a contiguous float32 matrix directly (XGBoost `inplace_predict`,
+LightGBM `Booster.predict`) with a fixed thread count; `NativeBoosterPredictor`
+wraps that behind the same `predict_proba` interface the serving code uses.
+"""
+
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+# Largest |native - wrapper| probability difference accepted by the load-time parity check
+PARITY_ATOL = 1e-6
+
+
+class NativeBoosterPredictor:
+    """
+    `predict_proba` for a fitted binary XGBClassifier / LGBMClassifier via its booster.
+
+    Args:
+        model: The fitted sklearn-API classifier (kept for reference/introspection).
+        n_threads (int, optional): Threads per prediction call; None keeps the
+            library default.
+
+    Raises:
+        ValueError: If the model isn't a supported binary booster classifier.
+    """
+
+    def __init__(self, model, n_threads: Optional[int] = None):
+        self.model = model
+        self.n_threads = n_threads
+        self.kind = booster_kind(model)
+        if self.kind is None:
+            raise ValueError(f"{type(model).__name__} is not an XGBoost/LightGBM classifier")
+        if len(getattr(model, "classes_", [])) != 2:
+            raise ValueError("Native booster scoring supports binary classifiers only")
+        self.n_features_in_ = getattr(model, "n_features_in_", None)
+        self.classes_ = model.classes_
+
+        if self.kind == "xgboost":
+            self.booster = model.get_booster()
+            objective = model.get_xgb_params().get("objective")
+            if objective != "binary:logistic":
+                raise ValueError(f"Unsupported XGBoost objective '{objective}'")
+            if n_threads is not None:
+                self.booster.set_param({"nthread": int(n_threads)})
+            best = getattr(self.booster, "best_iteration", None)
+            self._iteration_range = (0, int(best) + 1) if best is not None else (0, 0)
+            # Same missing-value marker as the wrapper (e.g. 0.0 for models trained on CSR input)
+            missing = getattr(model, "missing", np.nan)
+            self._missing = np.nan if missing is None else float(missing)
+        else:
+            self.booster = model.booster_
+            objective = model.booster_.params.get("objective", model.objective_)
+            if objective not in ("binary", "binary_logloss", "cross_entropy", "xentropy"):
+                raise ValueError(f"Unsupported LightGBM objective '{objective}'")
+            self._num_iteration = getattr(model, "best_iteration_", None) or None
+            self._predict_kwargs = {"num_threads": int(n_threads)} if n_threads is not None else {}
+
+    @staticmethod
+    def _as_float32(X):
+        if sparse.issparse(X):
+            return X.tocsr().astype(np.float32, copy=False)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Positive-class probability per row (1-D)."""
+        X = self._as_float32(X)
+        if self.kind == "xgboost":
+            p = self.booster.inplace_predict(X, iteration_range=self._iteration_range, missing=self._missing,
+                                             predict_type="value", validate_features=False)
+        else:
+            p = self.booster.predict(X, num_iteration=self._num_iteration, **self._predict_kwargs)
+        return np.asarray(p, dtype=np.float64).reshape(-1)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Same (n_rows, 2) layout as the sklearn wrapper's `predict_proba`."""
+        p = self.predict_positive(X)
+        return np.column_stack((1.0 - p, p))
+
+    def __repr__(self) -> str:
+        return f"NativeBoosterPredictor({self.kind}, n_threads={self.n_threads})"
+
+
+def booster_kind(model) -> Optional[str]:
+    """'xgboost', 'lightgbm' or None, without importing either library."""
+    module = type(model).__module__.split(".")[0]
+    if module == "xgboost" and hasattr(model, "get_booster"):
+        return "xgboost"
+    if module == "lightgbm" and hasattr(model, "booster_"):
+        return "lightgbm"
+    return None
+
+
+def try_native(model, X_check=None, n_threads: Optional[int] = None) -> Optional[NativeBoosterPredictor]:
+    """
+    Wrap `model` for native scoring, or return None to keep the sklearn wrapper.
+
+    Args:
+        model: Fitted classifier.
+        X_check (array-like, optional): Preprocessed rows for a parity check
+            against `model.predict_proba`; on mismatch the wrapper is kept.
+        n_threads (int, optional): Threads per prediction call.
+    """
+    if booster_kind(model) is None:
+        return None
+    try:
+        predictor = NativeBoosterPredictor(model, n_threads=n_threads)
+        if X_check is not None:
+            expected = np.asarray(model.predict_proba(X_check))[:, 1]
+            got = predictor.predict_positive(X_check)
+            diff = float(np.max(np.abs(got - expected))) if len(expected) else 0.0
+            if diff > PARITY_ATOL:
+                raise ValueError(f"parity check failed (max |diff| = {diff:.2e})")
+        print(f"✅ Native {predictor.kind} booster scoring enabled (threads={n_threads or 'default'})")
+        return predictor
+    except Exception as e:
+        print(f"⚠️ Native booster scoring unavailable, using {type(model).__name__}.predict_proba: {e}")
+        return None
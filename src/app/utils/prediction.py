@@ -5,15 +5,19 @@ predict.py
 Provides single-record and batch prediction functions for the Lead Scoring model.
 Loads the preprocessing pipeline and trained classifier from the MLflow registry,
 applies transforms, saves preprocessed features to Postgres (for batch), and returns predictions.
+
+The pair is held by a ModelManager that polls the registry and hot-swaps newly
+promoted versions; every call works on one `manager.current()` bundle.
 """
 
 import os
 import sys
-from typing import Union, List
+import atexit
+from typing import Dict, Union, List, Tuple
 
 import pandas as pd
 import numpy as np
-import mlflow.sklearn
+from scipy import sparse
 
 # ─────────────────────────────────────────────
 # Add project root to PYTHONPATH for local imports
@@ -24,6 +28,13 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.ml.data_loader.data_loader import save_dataframe_to_postgres
+from src.ml.registry.artifact_cache import get_artifact_cache
+from .model_manager import ModelManager
+from .batching import RequestCoalescer
+from .feature_writer import BackgroundWriter
+from .prediction_cache import PredictionCache, RedisBackend, canonical_key
+from .ingest import categorical_columns
+from .metrics import registry, CallbackMetric, STAGE_SECONDS, BATCH_ROWS, ERRORS
 
 # ─────────────────────────────────────────────
 # Constants: MLflow model registry names and target stage
@@ -32,21 +43,290 @@ PREPROCESSOR_NAME = "LeadScoringPreprocessor"
 MODEL_NAME = "LeadScoringBestModel"
 STAGE = "Production"
 
+# Seconds between registry polls for newly promoted versions (0 disables hot swapping)
+MODEL_POLL_INTERVAL = float(os.getenv("MODEL_POLL_INTERVAL_SECONDS", "60"))
+
+# Optional cap on the classifier's n_jobs (set per worker by src/app/gunicorn.conf.py)
+MODEL_N_JOBS = int(os.environ["MODEL_N_JOBS"]) if os.getenv("MODEL_N_JOBS") else None
+
+# Score XGBoost/LightGBM winners through the native booster API (NATIVE_BOOSTER=0 keeps the wrapper)
+NATIVE_BOOSTER_ENABLED = os.getenv("NATIVE_BOOSTER", "1").lower() in ("1", "true", "yes")
+
+# Load registry artifacts through the host-local cache (MODEL_CACHE_DIR / MODEL_CACHE_MAX_MB)
+MODEL_CACHE_ENABLED = os.getenv("MODEL_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+artifact_cache = get_artifact_cache() if MODEL_CACHE_ENABLED else None
+
 # ─────────────────────────────────────────────
 # Load preprocessing pipeline & classifier from MLflow registry
+#   Full pipeline: feature_engineering → preprocessing → feature_selection
+#   Classifier for predict_proba
 # ─────────────────────────────────────────────
+manager = ModelManager(
+    preprocessor_name=PREPROCESSOR_NAME,
+    model_name=MODEL_NAME,
+    stage=STAGE,
+    poll_interval=MODEL_POLL_INTERVAL,
+    loader=artifact_cache.load_model if artifact_cache else None,
+    resolver=artifact_cache.resolve if artifact_cache else None,
+    model_n_jobs=MODEL_N_JOBS,
+    native_boosters=NATIVE_BOOSTER_ENABLED,
+)
 try:
-    # Full pipeline: feature_engineering → preprocessing → feature_selection
-    preprocessor_uri = f"models:/{PREPROCESSOR_NAME}/{STAGE}"
-    preprocessor = mlflow.sklearn.load_model(preprocessor_uri)
-
-    # Classifier for predict_proba
-    model_uri = f"models:/{MODEL_NAME}/{STAGE}"
-    model = mlflow.sklearn.load_model(model_uri)
-
-    print(f"✅ Loaded preprocessor and model (stage={STAGE})")
+    manager.load_initial()
 except Exception as e:
     raise RuntimeError(f"❌ Failed to load preprocessor or model: {e}")
+manager.start()
+atexit.register(manager.stop)
+
+# ─────────────────────────────────────────────
+# Optional micro-batching of concurrent /predict calls (opt-in via env)
+#   PREDICT_COALESCE=1, PREDICT_COALESCE_MAX_WAIT_MS (default 2), PREDICT_COALESCE_MAX_BATCH (default 64)
+# ─────────────────────────────────────────────
+COALESCE_ENABLED = os.getenv("PREDICT_COALESCE", "0").lower() in ("1", "true", "yes")
+COALESCE_MAX_WAIT_MS = float(os.getenv("PREDICT_COALESCE_MAX_WAIT_MS", "2"))
+COALESCE_MAX_BATCH = int(os.getenv("PREDICT_COALESCE_MAX_BATCH", "64"))
+
+
+# ─────────────────────────────────────────────
+# Single-lead probability cache, keyed by raw features + active versions
+#   PREDICTION_CACHE=1 (default), PREDICTION_CACHE_MAX_MB (default 64), PREDICTION_CACHE_TTL_S (default 3600)
+#   PREDICTION_CACHE_REDIS_URL: optional shared backend, e.g. redis://localhost:6379/0
+# ─────────────────────────────────────────────
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE", "1").lower() in ("1", "true", "yes")
+
+prediction_cache = None
+if PREDICTION_CACHE_ENABLED:
+    _cache_ttl = float(os.getenv("PREDICTION_CACHE_TTL_S", "3600"))
+    _redis_url = os.getenv("PREDICTION_CACHE_REDIS_URL")
+    _shared = None
+    if _redis_url:
+        try:
+            _shared = RedisBackend(_redis_url, ttl_s=_cache_ttl)
+        except ImportError:
+            print("⚠️ PREDICTION_CACHE_REDIS_URL is set but the 'redis' package is not installed; using local cache only")
+    prediction_cache = PredictionCache(
+        max_bytes=int(float(os.getenv("PREDICTION_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        ttl_s=_cache_ttl,
+        shared=_shared,
+    )
+
+
+# ─────────────────────────────────────────────
+# Preprocessed-feature persistence for predict_batch
+#   FEATURE_WRITE_MODE=async (default): queued and bulk-appended by a background writer
+#   FEATURE_WRITE_MODE=sync: written inline before returning, as before
+# ─────────────────────────────────────────────
+PREPROCESSED_TABLE = "user_uploaded_preprocessed"
+FEATURE_WRITE_MODE = os.getenv("FEATURE_WRITE_MODE", "async").lower()
+
+
+def _append_preprocessed(df_pre: pd.DataFrame) -> None:
+    save_dataframe_to_postgres(df_pre, table_name=PREPROCESSED_TABLE, if_exists="append")
+
+
+feature_writer = None
+if FEATURE_WRITE_MODE == "async":
+    feature_writer = BackgroundWriter(
+        _append_preprocessed,
+        flush_interval_s=float(os.getenv("FEATURE_WRITE_FLUSH_INTERVAL_S", "1.0")),
+        flush_rows=int(os.getenv("FEATURE_WRITE_FLUSH_ROWS", "10000")),
+        max_queue_rows=int(os.getenv("FEATURE_WRITE_MAX_QUEUE_ROWS", "200000")),
+        put_timeout_s=float(os.getenv("FEATURE_WRITE_PUT_TIMEOUT_S", "5.0")),
+    )
+    atexit.register(feature_writer.close)
+
+
+def _positive_proba(raw) -> np.ndarray:
+    """
+    Extract the positive-class probability column from `predict_proba` output.
+
+    Returns:
+        np.ndarray: 1-D array with one probability per row.
+
+    Raises:
+        ValueError: On an output shape we don't know how to interpret.
+    """
+    arr = np.asarray(raw)
+    if arr.ndim == 1:                           # e.g., regressors or single-proba
+        return arr
+    if arr.ndim == 2 and arr.shape[1] >= 2:
+        return arr[:, 1]                        # probability of positive class
+    if arr.ndim == 2 and arr.shape[1] == 1:
+        return arr[:, 0]
+    raise ValueError(f"Unexpected output shape: {arr.shape}")
+
+
+def predict_proba_records(records: List[dict]) -> List[float]:
+    """
+    Score several raw lead dicts with one vectorized model call.
+
+    Args:
+        records (List[dict]): Raw feature values, one dict per lead.
+
+    Returns:
+        List[float]: Conversion probability per record, in input order.
+    """
+    bundle = manager.current()
+    BATCH_ROWS.observe(len(records), "predict_coalesced")
+    with STAGE_SECONDS.time("predict_coalesced", "transform"):
+        if bundle.scorer is not None:
+            X_proc = bundle.scorer.transform_many(records)
+        else:
+            X_proc = bundle.preprocessor.transform(pd.DataFrame(records))
+    with STAGE_SECONDS.time("predict_coalesced", "predict_proba"):
+        raw = bundle.predictor.predict_proba(X_proc)
+    return [float(p) for p in _positive_proba(raw)]
+
+
+# Batches up to this size go through the compiled scorer, larger ones through pipeline.transform
+COMPILED_BATCH_MAX_ROWS = int(os.getenv("PREDICT_COMPILED_BATCH_MAX_ROWS", "1000"))
+
+
+def _complete_records(records: List[dict], columns) -> List[dict]:
+    """Rows with absent feature keys set to NaN, as `pd.DataFrame(records)` does."""
+    return [record if all(c in record for c in columns) else {**dict.fromkeys(columns, np.nan), **record}
+            for record in records]
+
+
+def predict_proba_batch(leads: Union[List[dict], Dict[str, list], pd.DataFrame]) -> Tuple[np.ndarray, dict]:
+    """
+    Score many leads with a single transform and a single `predict_proba` call.
+
+    Args:
+        leads (List[dict] | Dict[str, list] | pd.DataFrame): Raw feature values,
+            row-oriented (one dict per lead) or columnar (one list per feature).
+
+    Returns:
+        Tuple[np.ndarray, dict]: Positive-class probabilities in input order and
+        the preprocessor/model versions that produced them.
+    """
+    bundle = manager.current()
+    columnar = isinstance(leads, dict)
+    n_rows = len(next(iter(leads.values()), [])) if columnar else len(leads)
+    BATCH_ROWS.observe(n_rows, "predict_proba_batch")
+
+    # Row-oriented leads may omit keys: fill them in so both paths below impute them alike
+    if isinstance(leads, list):
+        columns = (bundle.scorer.required_columns if bundle.scorer is not None
+                   else getattr(bundle.preprocessor, "feature_names_in_", None))
+        if columns is not None:
+            leads = _complete_records(leads, columns)
+
+    with STAGE_SECONDS.time("predict_proba_batch", "transform"):
+        if bundle.scorer is not None and n_rows <= COMPILED_BATCH_MAX_ROWS:
+            # Small batches: the per-row compiled path avoids the pipeline's fixed overhead
+            if columnar:
+                records = [dict(zip(leads, values)) for values in zip(*leads.values())]
+            elif isinstance(leads, pd.DataFrame):
+                records = leads.to_dict(orient="records")
+            else:
+                records = leads
+            X_proc = bundle.scorer.transform_many(records)
+        else:
+            # Large batches: column-wise pandas transform wins
+            frame = leads if isinstance(leads, pd.DataFrame) else pd.DataFrame(leads)
+            X_proc = bundle.preprocessor.transform(frame)
+    with STAGE_SECONDS.time("predict_proba_batch", "predict_proba"):
+        raw = bundle.predictor.predict_proba(X_proc)
+    proba = _positive_proba(raw).astype(np.float64, copy=False)
+    return proba, dict(bundle.versions)
+
+
+coalescer = None
+if COALESCE_ENABLED:
+    coalescer = RequestCoalescer(
+        predict_proba_records,
+        max_wait_ms=COALESCE_MAX_WAIT_MS,
+        max_batch=COALESCE_MAX_BATCH,
+    )
+    atexit.register(coalescer.close)
+    print(f"✅ /predict coalescing enabled (max_wait={COALESCE_MAX_WAIT_MS}ms, max_batch={COALESCE_MAX_BATCH})")
+
+
+def _after_fork() -> None:
+    """
+    Forked workers of a preloaded app (see src/app/gunicorn.conf.py) share the
+    parent's models copy-on-write but need their own background threads and locks.
+    """
+    manager.after_fork()
+    if coalescer is not None:
+        coalescer.after_fork()
+    if feature_writer is not None:
+        feature_writer.after_fork()
+    if prediction_cache is not None:
+        prediction_cache.after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def model_status() -> dict:
+    """
+    Active preprocessor/model versions, polling state, recent swap timings
+    and (when enabled) artifact cache contents with cold/warm load times and
+    prediction cache counters.
+    """
+    status = manager.status()
+    if artifact_cache is not None:
+        status["artifact_cache"] = artifact_cache.stats()
+    if prediction_cache is not None:
+        status["prediction_cache"] = prediction_cache.stats()
+    return status
+
+
+def writer_status() -> dict:
+    """
+    Background feature-writer queue depth, row counters and flush latency.
+    """
+    if feature_writer is None:
+        return {"mode": FEATURE_WRITE_MODE}
+    return {"mode": FEATURE_WRITE_MODE, **feature_writer.stats()}
+
+
+# ─────────────────────────────────────────────
+# Scrape-time metrics: active versions, caches, background writer
+# ─────────────────────────────────────────────
+def _model_info() -> dict:
+    active = manager.current().versions
+    return {(PREPROCESSOR_NAME, active["preprocessor"], MODEL_NAME, active["model"]): 1}
+
+
+def _stat_collector(source, fields: dict):
+    """Collector mapping `source.stats()` keys to label values, e.g. {"hits": ("hit",)}."""
+    def collect() -> dict:
+        if source is None:
+            return {}
+        stats = source.stats()
+        return {labels: stats[key] for key, labels in fields.items()}
+    return collect
+
+
+registry.register(CallbackMetric(
+    "lead_scoring_model_info", "Active preprocessor/model versions (value is always 1).",
+    ("preprocessor", "preprocessor_version", "model", "model_version"), _model_info))
+registry.register(CallbackMetric(
+    "lead_scoring_prediction_cache_lookups_total", "Prediction cache lookups by result.", ("result",),
+    _stat_collector(prediction_cache, {"hits": ("hit",), "shared_hits": ("shared_hit",), "misses": ("miss",)}),
+    kind="counter"))
+registry.register(CallbackMetric(
+    "lead_scoring_prediction_cache_entries", "Entries held in the local prediction cache.", (),
+    _stat_collector(prediction_cache, {"entries": ()})))
+registry.register(CallbackMetric(
+    "lead_scoring_feature_writer_queue_rows", "Preprocessed rows waiting for the background writer.", (),
+    _stat_collector(feature_writer, {"queue_rows": ()})))
+registry.register(CallbackMetric(
+    "lead_scoring_feature_writer_rows_total", "Preprocessed rows by background-writer outcome.", ("outcome",),
+    _stat_collector(feature_writer, {"written_rows": ("written",), "dropped_rows": ("dropped",),
+                                     "failed_rows": ("failed",)}),
+    kind="counter"))
+
+
+def input_text_columns() -> List[str]:
+    """
+    Raw columns the loaded pipeline one-hot encodes (read as text when ingesting in chunks).
+    """
+    return categorical_columns(manager.current().preprocessor)
 
 
 def predict_lead(input_dict: dict) -> Union[float, dict]:
@@ -60,26 +340,40 @@ def predict_lead(input_dict: dict) -> Union[float, dict]:
         float: Probability of conversion, or dict with "error" on failure.
     """
     try:
-        # 1) Wrap input in DataFrame
-        df = pd.DataFrame([input_dict])
+        bundle = manager.current()
 
-        # 2) Apply full preprocessing pipeline
-        X_proc = preprocessor.transform(df)
+        # 0) Same lead, same versions: reuse the cached probability
+        key = None
+        if prediction_cache is not None:
+            with STAGE_SECONDS.time("predict_lead", "cache_lookup"):
+                columns = bundle.scorer.required_columns if bundle.scorer is not None else None
+                key = canonical_key(input_dict, bundle.versions, columns)
+                cached = prediction_cache.get(key)
+            if cached is not None:
+                return cached
 
-        # 3) Get raw probabilities
-        raw = model.predict_proba(X_proc)
-        arr = np.asarray(raw)
+        # 1) Coalesced mode: wait for this lead's slot in a shared batch
+        if coalescer is not None:
+            with STAGE_SECONDS.time("predict_lead", "coalesced_wait"):
+                proba = coalescer.submit(input_dict)
+        else:
+            # 2-3) Map raw input to selected features: compiled fast path, else the full pipeline
+            with STAGE_SECONDS.time("predict_lead", "transform"):
+                if bundle.scorer is not None:
+                    X_proc = bundle.scorer.transform_one(input_dict)
+                else:
+                    X_proc = bundle.preprocessor.transform(pd.DataFrame([input_dict]))
 
-        # 4) Handle output shapes
-        if arr.ndim == 1:               # e.g., regressors or single-proba
-            return float(arr[0])
-        if arr.ndim == 2 and arr.shape[1] >= 2:
-            return float(arr[0, 1])    # probability of positive class
-        if arr.ndim == 2 and arr.shape[1] == 1:
-            return float(arr[0, 0])
+            # 4) Get raw probabilities and pick the positive class
+            with STAGE_SECONDS.time("predict_lead", "predict_proba"):
+                raw = bundle.predictor.predict_proba(X_proc)
+            proba = float(_positive_proba(raw)[0])
 
-        return {"error": f"Unexpected output shape: {arr.shape}"}
+        if key is not None:
+            prediction_cache.set(key, proba)
+        return proba
     except Exception as e:
+        ERRORS.inc("predict_lead")
         return {"error": str(e)}
 
 
@@ -95,57 +389,68 @@ def predict_batch(df: pd.DataFrame, save: bool = True) -> Union[List[int], dict]
         List[int]: Binary predictions (0/1) list or dict with "error" on failure.
     """
     try:
-        # 1) Transform raw inputs through full pipeline
-        X_proc = preprocessor.transform(df)  # shape: (n_rows, n_selected_features)
+        # 1) Transform raw inputs through full pipeline (one bundle for the whole batch)
+        bundle = manager.current()
+        preprocessor, model = bundle.preprocessor, bundle.predictor
+        BATCH_ROWS.observe(len(df), "predict_batch")
+        with STAGE_SECONDS.time("predict_batch", "transform"):
+            X_proc = preprocessor.transform(df)  # shape: (n_rows, n_selected_features)
+
+        # 2) Generate predictions from classifier
+        with STAGE_SECONDS.time("predict_batch", "predict_proba"):
+            raw = model.predict_proba(X_proc)
+        arr = np.asarray(raw)
+        if arr.ndim == 1:
+            preds = [int(x > 0.5) for x in arr]
+        else:
+            preds = [int(x > 0.5) for x in arr[:, 1]]
 
         if save:
-            # 2) Retrieve full encoded feature names from preprocessing step
+            # 3) Retrieve full encoded feature names from preprocessing step
             preprocessing = preprocessor.named_steps["preprocessing"]
             all_feature_names = preprocessing.get_feature_names_out()  # e.g., 192 features
 
-            # 3) Retrieve indices of features selected by RFE
+            # 4) Retrieve indices of features selected by RFE
             selector = preprocessor.named_steps["feature_selection"]
             selected_indices = selector.selected_features  # e.g., 50 ints
 
-            # 4) Map indices to final feature names
+            # 5) Map indices to final feature names
             feature_names = [all_feature_names[i] for i in selected_indices]
 
-            # 5) Ensure names match transformed data shape
+            # 6) Ensure names match transformed data shape
             assert len(feature_names) == X_proc.shape[1], (
                 f"Expected {X_proc.shape[1]} names, got {len(feature_names)}"
             )
 
-            # 6) Build DataFrame of preprocessed features with real column names
-            df_pre = pd.DataFrame(X_proc, columns=feature_names)
-
-            # 7) Save to Postgres table for monitoring or drift checks
-            save_dataframe_to_postgres(
-                df_pre,
-                table_name="user_uploaded_preprocessed",
-                if_exists="append"
-            )
-            print(f"✅ Saved preprocessed batch to 'user_uploaded_preprocessed' with columns: {feature_names}")
+            # 7) Build DataFrame of preprocessed features with real column names
+            df_pre = pd.DataFrame(X_proc.toarray() if sparse.issparse(X_proc) else X_proc,
+                                  columns=feature_names)
 
-        # 8) Generate predictions from classifier
-        raw = model.predict_proba(X_proc)
-        arr = np.asarray(raw)
-        if arr.ndim == 1:
-            preds = [int(x > 0.5) for x in arr]
-        else:
-            preds = [int(x > 0.5) for x in arr[:, 1]]
+            # 8) Save to Postgres table for monitoring or drift checks
+            #    (async: queued for the background writer; the response doesn't wait)
+            if feature_writer is not None:
+                with STAGE_SECONDS.time("predict_batch", "save_enqueue"):
+                    feature_writer.submit(df_pre)
+            else:
+                with STAGE_SECONDS.time("predict_batch", "save"):
+                    _append_preprocessed(df_pre)
+                print(f"✅ Saved preprocessed batch to '{PREPROCESSED_TABLE}' with columns: {feature_names}")
 
         return preds
     except Exception as e:
+        ERRORS.inc("predict_batch")
         print("❌ [ERROR] in predict_batch:", e)
         return {"error": str(e)}
 
 
 # ─────────────────────────────────────────────
 # Debug: run sample predictions when executed directly
+#   (from src/: python -m app.utils.prediction)
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
     # Create a dummy input dict with zeros for every expected raw feature
-    sample = {col: 0 for col in preprocessor.feature_names_in_}
+    preprocessing = manager.current().preprocessor.named_steps["preprocessing"]
+    sample = {col: 0 for col in preprocessing.feature_names_in_}
     print("Single prediction:", predict_lead(sample))
 
     batch_df = pd.DataFrame([sample, sample])
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+src/app/utils/prediction_cache.py
+
+Cache of single-lead conversion probabilities.
+
+Entries are keyed by a canonical hash of the raw lead features together with
+the active preprocessor/model versions, so a promotion invalidates them
+implicitly (old keys are simply never asked for again and age out). Each
+worker keeps an in-process LRU+TTL cache bounded in bytes; an optional Redis
+backend lets workers on a host share hits.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from typing import Iterable, Optional
+
+from cachetools import TTLCache
+
+# Measured footprint of one local entry: key string, float, dict slot and TTL/LRU links
+ENTRY_BYTES = 384
+
+
+def _canonical_value(value):
+    """JSON-safe, type-stable form of one raw feature value."""
+    if isinstance(value, float) and math.isnan(value):
+        return {"nan": True}  # distinct from None: the pipeline treats them differently
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()  # numpy scalars
+    return value
+
+
+def canonical_key(record: dict, versions: dict, columns: Optional[Iterable[str]] = None) -> str:
+    """
+    Stable cache key for one lead under a preprocessor/model version pair.
+
+    Args:
+        record (dict): Raw feature values.
+        versions (dict): {"preprocessor": ..., "model": ...} of the scoring bundle.
+        columns (Iterable[str], optional): Only these fields affect the score;
+            others (IDs, timestamps) are left out of the key.
+
+    Returns:
+        str: "<preprocessor>:<model>:<blake2b hex digest>".
+    """
+    fields = sorted(columns) if columns is not None else sorted(record)
+    payload = [[k, _canonical_value(record.get(k, {"absent": True}))] for k in fields]
+    digest = hashlib.blake2b(
+        json.dumps(payload, separators=(",", ":"), default=repr).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return f"{versions['preprocessor']}:{versions['model']}:{digest}"
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts size-driven evictions (expired entries are removed via expire())."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+
+class RedisBackend:
+    """
+    Shared second-level cache in Redis (e.g. a local instance per host).
+
+    Failures are counted and otherwise ignored so a slow or missing Redis
+    never fails a prediction.
+    """
+
+    def __init__(self, url: str, ttl_s: float, prefix: str = "lead-score:", timeout_s: float = 0.05):
+        import redis  # optional dependency; only needed when PREDICTION_CACHE_REDIS_URL is set
+
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout_s, socket_connect_timeout=timeout_s)
+        self.ttl = max(1, int(ttl_s))
+        self.prefix = prefix
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[float]:
+        try:
+            value = self.client.get(self.prefix + key)
+        except Exception:
+            self.errors += 1
+            return None
+        return float(value) if value is not None else None
+
+    def set(self, key: str, value: float) -> None:
+        try:
+            self.client.set(self.prefix + key, repr(float(value)), ex=self.ttl)
+        except Exception:
+            self.errors += 1
+
+
+class PredictionCache:
+    """
+    In-process LRU+TTL cache of probabilities with an optional shared backend.
+
+    Args:
+        max_bytes (int): Approximate memory bound for local entries.
+        ttl_s (float): Seconds an entry stays valid.
+        shared (RedisBackend, optional): Second-level cache shared across workers.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_s: float = 3600.0,
+                 shared: Optional[RedisBackend] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_s
+        self.shared = shared
+        self._local = _CountingTTLCache(maxsize=max_bytes, ttl=ttl_s, getsizeof=self._entry_size)
+        self._lock = threading.Lock()
+
+        # Counters (read via stats())
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _entry_size(value) -> int:
+        return ENTRY_BYTES
+
+    def _set_local(self, key: str, value: float) -> None:
+        with self._lock:
+            self.expirations += len(self._local.expire())
+            self._local[key] = value
+
+    def get(self, key: str) -> Optional[float]:
+        """Cached probability for `key`, checking the shared backend on a local miss."""
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self._set_local(key, value)
+                with self._lock:
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: float) -> None:
+        """Store a freshly computed probability locally and in the shared backend."""
+        self._set_local(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+
+    def after_fork(self) -> None:
+        """Give a forked child its own lock; inherited entries stay valid."""
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Entry count, approximate bytes, hit/miss/eviction/expiration counters.
+        """
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "entries": len(self._local),
+            "bytes": int(self._local.currsize),
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self._local.evictions,
+            "expirations": self.expirations,
+            "shared_backend": self.shared is not None,
+            "shared_errors": self.shared.errors if self.shared is not None else 0,
+        }
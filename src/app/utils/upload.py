@@ -2,11 +2,12 @@
 """
 src/app/utils/upload.py
 
-Handles loading a user-uploaded CSV file into a PostgreSQL table.
+Handles loading a user-uploaded CSV file (or chunks of one) into a PostgreSQL table.
 """
 
 import os
 import sys
+import uuid
 
 # ─────────────────────────────────────────────
 # Add project root to PYTHONPATH for local imports
@@ -16,7 +17,64 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 # ─────────────────────────────────────────────
 # Import shared CSV-to-Postgres utility
 # ─────────────────────────────────────────────
-from src.ml.data_loader.data_loader import load_csv_to_postgres
+from src.ml.data_loader.data_loader import (
+    load_csv_to_postgres, save_dataframe_to_postgres, replace_table_with, drop_table
+)
+
+
+class StagedUpload:
+    """
+    One upload's raw rows, written to a private staging table and swapped in
+    as `table_name` once the upload completes.
+
+    Concurrent uploads (request threads, async jobs, other gunicorn workers)
+    each write their own staging table, so one upload's first-chunk replace
+    can no longer delete rows another upload has already appended; the last
+    upload to finish wins, as with the single full-frame replace.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.staging_table = f"{table_name}__upload_{uuid.uuid4().hex[:12]}"
+        self.created = False
+        self.published = False
+
+    def write(self, df, if_exists: str = "append"):
+        """Persist one chunk ('replace' for the first chunk of the upload, then 'append')."""
+        self.created = True
+        save_dataframe_to_postgres(df, table_name=self.staging_table, if_exists=if_exists)
+
+    def write_csv(self, filepath: str):
+        """Persist a whole CSV file."""
+        self.created = True
+        load_csv_to_postgres(csv_path=filepath, table_name=self.staging_table, if_exists="replace")
+
+    def publish(self):
+        """Swap the staged rows in as `table_name` (no-op if nothing was written)."""
+        if self.created and not self.published:
+            replace_table_with(self.staging_table, self.table_name)
+            self.published = True
+
+    def discard(self):
+        """Drop the staging table of an upload that did not complete."""
+        if self.created and not self.published:
+            try:
+                drop_table(self.staging_table)
+            except Exception as e:
+                print(f"⚠️ Could not drop staging table '{self.staging_table}': {e}")
+
+
+def publish_when_done(chunks, staged: StagedUpload):
+    """
+    Yield `chunks` unchanged; publish `staged` once they are exhausted, and
+    discard it if they fail or the consumer stops early (client disconnect).
+    """
+    try:
+        yield from chunks
+        staged.publish()
+    finally:
+        staged.discard()
+
 
 def handle_csv_upload(filepath: str, table_name: str):
     """
@@ -26,10 +84,11 @@ def handle_csv_upload(filepath: str, table_name: str):
         filepath (str): Path to the CSV file to upload.
         table_name (str): Name of the target Postgres table.
     """
-    # Delegate CSV loading to the shared utility function,
-    # replacing any existing data in `table_name`
-    load_csv_to_postgres(
-        csv_path=filepath,
-        table_name=table_name,
-        if_exists="replace"
-    )
+    # Load into a staging table, then replace any existing data in `table_name`
+    staged = StagedUpload(table_name)
+    try:
+        staged.write_csv(filepath)
+        staged.publish()
+    finally:
+        staged.discard()
+
@@ -0,0 +1,22 @@
+# src/app/wsgi.py
+
+import os
+import sys
+
+# ────────────────────────────────────────────────────────────────
+# 1) Ensure project `src/` directory is on Python import path
+# ────────────────────────────────────────────────────────────────
+here = os.path.dirname(__file__)                                  # .../lead_scoring_project/src/app
+project_src = os.path.abspath(os.path.join(here, ".."))           # .../lead_scoring_project/src
+if project_src not in sys.path:
+    sys.path.insert(0, project_src)
+
+# ────────────────────────────────────────────────────────────────
+# 2) WSGI application for production servers
+#    gunicorn -c src/app/gunicorn.conf.py app.wsgi:app
+#    With preload_app the master imports this module (and so loads the
+#    pipeline + model) once; workers inherit it copy-on-write.
+# ────────────────────────────────────────────────────────────────
+from app import create_app
+
+app = create_app()
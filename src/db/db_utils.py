@@ -1,8 +1,11 @@
 # src/db/db_utils.py
 
 import os
+import time
+import threading
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 
 # ─────────────────────────────────────────────
@@ -10,49 +13,170 @@ from dotenv import load_dotenv
 # ─────────────────────────────────────────────
 load_dotenv()
 
+# ─────────────────────────────────────────────
+# Connection pool settings (overridable via env)
+# ─────────────────────────────────────────────
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+
+class _PoolStats:
+    """Process-wide checkout counters (survive pool re-creation on dispose)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self.lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_s_total += waited
+            self.wait_s_max = max(self.wait_s_max, waited)
+
+
+POOL_STATS = _PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited (incl. connecting) and pool timeouts."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception as e:
+            POOL_STATS.record(time.perf_counter() - t0, timed_out=isinstance(e, exc.TimeoutError))
+            raise
+        POOL_STATS.record(time.perf_counter() - t0)
+        return conn
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _dispose_after_fork():
+    """
+    In a forked child (gunicorn/Airflow workers), drop the parent's pooled
+    connections without closing them, so the parent's sockets stay intact and
+    the child opens its own.
+    """
+    global _engine_lock
+    _engine_lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    POOL_STATS.lock = threading.Lock()
+    POOL_STATS.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
 def get_db_engine():
     """
-    Create and return a SQLAlchemy engine for connecting to PostgreSQL.
-    
+    Return the process-wide pooled SQLAlchemy engine for PostgreSQL (created on first use).
+
     Expects the following environment variables to be set:
       • DB_USER     - database username
       • DB_PASSWORD - database password
       • DB_HOST     - hostname or IP of the database server
-      • DB_PORT     - port number (e.g., "5432")
+      • DB_PORT     - port number (defaults to "5432")
       • DB_NAME     - name of the target database
-    
+
+    Pool sizing: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE.
+
     Raises:
         EnvironmentError: If any credential is missing.
-    
+
     Returns:
-        sqlalchemy.Engine: Engine instance for database connections.
+        sqlalchemy.Engine: Shared engine instance for database connections.
     """
-    # ─────────────────────────────────────────
-    # 1) Read credentials from environment
-    # ─────────────────────────────────────────
-    db_user = os.getenv("DB_USER")
-    db_pass = os.getenv("DB_PASSWORD")
-    db_host = os.getenv("DB_HOST")
-    db_port = os.getenv("DB_PORT")
-    db_name = os.getenv("DB_NAME")
-
-    # ─────────────────────────────────────────
-    # 2) Validate that all required credentials are present
-    # ─────────────────────────────────────────
-    if not all([db_user, db_pass, db_host, db_port, db_name]):
-        raise EnvironmentError(
-            "Database credentials are not fully set in .env. "
-            "Please define DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, and DB_NAME."
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            return _engine
+
+        # ─────────────────────────────────────────
+        # 1) Read credentials from environment
+        # ─────────────────────────────────────────
+        db_user = os.getenv("DB_USER")
+        db_pass = os.getenv("DB_PASSWORD")
+        db_host = os.getenv("DB_HOST")
+        db_port = os.getenv("DB_PORT", "5432")
+        db_name = os.getenv("DB_NAME")
+
+        # ─────────────────────────────────────────
+        # 2) Validate that all required credentials are present
+        # ─────────────────────────────────────────
+        if not all([db_user, db_pass, db_host, db_port, db_name]):
+            raise EnvironmentError(
+                "Database credentials are not fully set in .env. "
+                "Please define DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, and DB_NAME."
+            )
+
+        # ─────────────────────────────────────────
+        # 3) Construct the database connection URL
+        # ─────────────────────────────────────────
+        connection_url = (
+            f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
+        )
+
+        # ─────────────────────────────────────────
+        # 4) Create the pooled engine once per process
+        #    pre_ping drops dead connections; recycle beats server/proxy idle timeouts
+        # ─────────────────────────────────────────
+        _engine = create_engine(
+            connection_url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
         )
+        return _engine
+
+
+def dispose_engine():
+    """Close all pooled connections and forget the shared engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
 
-    # ─────────────────────────────────────────
-    # 3) Construct the database connection URL
-    # ─────────────────────────────────────────
-    connection_url = (
-        f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-    )
-
-    # ─────────────────────────────────────────
-    # 4) Create and return the SQLAlchemy engine
-    # ─────────────────────────────────────────
-    return create_engine(connection_url)
+
+def pool_status() -> dict:
+    """
+    Returns:
+        dict: Pool size/occupancy plus checkout count, timeouts and wait time (seconds).
+    """
+    status = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checkouts": POOL_STATS.checkouts,
+        "timeouts": POOL_STATS.timeouts,
+        "wait_s_total": round(POOL_STATS.wait_s_total, 4),
+        "wait_s_max": round(POOL_STATS.wait_s_max, 4),
+        "wait_ms_mean": round(1000 * POOL_STATS.wait_s_total / (POOL_STATS.checkouts + POOL_STATS.timeouts), 3)
+        if POOL_STATS.checkouts + POOL_STATS.timeouts else 0.0,
+    }
+    if _engine is not None:
+        pool = _engine.pool
+        status.update({"checked_out": pool.checkedout(), "idle": pool.checkedin(), "overflow": pool.overflow()})
+    return status
@@ -3,33 +3,328 @@
 # ────────────────────────────────────────────────────────────────
 
 import os
+import io
+import csv
+import itertools
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+from sqlalchemy import text
 from src.db.db_utils import get_db_engine  # ✅ Shared DB engine utility
 
+# ─────────────────────────────────────────────
+# Bulk write settings (overridable via env)
+#   DB_WRITE_METHOD: "copy" (COPY FROM STDIN on Postgres) or "insert" (pandas default INSERTs)
+#   DB_WRITE_CHUNK_ROWS: rows buffered in memory per COPY / INSERT batch
+# ─────────────────────────────────────────────
+DB_WRITE_METHOD = os.getenv("DB_WRITE_METHOD", "copy").lower()
+DB_WRITE_CHUNK_ROWS = int(os.getenv("DB_WRITE_CHUNK_ROWS", "100000"))
+
+COPY_NULL = "\\N"
+
+
+# ─────────────────────────────────────────────
+# Read settings (overridable via env)
+#   DB_READ_CHUNK_ROWS: rows fetched per server-side cursor batch
+# ─────────────────────────────────────────────
+DB_READ_CHUNK_ROWS = int(os.getenv("DB_READ_CHUNK_ROWS", "50000"))
+
+SAMPLE_METHODS = ("SYSTEM", "BERNOULLI")
+
+
+def quote_table(table_name: str, dialect=None) -> str:
+    """Quote a table name, keeping a schema qualifier ("public.lead_data" → "public"."lead_data")."""
+    quote = dialect.identifier_preparer.quote if dialect is not None else (lambda name: f'"{name}"')
+    return ".".join(quote(part) for part in table_name.split("."))
+
+
+def build_select(
+    table_name: str,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+    sample_method: str = "SYSTEM",
+    sample_seed: Optional[int] = None,
+    limit: Optional[int] = None,
+    dialect=None,
+) -> str:
+    """
+    Build a SELECT with optional projection, WHERE clause, TABLESAMPLE and LIMIT.
+
+    Args:
+        table_name (str): Table to read, optionally schema-qualified ("public.lead_data").
+        columns (List[str], optional): Columns to select (default: all).
+        where (str, optional): SQL condition; use `:name` placeholders with `params`.
+        sample_percent (float, optional): TABLESAMPLE percentage in (0, 100].
+        sample_method (str): "SYSTEM" (page-level, fast) or "BERNOULLI" (row-level).
+        sample_seed (int, optional): REPEATABLE seed for a stable sample.
+        limit (int, optional): Maximum number of rows.
+        dialect: SQLAlchemy dialect used to quote identifiers.
+
+    Returns:
+        str: SQL statement.
+    """
+    quote = dialect.identifier_preparer.quote if dialect is not None else (lambda name: f'"{name}"')
+    select = ", ".join(quote(c) for c in columns) if columns else "*"
+    sql = f"SELECT {select} FROM {quote_table(table_name, dialect)}"
+
+    if sample_percent is not None:
+        method = sample_method.upper()
+        if method not in SAMPLE_METHODS:
+            raise ValueError(f"sample_method must be one of {SAMPLE_METHODS}")
+        if not 0 < float(sample_percent) <= 100:
+            raise ValueError("sample_percent must be in (0, 100]")
+        sql += f" TABLESAMPLE {method} ({float(sample_percent)})"
+        if sample_seed is not None:
+            sql += f" REPEATABLE ({int(sample_seed)})"
+    if where:
+        sql += f" WHERE {where}"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql
+
+
+def _apply_dtypes(chunk: pd.DataFrame, dtypes: Optional[Dict[str, object]],
+                  float_dtype: Optional[str]) -> pd.DataFrame:
+    if float_dtype:
+        floats = chunk.select_dtypes(include=["float64"]).columns
+        casts = {c: float_dtype for c in floats if not dtypes or c not in dtypes}
+        if casts:
+            chunk = chunk.astype(casts, copy=False)
+    if dtypes:
+        chunk = chunk.astype({c: t for c, t in dtypes.items() if c in chunk.columns}, copy=False)
+    return chunk
+
+
+def iter_data_from_postgres(
+    table_name: str,
+    columns: Optional[List[str]] = None,
+    where: Optional[str] = None,
+    params: Optional[dict] = None,
+    dtypes: Optional[Dict[str, object]] = None,
+    float_dtype: Optional[str] = None,
+    sample_percent: Optional[float] = None,
+    sample_method: str = "SYSTEM",
+    sample_seed: Optional[int] = None,
+    limit: Optional[int] = None,
+    chunksize: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a PostgreSQL table in DataFrame chunks through a server-side cursor.
+
+    Only `chunksize` rows are held client-side at a time. Arguments are as in
+    `build_select`, plus:
+
+    Args:
+        params (dict, optional): Bound values for `:name` placeholders in `where`.
+        dtypes (dict, optional): Per-column dtypes applied to every chunk
+            (e.g. {"Lead Source": "category", "TotalVisits": "float32"}).
+        float_dtype (str, optional): Cast every other float64 column (e.g. "float32").
+        chunksize (int, optional): Rows per chunk (default DB_READ_CHUNK_ROWS).
+
+    Yields:
+        pd.DataFrame: Successive chunks.
+    """
+    engine = get_db_engine()
+    sql = build_select(table_name, columns, where, sample_percent, sample_method,
+                       sample_seed, limit, dialect=engine.dialect)
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql(text(sql), conn, params=params or {},
+                                 chunksize=chunksize or DB_READ_CHUNK_ROWS):
+            yield _apply_dtypes(chunk, dtypes, float_dtype)
+
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, keeping categorical columns categorical across differing categories."""
+    if len(chunks) == 1:
+        return chunks[0]
+    categorical = [c for c in chunks[0].columns if isinstance(chunks[0][c].dtype, pd.CategoricalDtype)]
+    unified = {c: union_categoricals([ch[c] for ch in chunks]) for c in categorical}
+    df = pd.concat([ch.drop(columns=categorical) for ch in chunks], ignore_index=True)
+    for c in categorical:
+        df[c] = pd.Categorical(unified[c])
+    return df[chunks[0].columns]
+
+
+def _collect_chunks(chunks: Iterator[pd.DataFrame], capacity: Optional[int]) -> Optional[pd.DataFrame]:
+    """
+    Assemble streamed chunks into one DataFrame.
+
+    When every column shares one numeric dtype (e.g. preprocessed feature
+    tables), rows are copied straight into a single preallocated 2-D block of
+    `capacity` rows, so the chunks and a concatenated copy never coexist.
+    Other tables, or a chunk that doesn't fit (dtype change, more rows than
+    expected), fall back to concatenation.
+
+    Returns:
+        pd.DataFrame or None: None if there were no chunks.
+    """
+    first = next(chunks, None)
+    if first is None:
+        return None
+
+    dtypes = set(first.dtypes)
+    dtype = dtypes.pop() if len(dtypes) == 1 else None
+    if capacity is None or dtype is None or dtype.kind not in "iuf" or capacity < len(first):
+        return _concat_chunks([first] + list(chunks))
+
+    columns = first.columns
+    try:
+        block = np.empty((capacity, len(columns)), dtype=dtype)  # untouched pages are never resident
+    except MemoryError:
+        return _concat_chunks([first] + list(chunks))
+
+    n, rest = 0, []
+    for chunk in itertools.chain([first], chunks):
+        if rest or n + len(chunk) > capacity or any(t != dtype for t in chunk.dtypes):
+            rest.append(chunk)
+            continue
+        block[n:n + len(chunk)] = chunk.to_numpy()
+        n += len(chunk)
+
+    values = block[:n] if n * 2 >= capacity else block[:n].copy()
+    df = pd.DataFrame(values, columns=columns, copy=False)
+    return _concat_chunks([df] + rest) if rest else df
+
+
+def _row_capacity(table_name: str, options: dict) -> Optional[int]:
+    """Upper bound on rows a load can return, from the planner's table size estimate."""
+    engine = get_db_engine()
+    if engine.dialect.name != "postgresql":
+        return None
+    with engine.connect() as conn:
+        estimate = conn.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:t)"),
+            {"t": quote_table(table_name, engine.dialect)},
+        ).scalar()
+    if not estimate or estimate <= 0:
+        return None  # never analyzed
+    rows = float(estimate) * 1.1  # estimates lag recent inserts
+    if options.get("sample_percent") is not None:
+        rows = rows * float(options["sample_percent"]) / 100.0 * 1.5
+    if options.get("limit") is not None:
+        rows = min(rows, int(options["limit"]))
+    return int(rows) + (options.get("chunksize") or DB_READ_CHUNK_ROWS)
+
+
+def table_columns(table_name: str) -> List[str]:
+    """Column names of a table (reads no rows)."""
+    engine = get_db_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(build_select(table_name, limit=0, dialect=engine.dialect)))
+        return list(result.keys())
+
 
 # ─────────────────────────────────────────────
 # Load data from PostgreSQL table
 # ─────────────────────────────────────────────
-def load_data_from_postgres(table_name: str) -> pd.DataFrame:
+def load_data_from_postgres(table_name: str, **options) -> pd.DataFrame:
     """
     Load data from a PostgreSQL table into a pandas DataFrame.
 
+    Rows are streamed in chunks and dtypes are applied per chunk, so peak
+    memory stays close to the size of the (projected, downcast) result.
+
     Args:
         table_name (str): Name of the table to query.
+        **options: columns, where, params, dtypes, float_dtype, sample_percent,
+            sample_method, sample_seed, limit, chunksize (see `iter_data_from_postgres`).
 
     Returns:
         pd.DataFrame: Loaded data.
     """
     try:
-        engine = get_db_engine()
-        with engine.connect() as conn:
-            df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
+        df = _collect_chunks(iter_data_from_postgres(table_name, **options),
+                             capacity=_row_capacity(table_name, options))
+        if df is None:
+            df = pd.DataFrame(columns=options.get("columns") or table_columns(table_name))
         print(f"[INFO] Loaded data from '{table_name}', shape: {df.shape}")
         return df
     except Exception as e:
         raise RuntimeError(f"[ERROR] Cannot load data from '{table_name}': {e}")
 
 
+# ─────────────────────────────────────────────
+# Bulk insert via COPY FROM STDIN
+# ─────────────────────────────────────────────
+def copy_from_stdin(pd_table, conn, keys, data_iter):
+    """
+    pandas `to_sql(method=...)` callable that streams one chunk of rows into
+    Postgres with `COPY ... FROM STDIN` from an in-memory CSV buffer.
+
+    Table creation and `if_exists` handling stay with pandas; only the row
+    insert is replaced. Missing values are written as the COPY NULL marker, so
+    empty strings and NULLs stay distinct.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in data_iter:
+        writer.writerow([COPY_NULL if v is None else v for v in row])
+    buf.seek(0)
+
+    quote = conn.dialect.identifier_preparer.quote
+    table = quote(pd_table.name) if not pd_table.schema else f"{quote(pd_table.schema)}.{quote(pd_table.name)}"
+    columns = ", ".join(quote(k) for k in keys)
+
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')", buf
+        )
+
+
+def write_dataframe(df: pd.DataFrame, table_name: str, engine, if_exists: str = "replace",
+                    method: Optional[str] = None, chunksize: Optional[int] = None):
+    """
+    Write a DataFrame with `to_sql` semantics, using COPY on Postgres.
+
+    Args:
+        df (pd.DataFrame): Data to write.
+        table_name (str): Target table name.
+        engine: SQLAlchemy engine or connection.
+        if_exists (str): 'replace', 'append', or 'fail' (as in `DataFrame.to_sql`).
+        method (str, optional): "copy" or "insert"; defaults to DB_WRITE_METHOD.
+        chunksize (int, optional): Rows per batch; defaults to DB_WRITE_CHUNK_ROWS.
+    """
+    method = (method or DB_WRITE_METHOD).lower()
+    use_copy = method == "copy" and engine.dialect.name == "postgresql"
+    df.to_sql(
+        table_name,
+        engine,
+        index=False,
+        if_exists=if_exists,
+        chunksize=chunksize or DB_WRITE_CHUNK_ROWS,
+        method=copy_from_stdin if use_copy else None,
+    )
+
+
+def replace_table_with(staging_table: str, table_name: str):
+    """
+    Replace `table_name` with the fully written `staging_table` in one transaction.
+
+    The old table is dropped and the staging table renamed into place, so
+    readers see either the previous or the new rows, never a partial load.
+    On Postgres, concurrent swaps of the same table are serialized with a
+    transaction-level advisory lock.
+    """
+    engine = get_db_engine()
+    new_name = engine.dialect.identifier_preparer.quote(table_name.split(".")[-1])  # RENAME TO takes no schema
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:t))"), {"t": table_name})
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote_table(table_name, engine.dialect)}"))
+        conn.execute(text(f"ALTER TABLE {quote_table(staging_table, engine.dialect)} RENAME TO {new_name}"))
+
+
+def drop_table(table_name: str):
+    """Drop `table_name` if it exists."""
+    engine = get_db_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {quote_table(table_name, engine.dialect)}"))
+
+
 # ─────────────────────────────────────────────
 # Load data from CSV to PostgreSQL
 # ─────────────────────────────────────────────
@@ -48,7 +343,7 @@ def load_csv_to_postgres(csv_path: str, table_name: str, if_exists: str = "repla
     try:
         df = pd.read_csv(csv_path)
         engine = get_db_engine()
-        df.to_sql(table_name, engine, index=False, if_exists=if_exists)
+        write_dataframe(df, table_name, engine, if_exists=if_exists)
         print(f"✅ CSV data loaded into table '{table_name}' (if_exists='{if_exists}')")
     except Exception as e:
         raise RuntimeError(f"[ERROR] Failed to load CSV to PostgreSQL: {e}")
@@ -74,7 +369,7 @@ def save_dataframe_to_postgres(df: pd.DataFrame, table_name: str, if_exists: str
 
     try:
         engine = get_db_engine()
-        df.to_sql(table_name, engine, index=False, if_exists=if_exists)
+        write_dataframe(df, table_name, engine, if_exists=if_exists)
         print(f"✅ DataFrame saved to PostgreSQL table '{table_name}' (if_exists='{if_exists}')")
     except Exception as e:
         raise RuntimeError(f"[ERROR] Failed to save DataFrame to PostgreSQL: {e}")
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, OneToOneFeatureMixin
+from typing import Union
+
+
+class DtypeCaster(OneToOneFeatureMixin, BaseEstimator, TransformerMixin):
+    def __init__(self, dtype: str = "float32"):
+        """
+        A stateless transformer that casts numeric columns to `dtype`, so the
+        steps after it (imputer, scaler) compute in that precision.
+
+        Args:
+            dtype (str): Target numpy dtype, e.g. "float32".
+        """
+        self.dtype = dtype
+
+    def fit(self, X: Union[np.ndarray, pd.DataFrame], y=None):
+        self.n_features_in_ = X.shape[1]
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def transform(self, X: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: X as a `dtype` array (missing values stay NaN).
+        """
+        if isinstance(X, pd.DataFrame):
+            return X.to_numpy(dtype=self.dtype, na_value=np.nan)
+        return np.asarray(X, dtype=self.dtype)
@@ -1,5 +1,49 @@
+import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
+from typing import Dict, List, Optional, Union
+
+# Behavioral source columns and the engineered columns derived from them
+VISITS_COL = 'TotalVisits'
+TIME_COL = 'Total Time Spent on Website'
+ENGINEERED_COLUMNS = [f'{VISITS_COL}_is_zero', f'{TIME_COL}_is_zero', 'EngagementScore']
+
+# Identifier, constant and redundant columns removed by `clean_columns` / clean mode
+DROP_COLUMNS = [
+    'Prospect ID', 'Lead Number', 'Magazine',
+    'Receive More Updates About Our Courses',
+    'Update me on Supply Chain Content',
+    'Get updates on DM Content',
+    'I agree to pay the amount through cheque',
+    'Newspaper Article', 'X Education Forums',
+    'Asymmetrique Activity Index', 'Asymmetrique Profile Index',
+    'Last Notable Activity', 'Page Views Per Visit'
+]
+
+
+def engineered_columns(columns: Dict[str, object]) -> Dict[str, object]:
+    """
+    Computes the engineered columns from whichever source columns are present.
+
+    Works on pandas Series and on 1-D numpy arrays alike (missing values
+    are NaN/None: flags are 0, the score is NaN).
+
+    Args:
+        columns (dict): {column name: Series or 1-D array}, at least the source columns.
+
+    Returns:
+        dict: {engineered column name: Series or array}, in ENGINEERED_COLUMNS order.
+    """
+    engineered = {}
+    for col in (VISITS_COL, TIME_COL):
+        if col in columns:
+            engineered[f'{col}_is_zero'] = (columns[col] == 0).astype(int)
+    if VISITS_COL in columns and TIME_COL in columns:
+        visits, time_spent = columns[VISITS_COL], columns[TIME_COL]
+        if isinstance(visits, np.ndarray):
+            visits, time_spent = visits.astype(np.float64), time_spent.astype(np.float64)
+        engineered['EngagementScore'] = visits * time_spent
+    return engineered
 
 
 class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
@@ -9,22 +53,40 @@ class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
     Adds:
         - Flags for zero values in behavioral columns
         - A composite engagement score
+
+    The output frame shares the input's column data instead of copying the
+    whole frame; only the engineered columns are allocated. With `clean=True`
+    the `DROP_COLUMNS` are left out in the same pass (fused `clean_columns`).
+    numpy column blocks are supported given their column names (`columns`, or
+    the DataFrame columns seen in `fit`).
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, clean: bool = False, columns: Optional[List[str]] = None):
+        """
+        Args:
+            clean (bool): Also drop `DROP_COLUMNS` (clean + engineer in one step).
+            columns (list[str], optional): Column names of numpy input.
+        """
+        self.clean = clean
+        self.columns = columns
+
+    def __setstate__(self, state):
+        # Pickles from before `clean`/`columns` existed carry neither parameter
+        state.setdefault('clean', False)
+        state.setdefault('columns', None)
+        super().__setstate__(state)
 
     def add_behavioral_flags(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Adds binary flag columns indicating if key behavioral features are zero.
 
         Args:
-            df (pd.DataFrame): Input dataframe.
+            df (pd.DataFrame): Input dataframe (modified in place).
 
         Returns:
             pd.DataFrame: Modified dataframe with new flag columns.
         """
-        for col in ['TotalVisits', 'Total Time Spent on Website']:
+        for col in [VISITS_COL, TIME_COL]:
             if col in df.columns:
                 df[f'{col}_is_zero'] = (df[col] == 0).astype(int)
         return df
@@ -34,32 +96,86 @@ class FeatureEngineeringTransformer(BaseEstimator, TransformerMixin):
         Adds a new feature 'EngagementScore' as a product of two existing features.
 
         Args:
-            df (pd.DataFrame): Input dataframe.
+            df (pd.DataFrame): Input dataframe (modified in place).
 
         Returns:
             pd.DataFrame: Modified dataframe with the combined feature.
         """
-        if {'TotalVisits', 'Total Time Spent on Website'}.issubset(df.columns):
-            df['EngagementScore'] = df['TotalVisits'] * df['Total Time Spent on Website']
+        if {VISITS_COL, TIME_COL}.issubset(df.columns):
+            df['EngagementScore'] = df[VISITS_COL] * df[TIME_COL]
         return df
 
-    def fit(self, X: pd.DataFrame, y=None):
+    def _input_names(self, X: Union[pd.DataFrame, np.ndarray]) -> List[str]:
+        if isinstance(X, pd.DataFrame):
+            return list(X.columns)
+        names = self.columns if self.columns is not None else getattr(self, 'feature_names_in_', None)
+        if names is None or len(names) != X.shape[1]:
+            raise ValueError("numpy input needs `columns` (or a DataFrame fit) naming each of its columns")
+        return list(names)
+
+    def fit(self, X: Union[pd.DataFrame, np.ndarray], y=None):
         """
-        No fitting needed; this transformer is stateless.
+        No fitting needed; only the input column names are recorded.
         """
+        self.n_features_in_ = X.shape[1]
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
         return self
 
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+    def transform(self, X: Union[pd.DataFrame, np.ndarray]) -> Union[pd.DataFrame, np.ndarray]:
         """
-        Applies behavioral flag creation and combined feature addition.
+        Applies behavioral flag creation and combined feature addition
+        (after dropping `DROP_COLUMNS` when `clean`).
+
+        The input is not modified, but a DataFrame result shares the input's
+        (unchanged) column arrays: copy it before writing into those columns.
 
         Args:
-            X (pd.DataFrame): Input dataframe.
+            X (pd.DataFrame | np.ndarray): Input dataframe, or a 2-D array of columns.
 
         Returns:
-            pd.DataFrame: Transformed dataframe with new features.
+            pd.DataFrame | np.ndarray: Transformed data with new features appended,
+            in the same container type as `X`.
         """
-        X_copy = X.copy()
-        X_copy = self.add_behavioral_flags(X_copy)
-        X_copy = self.add_combined_features(X_copy)
-        return X_copy
+        if isinstance(X, pd.DataFrame):
+            # Shallow copy instead of X.copy(): the new frame reuses the input's blocks, and
+            # deleting/adding columns only changes its own column index (X is left untouched)
+            df = X.copy(deep=False)
+            for col in DROP_COLUMNS if self.clean else []:
+                if col in df.columns:
+                    del df[col]
+            return self.add_combined_features(self.add_behavioral_flags(df))
+
+        names = self._input_names(X)
+        drop = set(DROP_COLUMNS) if self.clean else set()
+        keep = [i for i, name in enumerate(names) if name not in drop]
+        X = np.asarray(X)
+        sources = {names[i]: X[:, i] for i in keep if names[i] in (VISITS_COL, TIME_COL)}
+        engineered = engineered_columns(sources)
+        kept = X if len(keep) == X.shape[1] else X[:, keep]
+        if not engineered:
+            return kept
+        return np.column_stack([kept] + list(engineered.values()))
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        names = list(input_features) if input_features is not None else list(
+            self.columns if self.columns is not None else self.feature_names_in_)
+        drop = set(DROP_COLUMNS) if self.clean else set()
+        kept = [name for name in names if name not in drop]
+        engineered = [name for name in ENGINEERED_COLUMNS
+                      if name in engineered_columns({col: np.zeros(1) for col in kept})]
+        return np.asarray(kept + engineered, dtype=object)
+
+
+def feature_engineering(df: pd.DataFrame, clean: bool = False) -> pd.DataFrame:
+    """
+    Functional form of `FeatureEngineeringTransformer` (drift checks, notebooks).
+
+    Args:
+        df (pd.DataFrame): Input dataframe.
+        clean (bool): Also drop `DROP_COLUMNS`.
+
+    Returns:
+        pd.DataFrame: `df` with the engineered columns appended.
+    """
+    return FeatureEngineeringTransformer(clean=clean).fit_transform(df)
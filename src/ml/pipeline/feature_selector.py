@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.base import BaseEstimator, TransformerMixin
 from typing import List, Union
 
@@ -17,15 +18,22 @@ class FeatureSelector(BaseEstimator, TransformerMixin):
     def fit(self, X: Union[np.ndarray, pd.DataFrame], y=None):
         return self
 
-    def transform(self, X: Union[np.ndarray, pd.DataFrame]) -> Union[np.ndarray, pd.DataFrame]:
+    def __sklearn_is_fitted__(self) -> bool:
+        # Stateless: usable as soon as the indices are set, no fit required
+        return True
+
+    def transform(self, X: Union[np.ndarray, pd.DataFrame, sparse.spmatrix]) -> Union[np.ndarray, pd.DataFrame, sparse.csr_matrix]:
         """
         Selects features from the input X based on the indices provided.
 
         Returns:
-            np.ndarray or pd.DataFrame: Subset with only selected columns.
+            np.ndarray, pd.DataFrame or sparse.csr_matrix: Subset with only
+            selected columns (sparse input stays sparse).
         """
         if isinstance(X, pd.DataFrame):
             return X.iloc[:, self.selected_features]
+        elif sparse.issparse(X):
+            return sparse.csr_matrix(X)[:, self.selected_features]
         else:
             X = np.asarray(X)
             return X[:, self.selected_features]
@@ -0,0 +1,299 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.pipeline import Pipeline
+
+from src.ml.pipeline.preprocessing import get_full_pipeline
+from src.ml.pipeline.feature_selection import (
+    apply_feature_selection, FEATURE_SELECTION_METHOD, FEATURE_SELECTION_RFE_STEP
+)
+from src.ml.pipeline.feature_selector import FeatureSelector
+
+# Reuse fitted preprocessing + feature selection across runs on unchanged data (0/false disables)
+FIT_CACHE = os.getenv("FIT_CACHE", "1").lower() in ("1", "true", "yes")
+
+# Host-local cache directory and number of fingerprints kept (least recently used go first)
+FIT_CACHE_DIR = os.getenv("FIT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lead_scoring_fit_cache"))
+FIT_CACHE_MAX_ENTRIES = int(os.getenv("FIT_CACHE_MAX_ENTRIES", "3"))
+
+# MLflow experiment receiving the hit/miss runs when no run is active
+FIT_CACHE_EXPERIMENT = "Preprocessing Pipeline Registry"
+
+# Bump to invalidate every entry (e.g. a change in how entries are stored)
+FIT_CACHE_VERSION = 1
+
+# Modules whose source decides what a fit produces; editing any of them invalidates the cache
+_FINGERPRINT_MODULES = ("feature_engineering", "preprocessing", "dtype_caster", "feature_selection",
+                        "feature_selector")
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔑 Fingerprints
+# ─────────────────────────────────────────────────────────────
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """
+    Content hash of a training table: column names, dtypes and every row's
+    feature and target values (row order included, the index is not).
+
+    Args:
+        X (pd.DataFrame): Cleaned features.
+        y (pd.Series): Target.
+
+    Returns:
+        str: blake2b hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    columns = [[str(col), str(dtype)] for col, dtype in X.dtypes.items()] + [[str(y.name), str(y.dtype)]]
+    digest.update(json.dumps(columns).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _describe(value):
+    """Address-free description of a parameter value (estimators by class, containers recursively)."""
+    if hasattr(value, "get_params"):
+        return f"{type(value).__module__}.{type(value).__qualname__}"
+    if isinstance(value, (list, tuple)):
+        return [_describe(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _describe(v) for k, v in sorted(value.items())}
+    return repr(value)
+
+
+def config_fingerprint(pipeline: Pipeline, **settings) -> str:
+    """
+    Hash of an unfitted pipeline's full parameter tree, the extra `settings`
+    (e.g. selection method and top_n), the library versions and the pipeline modules' source.
+
+    Args:
+        pipeline (Pipeline): Unfitted pipeline from `get_full_pipeline`.
+        **settings: Anything else that changes the fitted result.
+
+    Returns:
+        str: blake2b hex digest.
+    """
+    import sklearn
+
+    digest = hashlib.blake2b(digest_size=16)
+    config = {
+        "version": FIT_CACHE_VERSION,
+        "sklearn": sklearn.__version__,
+        "numpy": np.__version__,
+        "params": _describe(pipeline.get_params(deep=True)),
+        "settings": _describe(settings),
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in _FINGERPRINT_MODULES:
+        with open(os.path.join(package_dir, f"{module}.py"), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_key(X: pd.DataFrame, y: pd.Series, pipeline: Pipeline, **settings) -> str:
+    """'<rows>r-<data hash>-<config hash>' for a training table and pipeline config."""
+    return f"{len(X)}r-{data_fingerprint(X, y)[:20]}-{config_fingerprint(pipeline, **settings)[:12]}"
+
+
+# ─────────────────────────────────────────────────────────────
+# 💾 On-disk cache
+# ─────────────────────────────────────────────────────────────
+
+class FitCache:
+    """
+    Fitted preprocessing pipelines, their transformed training matrix and
+    feature selection, stored per fingerprint under `<root>/<key>/`.
+
+    The matrix is written as .npy files (dense: column-major, so selecting
+    columns reads only those columns; sparse: the CSR arrays) and opened
+    memory-mapped on a hit. Entries appear atomically (staged, then renamed),
+    so concurrent runs never see a partial entry.
+
+    Args:
+        root (str, optional): Cache directory (env FIT_CACHE_DIR).
+        max_entries (int, optional): Entries kept (env FIT_CACHE_MAX_ENTRIES).
+    """
+
+    def __init__(self, root: Optional[str] = None, max_entries: Optional[int] = None):
+        self.root = os.path.abspath(root or FIT_CACHE_DIR)
+        self.max_entries = FIT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def load(self, key: str) -> Optional[Tuple[Pipeline, object, List[int]]]:
+        """
+        Returns:
+            (fitted full pipeline, memory-mapped transformed matrix, selected indices),
+            or None on a miss or an unreadable entry.
+        """
+        path = self.path(key)
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                meta = json.load(f)
+            pipeline = joblib.load(os.path.join(path, "full_pipeline.joblib"))
+            if meta["sparse"]:
+                data, indices, indptr = (np.load(os.path.join(path, f"X_{part}.npy"), mmap_mode="r")
+                                         for part in ("data", "indices", "indptr"))
+                X = sp.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+            else:
+                X = np.load(os.path.join(path, "X.npy"), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable fit cache entry {key}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        os.utime(path)  # least-recently-used order for eviction
+        return pipeline, X, list(meta["selected_indices"])
+
+    def store(self, key: str, pipeline: Pipeline, X, selected_indices: List[int]) -> str:
+        """Write one entry (no-op if another run stored the same key first); returns its path."""
+        final = self.path(key)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            joblib.dump(pipeline, os.path.join(staging, "full_pipeline.joblib"))
+            if sp.issparse(X):
+                X = sp.csr_matrix(X)
+                for part in ("data", "indices", "indptr"):
+                    np.save(os.path.join(staging, f"X_{part}.npy"), getattr(X, part))
+            else:
+                np.save(os.path.join(staging, "X.npy"), np.asfortranarray(X))
+            meta = {
+                "key": key,
+                "sparse": bool(sp.issparse(X)),
+                "shape": list(X.shape),
+                "dtype": str(X.dtype),
+                "selected_indices": [int(i) for i in selected_indices],
+                "created_at": time.time(),
+            }
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+            try:
+                os.rename(staging, final)
+            except OSError:
+                if not os.path.isdir(final):
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._evict(keep=key)
+        return final
+
+    def entries(self) -> List[str]:
+        """Cached keys, most recently used first."""
+        keys = [name for name in os.listdir(self.root)
+                if not name.startswith(".") and os.path.isdir(self.path(name))]
+        return sorted(keys, key=lambda k: os.path.getmtime(self.path(k)), reverse=True)
+
+    def _evict(self, keep: str) -> None:
+        for key in [k for k in self.entries() if k != keep][max(0, self.max_entries - 1):]:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            print(f"[INFO] Evicted fit cache entry {key}")
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔄 Cached fit → transform → feature selection
+# ─────────────────────────────────────────────────────────────
+
+def log_cache_event(event: dict) -> None:
+    """
+    Log a fit cache hit/miss to MLflow: into the active run if there is one,
+    else as its own run in FIT_CACHE_EXPERIMENT. Never fails the pipeline.
+    """
+    try:
+        import mlflow
+
+        active = mlflow.active_run() is not None
+        if not active:
+            mlflow.set_experiment(FIT_CACHE_EXPERIMENT)
+        with mlflow.start_run(run_name=f"fit_cache_{event['status']}", nested=active):
+            mlflow.set_tag("fit_cache", event["status"])
+            mlflow.log_params({"fit_cache_key": event["key"], "fit_cache_rows": event["rows"]})
+            mlflow.log_metrics({"fit_cache_hit": float(event["status"] == "hit"),
+                                "fit_cache_seconds": event["seconds"]})
+    except Exception as e:
+        print(f"⚠️ Could not log fit cache {event['status']} to MLflow: {e}")
+
+
+def fit_preprocessing(
+    X: pd.DataFrame,
+    y: pd.Series,
+    numeric_features: List[str],
+    categorical_features: List[str],
+    sparse: bool,
+    dtype: str,
+    top_n: int = 50,
+    cache: Optional[FitCache] = None,
+    log_to_mlflow: bool = True,
+    method: str = FEATURE_SELECTION_METHOD,
+    previous_names: Optional[List[str]] = None,
+) -> Tuple[Pipeline, object, List[int], dict]:
+    """
+    Fit feature engineering + preprocessing and select features, or reuse all three
+    from `cache` when the same table was fitted with the same config before.
+
+    Args:
+        X (pd.DataFrame): Cleaned features.
+        y (pd.Series): Target.
+        numeric_features / categorical_features (list[str]): Column types.
+        sparse (bool): CSR mode (see `get_preprocessing_pipeline`).
+        dtype (str): Feature dtype.
+        top_n (int): Features kept by feature selection.
+        cache (FitCache, optional): Cache to use; None always fits.
+        log_to_mlflow (bool): Log the hit/miss to MLflow.
+        method (str): Feature selection strategy (see `SELECTION_METHODS`).
+        previous_names (list[str], optional): Previously selected feature
+            names, the starting set of the "warm" strategy.
+
+    Returns:
+        Tuple: (fitted full pipeline, X_selected, selected indices,
+        {"status": "hit" | "miss" | "disabled", "key", "rows", "seconds"}).
+    """
+    t0 = time.perf_counter()
+    full_pipeline = get_full_pipeline(numeric_features, categorical_features, sparse=sparse, dtype=dtype)
+    event = {"status": "disabled", "key": "", "rows": len(X)}
+    selection = {"top_n": top_n, "method": method}
+    if method in ("rfe", "warm"):
+        selection["step"] = FEATURE_SELECTION_RFE_STEP
+    if method == "warm":
+        selection["previous"] = sorted(previous_names or [])
+
+    if cache is not None:
+        event["key"] = cache_key(X, y, full_pipeline, **selection)
+        entry = cache.load(event["key"])
+        if entry is not None:
+            full_pipeline, X_transformed, selected_indices = entry
+            X_selected = FeatureSelector(selected_features=selected_indices).transform(X_transformed)
+            event.update(status="hit", seconds=round(time.perf_counter() - t0, 3))
+            print(f"✅ Fit cache hit {event['key']}: reused fitted preprocessing, matrix and feature selection")
+            if log_to_mlflow:
+                log_cache_event(event)
+            return full_pipeline, X_selected, selected_indices, event
+        event["status"] = "miss"
+
+    X_transformed = full_pipeline.fit_transform(X, y)
+    options = {}
+    if method == "warm" and previous_names:
+        names = list(full_pipeline.named_steps["preprocessing"].get_feature_names_out())
+        options["previous"] = [names.index(name) for name in previous_names if name in names]
+    X_selected, selected_indices = apply_feature_selection(X_transformed, y, top_n=top_n, method=method, **options)
+    selected_indices = [int(i) for i in selected_indices]
+    if cache is not None:
+        cache.store(event["key"], full_pipeline, X_transformed, selected_indices)
+        print(f"[INFO] Fit cache miss {event['key']}: stored fitted preprocessing under {cache.root}")
+    event["seconds"] = round(time.perf_counter() - t0, 3)
+    if log_to_mlflow and cache is not None:
+        log_cache_event(event)
+    return full_pipeline, X_selected, selected_indices, event
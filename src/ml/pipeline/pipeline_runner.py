@@ -2,7 +2,9 @@ import os
 import sys
 import joblib
 import pandas as pd
+from scipy import sparse as sp
 from datetime import datetime
+from typing import Optional
 from sklearn.pipeline import Pipeline
 import mlflow
 
@@ -11,11 +13,19 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 
 from src.eda.profiler import generate_eda_report
 from src.ml.data_loader.data_loader import load_data_from_postgres, save_dataframe_to_postgres
-from src.ml.pipeline.preprocessing import clean_columns, get_full_pipeline
-from src.ml.pipeline.feature_selection import apply_feature_selection
+from src.ml.pipeline.preprocessing import clean_columns, SPARSE_PREPROCESSING, PIPELINE_DTYPE
 from src.ml.pipeline.feature_selector import FeatureSelector
+from src.ml.pipeline.fit_cache import FitCache, fit_preprocessing, FIT_CACHE
+from src.ml.pipeline.feature_selection import FEATURE_SELECTION_METHOD
+from src.ml.pipeline.pruning import prune_pipeline
 from src.ml.registry.model_registry import register_and_promote
 
+# Training rows on which the pruned pipeline must reproduce the original output exactly
+PRUNE_CHECK_ROWS = int(os.getenv("PRUNE_CHECK_ROWS", "10000"))
+
+# Inference pipeline written by the previous run (its selection seeds the "warm" strategy)
+PIPELINE_PATH = os.path.join("models", "full_pipeline.pkl")
+
 
 def print_time(step: str, t0: datetime) -> datetime:
     elapsed = (datetime.now() - t0).total_seconds()
@@ -23,12 +33,32 @@ def print_time(step: str, t0: datetime) -> datetime:
     return datetime.now()
 
 
+def previous_selection(path: str = PIPELINE_PATH) -> Optional[list]:
+    """
+    Feature names selected by the previously saved inference pipeline, or
+    None when there is none (pruning keeps the selected names unchanged).
+    """
+    try:
+        steps = joblib.load(path).named_steps
+        names = steps["preprocessing"].get_feature_names_out()
+        return [str(names[i]) for i in steps["feature_selection"].selected_features]
+    except Exception as e:
+        print(f"[INFO] No previous feature selection at {path} ({type(e).__name__}); starting cold")
+        return None
+
+
 def run_pipeline(
     table_name: str = "lead_data",
     target_col: str = "Converted",
     save: bool = True,
     register: bool = False,
-    return_pipeline: bool = False
+    return_pipeline: bool = False,
+    load_options: Optional[dict] = None,
+    prune: bool = True,
+    sparse: bool = SPARSE_PREPROCESSING,
+    dtype: str = PIPELINE_DTYPE,
+    use_cache: bool = FIT_CACHE,
+    selection_method: str = FEATURE_SELECTION_METHOD
 ):
     """
     Runs the full preprocessing pipeline: load, clean, transform, feature selection, and save.
@@ -39,6 +69,20 @@ def run_pipeline(
         save (bool): Whether to save transformed data and pipeline.
         register (bool): Whether to log pipeline in MLflow.
         return_pipeline (bool): Whether to return final pipeline and selected data.
+        load_options (dict, optional): Passed to `load_data_from_postgres`
+            (e.g. columns, where/params, sample_percent) to train on a subset.
+        prune (bool): Rewrite the inference pipeline so it only computes the
+            raw inputs feeding the selected features (see `prune_pipeline`).
+        sparse (bool): Keep the one-hot block as CSR through RFE and the
+            returned X_selected (see `get_preprocessing_pipeline`).
+        dtype (str): Dtype of the preprocessed features ("float32" halves
+            memory and saves `preprocessed_train_data` as `real` columns).
+        use_cache (bool): Reuse the fitted preprocessing, transformed matrix and
+            RFE selection when the table and pipeline config are unchanged
+            since a previous run (see `fit_cache`).
+        selection_method (str): Feature selection strategy: "rfe",
+            "importance", "permutation", "l1" or "warm" (RFE seeded with the
+            previously saved pipeline's selection); see `feature_selection`.
 
     Returns:
         Tuple[X_selected, y, final_pipeline] if return_pipeline is True,
@@ -47,7 +91,7 @@ def run_pipeline(
     t0 = datetime.now()
 
     # 1. Load & clean data
-    df = load_data_from_postgres(table_name)
+    df = load_data_from_postgres(table_name, **(load_options or {}))
     print(f"[INFO] Loaded data from '{table_name}' with shape: {df.shape}")
     generate_eda_report(df)
     df = clean_columns(df)
@@ -62,39 +106,48 @@ def run_pipeline(
     categorical_features = X.select_dtypes(include=["object", "category", "bool"]).columns.tolist()
     t0 = print_time("Feature type identification", t0)
 
-    # 4. Build & fit full pipeline
-    full_pipeline = get_full_pipeline(numeric_features, categorical_features)
-    X_transformed = full_pipeline.fit_transform(X, y)
-    t0 = print_time("Pipeline fit & transform", t0)
+    # 4. Build & fit full pipeline, then feature selection (reused from the fit cache when unchanged)
+    full_pipeline, X_selected, selected_indices, cache_event = fit_preprocessing(
+        X, y, numeric_features, categorical_features, sparse=sparse, dtype=dtype,
+        cache=FitCache() if use_cache else None, method=selection_method,
+        previous_names=previous_selection() if selection_method == "warm" else None
+    )
+    t0 = print_time(f"Pipeline fit, transform & feature selection ({selection_method}, "
+                    f"fit cache: {cache_event['status']})", t0)
 
     # 5. Get transformed feature names
     try:
         feature_names = full_pipeline.named_steps["preprocessing"].get_feature_names_out()
     except (AttributeError, KeyError):
-        feature_names = [f"feature_{i}" for i in range(X_transformed.shape[1])]
-    t0 = print_time("Extracting feature names", t0)
-
-    # 6. Apply RFE feature selection
-    X_selected, selected_indices = apply_feature_selection(X_transformed, y)
-    t0 = print_time("Feature selection with RFE", t0)
+        feature_names = [f"feature_{i}" for i in range(max(selected_indices) + 1)]
 
-    # 7. Construct final pipeline for inference
+    # 6. Construct final pipeline for inference (its steps are already fitted)
     final_pipeline = Pipeline([
         ("feature_engineering", full_pipeline.named_steps["feature_engineering"]),
         ("preprocessing",       full_pipeline.named_steps["preprocessing"]),
         ("feature_selection",   FeatureSelector(selected_features=selected_indices)),
     ])
-    final_pipeline.fit(X, y)
     t0 = print_time("Final pipeline construction", t0)
 
+    # 7. Drop raw columns / categories that feed no selected feature
+    if prune:
+        try:
+            check_rows = X.sample(n=min(len(X), PRUNE_CHECK_ROWS), random_state=42)
+            final_pipeline = prune_pipeline(final_pipeline, X_check=check_rows)
+            print("✅ Pruned inference pipeline to the selected features' inputs")
+        except ValueError as e:
+            print(f"⚠️ Keeping unpruned inference pipeline: {e}")
+        t0 = print_time("Pipeline pruning", t0)
+
     # 8. Save pipeline and transformed data
     if save:
         os.makedirs("models", exist_ok=True)
-        joblib.dump(final_pipeline, "models/full_pipeline.pkl", compress=3)
-        print("✅ Saved pipeline to models/full_pipeline.pkl")
+        joblib.dump(final_pipeline, PIPELINE_PATH, compress=3)
+        print(f"✅ Saved pipeline to {PIPELINE_PATH}")
 
         selected_names = [feature_names[i] for i in selected_indices]
-        df_pre = pd.DataFrame(X_selected, columns=selected_names)
+        df_pre = pd.DataFrame(X_selected.toarray() if sp.issparse(X_selected) else X_selected,
+                              columns=selected_names)
         save_dataframe_to_postgres(df_pre, table_name="preprocessed_train_data")
         print(f"✅ Saved selected features to 'preprocessed_train_data' with columns: {selected_names}")
         t0 = print_time("Artifact saving", t0)
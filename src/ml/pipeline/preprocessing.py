@@ -1,5 +1,6 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
@@ -10,7 +11,14 @@ from sklearn.preprocessing import StandardScaler, OneHotEncoder
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
 # Import custom feature engineering transformer
-from src.ml.pipeline.feature_engineering import FeatureEngineeringTransformer
+from src.ml.pipeline.feature_engineering import FeatureEngineeringTransformer, DROP_COLUMNS
+from src.ml.pipeline.dtype_caster import DtypeCaster
+
+# Keep the one-hot block as CSR end to end (default: dense float64 matrix)
+SPARSE_PREPROCESSING = os.getenv("SPARSE_PREPROCESSING", "0").lower() in ("1", "true", "yes")
+
+# Compute/output dtype of the preprocessed features ("float64" or "float32")
+PIPELINE_DTYPE = os.getenv("PIPELINE_DTYPE", "float64")
 
 # ─────────────────────────────────────────────────────────────
 # 🧹 Step 1: Column Cleaning Function
@@ -26,19 +34,8 @@ def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: Cleaned DataFrame
     """
-    drop_cols = [
-        'Prospect ID', 'Lead Number', 'Magazine',
-        'Receive More Updates About Our Courses',
-        'Update me on Supply Chain Content',
-        'Get updates on DM Content',
-        'I agree to pay the amount through cheque',
-        'Newspaper Article', 'X Education Forums',
-        'Asymmetrique Activity Index', 'Asymmetrique Profile Index',
-        'Last Notable Activity', 'Page Views Per Visit'
-    ]
-
     # Drop columns only if they exist in the DataFrame
-    df = df.drop(columns=[col for col in drop_cols if col in df.columns], errors='ignore')
+    df = df.drop(columns=[col for col in DROP_COLUMNS if col in df.columns], errors='ignore')
     return df
 
 
@@ -46,35 +43,44 @@ def clean_columns(df: pd.DataFrame) -> pd.DataFrame:
 # ⚙️ Step 2: Column-wise Preprocessing Pipelines
 # ─────────────────────────────────────────────────────────────
 
-def get_preprocessing_pipeline(numeric_features, categorical_features):
+def get_preprocessing_pipeline(numeric_features, categorical_features, sparse=SPARSE_PREPROCESSING,
+                               dtype=PIPELINE_DTYPE):
     """
     Constructs column-wise preprocessing logic using sklearn pipelines.
     
     Parameters:
         numeric_features (list[str]): List of numeric column names
         categorical_features (list[str]): List of categorical column names
+        sparse (bool): Output a CSR matrix (sparse one-hot block, numeric
+            columns stacked alongside) instead of a dense array
+        dtype (str): Output dtype; anything but float64 casts the numeric
+            columns first so imputation and scaling run in that precision
 
     Returns:
         ColumnTransformer: Combined preprocessing pipeline
     """
 
     # Numeric pipeline: Impute missing values with median, then scale
-    numeric_pipeline = Pipeline([
+    numeric_steps = [
         ("imputer", SimpleImputer(strategy="median")),
         ("scaler", StandardScaler())
-    ])
+    ]
+    if np.dtype(dtype) != np.float64:
+        numeric_steps.insert(0, ("caster", DtypeCaster(dtype=dtype)))
+    numeric_pipeline = Pipeline(numeric_steps)
 
     # Categorical pipeline: Impute with most frequent, then apply OneHotEncoding
     categorical_pipeline = Pipeline([
         ("imputer", SimpleImputer(strategy="most_frequent")),
-        ("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=False))
+        ("encoder", OneHotEncoder(handle_unknown="ignore", sparse_output=sparse, dtype=np.dtype(dtype)))
     ])
 
     # Combine both into a single preprocessor
+    # (sparse_threshold=1.0: stay CSR whatever the overall density turns out to be)
     preprocessor = ColumnTransformer([
         ("num", numeric_pipeline, numeric_features),
         ("cat", categorical_pipeline, categorical_features)
-    ])
+    ], sparse_threshold=1.0 if sparse else 0.3)
 
     return preprocessor
 
@@ -83,7 +89,8 @@ def get_preprocessing_pipeline(numeric_features, categorical_features):
 # 🔄 Step 3: Full Preprocessing Pipeline (Feature Engg + Cleaning)
 # ─────────────────────────────────────────────────────────────
 
-def get_full_pipeline(numeric_features, categorical_features):
+def get_full_pipeline(numeric_features, categorical_features, sparse=SPARSE_PREPROCESSING,
+                      dtype=PIPELINE_DTYPE):
     """
     Constructs the complete preprocessing pipeline, including:
     - Feature engineering
@@ -92,11 +99,13 @@ def get_full_pipeline(numeric_features, categorical_features):
     Parameters:
         numeric_features (list[str]): List of numeric column names
         categorical_features (list[str]): List of categorical column names
+        sparse (bool): Produce CSR output (see `get_preprocessing_pipeline`)
+        dtype (str): Output dtype (see `get_preprocessing_pipeline`)
 
     Returns:
         Pipeline: A complete sklearn pipeline
     """
-    preprocessor = get_preprocessing_pipeline(numeric_features, categorical_features)
+    preprocessor = get_preprocessing_pipeline(numeric_features, categorical_features, sparse=sparse, dtype=dtype)
 
     full_pipeline = Pipeline([
         ("feature_engineering", FeatureEngineeringTransformer()),  # Adds behavioral flags and new features
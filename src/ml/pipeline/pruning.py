@@ -0,0 +1,245 @@
+import os
+import copy
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.ml.pipeline.dtype_caster import DtypeCaster
+from src.ml.pipeline.feature_selector import FeatureSelector
+
+# Drop unselected one-hot categories too (smaller output, slower OneHotEncoder.transform)
+PRUNE_CATEGORIES = os.getenv("PRUNE_CATEGORIES", "0").lower() in ("1", "true", "yes")
+
+# Fitted per-input-column attributes that are sliced when columns are dropped
+_PER_COLUMN_ATTRS = ("statistics_", "mean_", "var_", "scale_", "n_samples_seen_", "feature_names_in_")
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔍 Step 1: Which inputs/categories feed the selected outputs
+# ─────────────────────────────────────────────────────────────
+
+def _branch_steps(branch) -> List[Tuple[str, object]]:
+    """Steps of a ColumnTransformer branch, checked against what pruning can rewrite."""
+    steps = branch.steps if isinstance(branch, Pipeline) else [(None, branch)]
+    for _, step in steps:
+        if isinstance(step, SimpleImputer):
+            if step.add_indicator:
+                raise ValueError("SimpleImputer(add_indicator=True) is not supported")
+        elif isinstance(step, OneHotEncoder):
+            if step.drop_idx_ is not None or getattr(step, "infrequent_categories_", None):
+                raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+        elif not isinstance(step, (StandardScaler, DtypeCaster)):
+            raise ValueError(f"Unsupported preprocessing step: {type(step).__name__}")
+    return steps
+
+
+def _used_inputs(preprocessing: ColumnTransformer, selected: List[int],
+                 prune_categories: bool) -> Dict[str, dict]:
+    """
+    Map each ColumnTransformer branch to the input columns (and, for one-hot
+    branches, the categories) whose outputs are selected.
+
+    With `prune_categories=False` a one-hot column with any selected category
+    keeps all of its categories.
+
+    Returns:
+        dict: {branch name: {"columns": [input positions], "categories": {position: mask}}}
+    """
+    wanted = set(int(i) for i in selected)
+    used = {}
+    for name, branch, columns in preprocessing.transformers_:
+        if isinstance(branch, str):
+            if branch == "drop":
+                continue
+            raise ValueError(f"ColumnTransformer branch '{name}' = '{branch}' is not supported")
+        columns = list(columns)
+        if not columns:
+            continue
+
+        steps = _branch_steps(branch)
+        encoder = next((s for _, s in steps if isinstance(s, OneHotEncoder)), None)
+
+        # Input position j must map to output j (or to encoder column j): no features dropped on the way
+        outputs = preprocessing.output_indices_[name]
+        if (encoder.n_features_in_ if encoder is not None else outputs.stop - outputs.start) != len(columns):
+            raise ValueError(f"Branch '{name}' drops input features (e.g. all-missing columns)")
+
+        start = outputs.start
+        entry = {"columns": [], "categories": {}}
+        if encoder is None:
+            entry["columns"] = [j for j in range(len(columns)) if start + j in wanted]
+        else:
+            offset = start
+            for j, categories in enumerate(encoder.categories_):
+                mask = np.array([offset + k in wanted for k in range(len(categories))], dtype=bool)
+                if mask.any():
+                    if not prune_categories:
+                        mask[:] = True
+                    entry["columns"].append(j)
+                    entry["categories"][j] = mask
+                offset += len(categories)
+        if entry["columns"]:
+            used[name] = entry
+    return used
+
+
+# ─────────────────────────────────────────────────────────────
+# ✂️ Step 2: Rebuild the ColumnTransformer on the used inputs only
+# ─────────────────────────────────────────────────────────────
+
+def _slice_fitted(step, keep: List[int]):
+    """Copy of a fitted imputer/scaler/caster restricted to input positions `keep`."""
+    step = copy.deepcopy(step)
+    n_in = step.n_features_in_
+    for attr in _PER_COLUMN_ATTRS:
+        value = getattr(step, attr, None)
+        if isinstance(value, np.ndarray) and value.ndim == 1 and len(value) == n_in:
+            setattr(step, attr, value[keep])
+    step.n_features_in_ = len(keep)
+    return step
+
+
+def prune_preprocessing(preprocessing: ColumnTransformer, selected: List[int],
+                        prune_categories: bool = False) -> Tuple[ColumnTransformer, List[int]]:
+    """
+    Build a fitted ColumnTransformer computing only the inputs behind `selected`.
+
+    Whole input columns without a selected output are dropped. With
+    `prune_categories`, one-hot encoders also keep only their selected
+    categories (other values encode to all zeros, just like the unselected
+    columns they replace) — this shrinks the output, but OneHotEncoder's
+    per-value unknown-category handling makes the transform slower.
+
+    Returns:
+        Tuple[ColumnTransformer, List[int]]: The pruned transformer and the
+        positions of the original `selected` outputs in its output.
+    """
+    used = _used_inputs(preprocessing, selected, prune_categories)
+    fitted = {name: (branch, list(columns)) for name, branch, columns in preprocessing.transformers_}
+
+    # Unfitted spec: same branches on fewer columns, encoders with explicit categories
+    specs, fill_values = [], {}
+    for name, entry in used.items():
+        branch, columns = fitted[name]
+        keep = entry["columns"]
+        spec = clone(branch)
+        for step_name, step in (spec.steps if isinstance(spec, Pipeline) else [(None, spec)]):
+            if isinstance(step, OneHotEncoder):
+                encoder = dict(_branch_steps(branch))[step_name] if step_name else branch
+                step.set_params(categories=[list(encoder.categories_[j][entry["categories"][j]]) for j in keep])
+        specs.append((name, spec, [columns[j] for j in keep]))
+
+        # One training-like value per column so the bookkeeping fit below sees no empty columns
+        imputer = next((s for _, s in _branch_steps(branch) if isinstance(s, SimpleImputer)), None)
+        for j in keep:
+            fill = imputer.statistics_[j] if imputer is not None else 0.0
+            fill_values[columns[j]] = fill
+
+    pruned = clone(preprocessing).set_params(transformers=specs, remainder="drop")
+    pruned.fit(pd.DataFrame({col: [value] for col, value in fill_values.items()}))
+    pruned.sparse_output_ = preprocessing.sparse_output_  # not the placeholder row's density
+
+    # Swap the placeholder-fitted imputers/scalers for slices of the real ones
+    transformers = []
+    for name, spec_fitted, columns in pruned.transformers_:
+        if name not in used:
+            transformers.append((name, spec_fitted, columns))
+            continue
+        keep = used[name]["columns"]
+        original_steps = _branch_steps(fitted[name][0])
+        if isinstance(spec_fitted, Pipeline):
+            for i, (step_name, step) in enumerate(spec_fitted.steps):
+                if not isinstance(step, OneHotEncoder):
+                    spec_fitted.steps[i] = (step_name, _slice_fitted(original_steps[i][1], keep))
+        elif not isinstance(spec_fitted, OneHotEncoder):
+            spec_fitted = _slice_fitted(original_steps[0][1], keep)
+        transformers.append((name, spec_fitted, columns))
+    pruned.transformers_ = transformers
+
+    # Original output index → pruned output index
+    position, new_index = 0, {}
+    for name, branch, columns in preprocessing.transformers_:
+        if name not in used:
+            continue
+        start = preprocessing.output_indices_[name].start
+        entry = used[name]
+        if not entry["categories"]:
+            for j in entry["columns"]:
+                new_index[start + j] = position
+                position += 1
+        else:
+            offset = start
+            encoder = next(s for _, s in _branch_steps(branch) if isinstance(s, OneHotEncoder))
+            for j, categories in enumerate(encoder.categories_):
+                mask = entry["categories"].get(j)
+                if mask is not None:
+                    for k in np.flatnonzero(mask):
+                        new_index[offset + int(k)] = position
+                        position += 1
+                offset += len(categories)
+    return pruned, [new_index[int(i)] for i in selected]
+
+
+def _dense(X) -> np.ndarray:
+    return np.asarray(X.toarray() if sparse.issparse(X) else X, dtype=np.float64)
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔄 Step 3: Rewrite the full inference pipeline
+# ─────────────────────────────────────────────────────────────
+
+def prune_pipeline(pipeline: Pipeline, X_check: Optional[pd.DataFrame] = None,
+                   prune_categories: bool = PRUNE_CATEGORIES) -> Pipeline:
+    """
+    Rewrite a fitted `feature_engineering → preprocessing → feature_selection`
+    pipeline so only the raw inputs (and optionally the one-hot categories)
+    feeding the selected features are computed.
+
+    The result has the same steps, output columns and feature names
+    (`preprocessing.get_feature_names_out()[selected_features]`).
+
+    Args:
+        pipeline (Pipeline): Fitted pipeline as built by `run_pipeline`.
+        X_check (pd.DataFrame, optional): Raw rows on which both pipelines must
+            produce identical output.
+        prune_categories (bool): Also drop unselected one-hot categories (see
+            `prune_preprocessing`).
+
+    Returns:
+        Pipeline: The pruned pipeline.
+
+    Raises:
+        ValueError: If the layout is unsupported or the outputs differ on `X_check`.
+    """
+    steps = dict(pipeline.steps)
+    preprocessing = steps.get("preprocessing")
+    selector = steps.get("feature_selection")
+    if not isinstance(preprocessing, ColumnTransformer) or selector is None:
+        raise ValueError("Pipeline needs fitted 'preprocessing' and 'feature_selection' steps")
+
+    pruned_preprocessing, selected = prune_preprocessing(
+        preprocessing, list(selector.selected_features), prune_categories=prune_categories)
+    pruned = Pipeline([
+        (name, pruned_preprocessing if name == "preprocessing"
+         else FeatureSelector(selected_features=selected) if name == "feature_selection"
+         else step)
+        for name, step in pipeline.steps
+    ])
+
+    before = np.asarray(preprocessing.get_feature_names_out())[list(selector.selected_features)]
+    after = np.asarray(pruned_preprocessing.get_feature_names_out())[selected]
+    if list(before) != list(after):
+        raise ValueError("Pruned pipeline changed the selected feature names")
+
+    if X_check is not None:
+        expected, got = _dense(pipeline.transform(X_check)), _dense(pruned.transform(X_check))
+        if expected.shape != got.shape or not np.array_equal(expected, got, equal_nan=True):
+            raise ValueError("Pruned pipeline output differs from the original")
+    return pruned
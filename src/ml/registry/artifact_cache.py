@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+src/ml/registry/artifact_cache.py
+
+Host-local, content-addressed cache for MLflow registry artifacts.
+
+Registered models are downloaded once per host into
+`<root>/<name>/<version>-<sha256[:16]>/` and loaded from there afterwards, so
+Flask workers, Airflow tasks and scripts on the same machine stop re-resolving
+and re-downloading `models:/...` URIs on every start. A file lock serialises
+downloads and index updates across processes, the cache is trimmed by total
+size in least-recently-used order, and the last known version per stage is
+remembered so loads keep working while the tracking server is slow or down.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from typing import List, Optional
+
+from filelock import FileLock
+
+# ─────────────────────────────────────────────────────────────
+# ⚙️ Defaults (overridable via env)
+# ─────────────────────────────────────────────────────────────
+DEFAULT_CACHE_DIR = os.getenv(
+    "MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lead_scoring_model_cache")
+)
+DEFAULT_MAX_BYTES = int(float(os.getenv("MODEL_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+DEFAULT_RESOLVE_TIMEOUT = float(os.getenv("MODEL_CACHE_RESOLVE_TIMEOUT", "10"))
+
+INDEX_FILE = "index.json"
+LOCK_FILE = ".cache.lock"
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔐 Checksums & sizes
+# ─────────────────────────────────────────────────────────────
+def directory_checksum(path: str) -> str:
+    """
+    SHA-256 over every file (relative path + contents) below `path`, in sorted order.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for fname in sorted(files):
+            full = os.path.join(root, fname)
+            digest.update(os.path.relpath(full, path).encode("utf-8"))
+            with open(full, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def _directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, fname))
+        for root, _, files in os.walk(path)
+        for fname in files
+    )
+
+
+def _download(name: str, version: str, dst_path: str) -> str:
+    import mlflow.artifacts
+    return mlflow.artifacts.download_artifacts(artifact_uri=f"models:/{name}/{version}", dst_path=dst_path)
+
+
+def _load_local(path: str):
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(path)
+
+
+# ─────────────────────────────────────────────────────────────
+# 📦 Artifact cache
+# ─────────────────────────────────────────────────────────────
+class ArtifactCache:
+    """
+    On-disk registry artifact cache shared by all processes on a host.
+
+    Args:
+        root (str, optional): Cache directory (env MODEL_CACHE_DIR).
+        max_bytes (int, optional): Size budget; least recently used entries beyond
+            it are evicted (env MODEL_CACHE_MAX_MB).
+        resolve_timeout (float, optional): Seconds to wait for the registry when
+            resolving a stage before falling back to the cached version
+            (env MODEL_CACHE_RESOLVE_TIMEOUT).
+        client (MlflowClient, optional): Registry client (created lazily).
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None,
+                 resolve_timeout: Optional[float] = None, client=None):
+        self.root = os.path.abspath(root or DEFAULT_CACHE_DIR)
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.resolve_timeout = DEFAULT_RESOLVE_TIMEOUT if resolve_timeout is None else resolve_timeout
+        self._client = client
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, INDEX_FILE)
+        self.lock = FileLock(os.path.join(self.root, LOCK_FILE))
+
+        # Per-process load log: one entry per load_model call
+        self.loads: List[dict] = []
+
+    @property
+    def client(self):
+        if self._client is None:
+            from mlflow.tracking import MlflowClient
+            self._client = MlflowClient()
+        return self._client
+
+    # ─────────────────────────────────────────
+    # Index (always read/written under self.lock)
+    # ─────────────────────────────────────────
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault("entries", {})
+        index.setdefault("stages", {})
+        return index
+
+    def _write_index(self, index: dict) -> None:
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+    @staticmethod
+    def _key(name: str, version: str) -> str:
+        return f"{name}/{version}"
+
+    def entries(self) -> dict:
+        """Snapshot of cached artifacts keyed by 'name/version'."""
+        with self.lock:
+            return self._read_index()["entries"]
+
+    # ─────────────────────────────────────────
+    # Stage resolution with offline fallback
+    # ─────────────────────────────────────────
+    def _registry_version(self, name: str, stage: str):
+        versions = self.client.get_latest_versions(name, stages=[stage])
+        if not versions:
+            raise LookupError(f"No '{stage}' version registered for '{name}'")
+        return max(versions, key=lambda v: int(v.version))
+
+    def _registry_version_within(self, name: str, stage: str):
+        """`_registry_version` bounded by `resolve_timeout` (the MLflow client retries for minutes)."""
+        result = {}
+
+        def run():
+            try:
+                result["version"] = self._registry_version(name, stage)
+            except Exception as e:
+                result["error"] = e
+
+        worker = threading.Thread(target=run, name="artifact-cache-resolve", daemon=True)
+        worker.start()
+        worker.join(self.resolve_timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"registry did not answer within {self.resolve_timeout:.0f}s")
+        if "error" in result:
+            raise result["error"]
+        return result["version"]
+
+    def resolve(self, name: str, stage: str = "Production") -> str:
+        """
+        Version of `name` currently in `stage`.
+
+        Asks the registry (bounded by `resolve_timeout`) and remembers the answer.
+        If the registry is unreachable or too slow, returns the last version seen
+        for that stage, provided it is still cached.
+
+        Raises:
+            LookupError: If the stage has no registered version.
+            Exception: Registry errors when there is nothing cached to fall back to.
+        """
+        stage_key = f"{name}@{stage}"
+        try:
+            mv = self._registry_version_within(name, stage)
+        except LookupError:
+            raise
+        except Exception as e:
+            reason = f"failed ({type(e).__name__}: {e})"
+            with self.lock:
+                index = self._read_index()
+            version = index["stages"].get(stage_key)
+            entry = index["entries"].get(self._key(name, version)) if version else None
+            if entry is None or not os.path.isdir(entry["path"]):
+                raise
+            print(f"⚠️ Registry lookup for '{name}' ({stage}) {reason}; using cached v{version}")
+            return version
+
+        version = str(mv.version)
+        with self.lock:
+            index = self._read_index()
+            if index["stages"].get(stage_key) != version:
+                index["stages"][stage_key] = version
+                self._write_index(index)
+        return version
+
+    # ─────────────────────────────────────────
+    # Fetch / load
+    # ─────────────────────────────────────────
+    def fetch(self, name: str, version: str) -> str:
+        """
+        Local directory holding the artifact for `name`/`version`, downloading it on a miss.
+
+        Returns:
+            str: Path to the cached MLflow model directory.
+        """
+        path, _ = self._fetch(name, str(version))
+        return path
+
+    def _lookup(self, key: str):
+        """Cached path for `key` (touching its LRU timestamp), or None."""
+        with self.lock:
+            index = self._read_index()
+            entry = index["entries"].get(key)
+            if entry is None or not os.path.isdir(entry["path"]):
+                return None
+            entry["last_access"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._write_index(index)
+            return entry["path"]
+
+    def _fetch(self, name: str, version: str):
+        key = self._key(name, version)
+        path = self._lookup(key)
+        if path is not None:
+            return path, True
+
+        # Miss: one download per artifact per host; other processes wait on the key lock,
+        # while hits on other artifacts only need the (short) index lock.
+        key_lock = FileLock(os.path.join(self.root, f".{name}-{version}.lock"))
+        with key_lock:
+            path = self._lookup(key)
+            if path is not None:
+                return path, True
+
+            staging = tempfile.mkdtemp(prefix=".download-", dir=self.root)
+            try:
+                downloaded = _download(name, version, staging)
+                checksum = directory_checksum(downloaded)
+                final = os.path.join(self.root, name, f"{version}-{checksum[:16]}")
+                if os.path.isdir(final):
+                    shutil.rmtree(final)
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.replace(downloaded, final)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+            with self.lock:
+                index = self._read_index()
+                index["entries"][key] = {
+                    "path": final,
+                    "checksum": checksum,
+                    "bytes": _directory_size(final),
+                    "downloaded_at": time.time(),
+                    "last_access": time.time(),
+                    "hits": 0,
+                }
+                self._evict(index, keep=key)
+                self._write_index(index)
+            return final, False
+
+    def _evict(self, index: dict, keep: str) -> None:
+        """Drop least recently used entries (never `keep`) until the cache fits `max_bytes`."""
+        entries = index["entries"]
+        total = sum(e["bytes"] for e in entries.values())
+        for key, entry in sorted(entries.items(), key=lambda kv: kv[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(entry["path"], ignore_errors=True)
+            total -= entry["bytes"]
+            del entries[key]
+            print(f"[INFO] Evicted cached artifact {key} ({entry['bytes'] / 1024 / 1024:.1f} MB)")
+
+    def verify(self, name: str, version: str) -> bool:
+        """Recompute the checksum of a cached artifact and compare it to the index."""
+        with self.lock:
+            entry = self._read_index()["entries"].get(self._key(name, str(version)))
+        return entry is not None and os.path.isdir(entry["path"]) \
+            and directory_checksum(entry["path"]) == entry["checksum"]
+
+    def load_model(self, name: str, version: str):
+        """
+        Load a registered sklearn model through the cache.
+
+        Drop-in for `mlflow.sklearn.load_model(f"models:/{name}/{version}")`;
+        usable directly as the ModelManager `loader`.
+        """
+        t0 = time.perf_counter()
+        path, warm = self._fetch(name, str(version))
+        t_fetch = time.perf_counter() - t0
+        model = _load_local(path)
+        total = time.perf_counter() - t0
+
+        self.loads.append({
+            "name": name,
+            "version": str(version),
+            "cache": "warm" if warm else "cold",
+            "fetch_s": round(t_fetch, 4),
+            "total_s": round(total, 4),
+        })
+        print(f"[⏱️] {name} v{version} loaded ({'warm' if warm else 'cold'} cache) in {total:.2f}s")
+        return model
+
+    def load_stage(self, name: str, stage: str = "Production"):
+        """Resolve `stage` (with offline fallback) and load that version through the cache."""
+        return self.load_model(name, self.resolve(name, stage))
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Cache size, entries and this process's cold/warm load timings.
+        """
+        entries = self.entries()
+        return {
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+            "bytes": sum(e["bytes"] for e in entries.values()),
+            "entries": sorted(entries),
+            "loads": list(self.loads),
+        }
+
+
+# ─────────────────────────────────────────────────────────────
+# 🌐 Process-wide default cache
+# ─────────────────────────────────────────────────────────────
+_default_cache: Optional[ArtifactCache] = None
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Shared ArtifactCache configured from env (created on first use)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ArtifactCache()
+    return _default_cache
+
+
+def load_registered_model(name: str, stage: str = "Production"):
+    """Load the `stage` version of `name` via the host-local artifact cache."""
+    return get_artifact_cache().load_stage(name, stage)
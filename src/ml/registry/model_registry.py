@@ -3,6 +3,7 @@ import mlflow.sklearn
 from mlflow.tracking import MlflowClient
 from mlflow.exceptions import MlflowException
 from datetime import datetime
+from typing import Optional
 
 # ─────────────────────────────────────────────────────────────
 # 🏷️ Ensure Model Registry Entry Exists
@@ -37,6 +38,10 @@ def _promote_to_production(client, registry_name: str, version: str):
     )
     print(f"🚀 Model '{registry_name}' version {version} promoted to 'Production'")
 
+def promote_version(registry_name: str, version: str):
+    """Promote an already registered version of `registry_name` to 'Production'."""
+    _promote_to_production(MlflowClient(), registry_name, str(version))
+
 # ─────────────────────────────────────────────────────────────
 # 🔐 Register and Promote Model or Pipeline
 # ─────────────────────────────────────────────────────────────
@@ -45,7 +50,9 @@ def register_and_promote(
     model_object=None,
     run_id: str = None,
     model_uri: str = None,
-    is_pipeline: bool = False
+    is_pipeline: bool = False,
+    promote: bool = True,
+    tags: Optional[dict] = None
 ):
     """
     Registers and promotes a model or preprocessor to MLflow Model Registry.
@@ -56,9 +63,11 @@ def register_and_promote(
         run_id (str): MLflow run ID (used if is_pipeline=False).
         model_uri (str): Path to model artifact (e.g., 'runs:/<run_id>/model').
         is_pipeline (bool): Set True if logging a preprocessing pipeline.
+        promote (bool): Promote the new version to 'Production' (False: only register it).
+        tags (dict, optional): Tags set on the new model version before promotion.
     
     Returns:
-        None
+        str or None: The registered version (None if the preprocessor could not be registered).
     """
     client = MlflowClient()
     _ensure_model_registered(client, registry_name)
@@ -85,7 +94,10 @@ def register_and_promote(
             return
 
         latest_version = versions[0].version
-        _promote_to_production(client, registry_name, latest_version)
+        _set_version_tags(client, registry_name, latest_version, tags)
+        if promote:
+            _promote_to_production(client, registry_name, latest_version)
+        return str(latest_version)
 
     # ── Registering a trained model ──
     else:
@@ -110,4 +122,53 @@ def register_and_promote(
             else:
                 raise
 
-        _promote_to_production(client, registry_name, mv.version)
+        _set_version_tags(client, registry_name, mv.version, tags)
+        if promote:
+            _promote_to_production(client, registry_name, mv.version)
+        return str(mv.version)
+
+
+def _set_version_tags(client, registry_name: str, version: str, tags: Optional[dict]):
+    for key, value in (tags or {}).items():
+        client.set_model_version_tag(registry_name, version, key, str(value))
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔗 Register and Promote a Preprocessor + Model Pair
+# ─────────────────────────────────────────────────────────────
+PAIRED_PREPROCESSOR_TAG = "preprocessor_version"
+
+
+def promote_pair(
+    pipeline,
+    run_id: str,
+    model_uri: str,
+    preprocessor_name: str = "LeadScoringPreprocessor",
+    model_name: str = "LeadScoringBestModel",
+    model_tags: Optional[dict] = None
+) -> dict:
+    """
+    Register a preprocessor and the model trained on its output, then promote
+    the model before the preprocessor.
+
+    The model version is tagged with the preprocessor version it was built
+    for (`preprocessor_version`). Serving (`ModelManager`) refuses a
+    Production pair whose tag does not match, so the window between the two
+    promotions never serves a mismatched pair.
+
+    Returns:
+        dict: {"preprocessor": version, "model": version}.
+
+    Raises:
+        RuntimeError: If the preprocessor could not be registered.
+    """
+    preprocessor_version = register_and_promote(preprocessor_name, model_object=pipeline,
+                                                is_pipeline=True, promote=False)
+    if preprocessor_version is None:
+        raise RuntimeError(f"Preprocessor '{preprocessor_name}' could not be registered")
+    model_version = register_and_promote(
+        model_name, run_id=run_id, model_uri=model_uri, is_pipeline=False,
+        tags={PAIRED_PREPROCESSOR_TAG: preprocessor_version, **(model_tags or {})}
+    )
+    promote_version(preprocessor_name, preprocessor_version)
+    return {"preprocessor": preprocessor_version, "model": model_version}
@@ -0,0 +1,479 @@
+# ===============================
+# 📁 Module: Incremental Retraining
+# Folds newly labelled rows into the fitted preprocessing pipeline and
+# continues training the deployed model, instead of refitting both from
+# the full history.
+# ===============================
+
+import os
+import copy
+import json
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.ml.pipeline.feature_selector import FeatureSelector
+
+# 📌 Largest share of new rows (per categorical column) with categories the
+#    encoder has never seen; above it the vocabulary changed too much → full retrain
+INCREMENTAL_MAX_UNSEEN_SHARE = float(os.getenv("INCREMENTAL_MAX_UNSEEN_SHARE", "0.05"))
+
+# 📌 Largest batch, relative to the rows the pipeline was fitted on, folded in incrementally
+INCREMENTAL_MAX_NEW_SHARE = float(os.getenv("INCREMENTAL_MAX_NEW_SHARE", "0.5"))
+
+
+# ======================================================
+# 🔍 Pipeline introspection
+# ======================================================
+def _steps(branch) -> List[Tuple[Optional[str], object]]:
+    return branch.steps if isinstance(branch, Pipeline) else [(None, branch)]
+
+
+def _branches(preprocessing: ColumnTransformer):
+    """(name, steps, input columns) of every fitted ColumnTransformer branch."""
+    for name, branch, columns in preprocessing.transformers_:
+        if isinstance(branch, str) or not len(columns):
+            continue
+        yield name, _steps(branch), list(columns)
+
+
+def seen_rows(pipeline: Pipeline) -> Optional[int]:
+    """Rows the pipeline's statistics were computed on (from its StandardScaler), or None."""
+    for _, steps, _ in _branches(pipeline.named_steps["preprocessing"]):
+        for _, step in steps:
+            if isinstance(step, StandardScaler):
+                return int(np.max(step.n_samples_seen_))
+    return None
+
+
+def selected_feature_names(pipeline: Pipeline) -> List[str]:
+    """Names of the model's input columns, in order."""
+    names = pipeline.named_steps["preprocessing"].get_feature_names_out()
+    return [str(names[i]) for i in pipeline.named_steps["feature_selection"].selected_features]
+
+
+def continuation_kind(model) -> Optional[str]:
+    """How `model` keeps training on new rows, or None if it can only be refitted from scratch."""
+    name = type(model).__name__
+    if name == "XGBClassifier":
+        return "xgboost"
+    if name == "LGBMClassifier":
+        return "lightgbm"
+    if name in ("GradientBoostingClassifier", "RandomForestClassifier", "ExtraTreesClassifier"):
+        return "warm_start"
+    if hasattr(model, "partial_fit"):
+        return "partial_fit"
+    return None
+
+
+# ======================================================
+# 🚦 Can the new rows be folded in?
+# ======================================================
+def check_incremental(pipeline: Pipeline, model, X_new: pd.DataFrame, y_new,
+                      max_unseen_share: float = INCREMENTAL_MAX_UNSEEN_SHARE,
+                      max_new_share: float = INCREMENTAL_MAX_NEW_SHARE) -> List[str]:
+    """
+    Reasons the new rows need a full retrain instead (empty list: incremental is fine).
+
+    Args:
+        pipeline (Pipeline): Fitted feature_engineering → preprocessing → feature_selection.
+        model: Fitted classifier on the pipeline's output.
+        X_new (pd.DataFrame): New rows, cleaned, without the target.
+        y_new: Their labels.
+        max_unseen_share (float): See INCREMENTAL_MAX_UNSEEN_SHARE.
+        max_new_share (float): See INCREMENTAL_MAX_NEW_SHARE.
+
+    Returns:
+        List[str]: Human-readable reasons.
+    """
+    reasons = []
+    if continuation_kind(model) is None:
+        reasons.append(f"{type(model).__name__} cannot continue training on new rows")
+    if pd.Series(np.asarray(y_new)).nunique() < 2:
+        reasons.append("the new rows contain a single class")
+
+    # Schema: the raw columns the pipeline was fitted on
+    expected = getattr(pipeline.named_steps["feature_engineering"], "feature_names_in_", None)
+    if expected is not None:
+        missing = sorted(set(expected) - set(X_new.columns))
+        added = sorted(set(X_new.columns) - set(expected))
+        if missing:
+            reasons.append(f"columns missing from the new rows: {missing}")
+        if added:
+            reasons.append(f"columns not seen in training: {added}")
+        if missing or added:
+            return reasons
+
+    seen = seen_rows(pipeline)
+    if seen is None:
+        reasons.append("the pipeline has no StandardScaler recording how many rows it has seen")
+    elif len(X_new) > max_new_share * seen:
+        reasons.append(f"{len(X_new)} new rows are more than {max_new_share:.0%} of the {seen} rows seen")
+
+    # Dtypes and vocabularies of the columns the preprocessing consumes
+    X_fe = pipeline.named_steps["feature_engineering"].transform(X_new)
+    for _, steps, columns in _branches(pipeline.named_steps["preprocessing"]):
+        encoder = next((s for _, s in steps if isinstance(s, OneHotEncoder)), None)
+        if encoder is None:
+            changed = [c for c in columns if not pd.api.types.is_numeric_dtype(X_fe[c])]
+            if changed:
+                reasons.append(f"numeric columns with non-numeric values: {changed}")
+            continue
+        for col, categories in zip(columns, encoder.categories_):
+            values = X_fe[col].dropna()
+            unseen = (~values.isin(categories)).sum() / max(len(X_fe), 1)
+            if unseen > max_unseen_share:
+                reasons.append(f"'{col}': {unseen:.1%} of the new rows have unseen categories")
+    return reasons
+
+
+# ======================================================
+# 🧮 Preprocessing statistics update
+# ======================================================
+def _update_numeric(steps, X: pd.DataFrame) -> Dict[int, Tuple[float, float]]:
+    """
+    Fold `X` into a numeric branch's scaler (`StandardScaler.partial_fit`,
+    exact mean/variance over all rows seen).
+
+    Imputer fill values are kept, so rows with missing values transform as
+    before the update (the median of all rows seen cannot be updated exactly
+    from the stored statistic anyway).
+
+    Returns:
+        dict: {input position: (a, b)} with old scaled value = a · new scaled value + b.
+    """
+    Xt, affine = X, {}
+    for _, step in steps:
+        if isinstance(step, StandardScaler):
+            n = step.n_features_in_
+            mean_old = step.mean_.copy() if step.mean_ is not None else np.zeros(n)
+            scale_old = step.scale_.copy() if step.scale_ is not None else np.ones(n)
+            step.partial_fit(Xt)
+            mean_new = step.mean_ if step.mean_ is not None else np.zeros(n)
+            scale_new = step.scale_ if step.scale_ is not None else np.ones(n)
+            # (x - m0)/s0 = s1/s0 · (x - m1)/s1 + (m1 - m0)/s0
+            affine = {j: (scale_new[j] / scale_old[j], (mean_new[j] - mean_old[j]) / scale_old[j])
+                      for j in range(n)}
+        Xt = step.transform(Xt)
+    return affine
+
+
+def _new_categories(steps, X: pd.DataFrame) -> Dict[int, list]:
+    """{input position: categories first seen in `X`} for a one-hot branch (values after its imputer)."""
+    encoder = next(s for _, s in steps if isinstance(s, OneHotEncoder))
+    imputer = next((s for _, s in steps if isinstance(s, SimpleImputer)), None)
+    values = imputer.transform(X) if imputer is not None else np.asarray(X, dtype=object)
+    new = {}
+    for j in range(X.shape[1]):
+        known = set(encoder.categories_[j].tolist())
+        unseen = sorted({v for v in values[:, j] if not pd.isna(v) and v not in known}, key=str)
+        if unseen:
+            new[j] = unseen
+    return new
+
+
+def _with_categories(preprocessing: ColumnTransformer, extra: Dict[str, Dict[int, list]]) -> ColumnTransformer:
+    """
+    Fitted copy of `preprocessing` whose one-hot encoders also know the `extra`
+    categories ({branch: {input position: values}}), appended after the existing ones.
+
+    Built through the public API, as `prune_preprocessing` does: encoders get
+    explicit `categories=`, the transformer is fitted on a one-row placeholder
+    (which sets every encoder and output slice), then the placeholder-fitted
+    imputers/scalers are swapped for the real ones.
+    """
+    fitted = {name: branch for name, branch, _ in preprocessing.transformers_ if not isinstance(branch, str)}
+    specs, fill_values = [], {}
+    for name, steps, columns in _branches(preprocessing):
+        spec = clone(fitted[name])
+        for (_, step), (_, fitted_step) in zip(_steps(spec), steps):
+            if isinstance(step, OneHotEncoder):
+                step.set_params(categories=[list(c) + extra.get(name, {}).get(j, [])
+                                            for j, c in enumerate(fitted_step.categories_)])
+        specs.append((name, spec, columns))
+
+        # One training value per column, valid for every step of the branch
+        encoder = next((s for _, s in steps if isinstance(s, OneHotEncoder)), None)
+        imputer = next((s for _, s in steps if isinstance(s, SimpleImputer)), None)
+        for j, col in enumerate(columns):
+            fill_values[col] = (encoder.categories_[j][0] if encoder is not None
+                                else imputer.statistics_[j] if imputer is not None else 0.0)
+
+    rebuilt = clone(preprocessing).set_params(transformers=specs, remainder="drop")
+    rebuilt.fit(pd.DataFrame({col: [value] for col, value in fill_values.items()}))
+    rebuilt.sparse_output_ = preprocessing.sparse_output_  # not the placeholder row's density
+
+    transformers = []
+    for name, spec_fitted, columns in rebuilt.transformers_:
+        if name in fitted:
+            if isinstance(spec_fitted, Pipeline):
+                for i, (step_name, step) in enumerate(spec_fitted.steps):
+                    if not isinstance(step, OneHotEncoder):
+                        spec_fitted.steps[i] = (step_name, fitted[name].steps[i][1])
+            elif not isinstance(spec_fitted, OneHotEncoder):
+                spec_fitted = fitted[name]
+        transformers.append((name, spec_fitted, columns))
+    rebuilt.transformers_ = transformers
+    return rebuilt
+
+
+def update_preprocessing(pipeline: Pipeline, X_new: pd.DataFrame) -> Tuple[Pipeline, Dict[str, tuple], dict]:
+    """
+    Copy of the fitted pipeline with the new rows folded into its statistics.
+
+    - Numeric branches: scaler mean/variance updated exactly; imputer fill
+      values kept.
+    - One-hot branches: new categories appended to the vocabulary. They get
+      output columns of their own, which no selected feature uses; the
+      selector's indices are remapped so the model sees the same columns.
+    - Most-frequent fill values of categorical imputers are kept (the
+      category counts behind them are not stored).
+
+    Returns:
+        Tuple[Pipeline, dict, dict]: The updated pipeline, {output feature
+        name: (a, b)} with old scaled value = a · new + b, and {column: added categories}.
+    """
+    pipeline = copy.deepcopy(pipeline)
+    preprocessing = pipeline.named_steps["preprocessing"]
+    selected = selected_feature_names(pipeline)
+    X_fe = pipeline.named_steps["feature_engineering"].transform(X_new)
+
+    affine, extra, added = {}, {}, {}
+    names = preprocessing.get_feature_names_out()
+    for name, steps, columns in _branches(preprocessing):
+        if any(isinstance(s, OneHotEncoder) for _, s in steps):
+            new = _new_categories(steps, X_fe[columns])
+            if new:
+                extra[name] = new
+                added.update({columns[j]: [str(v) for v in values] for j, values in new.items()})
+            continue
+        start = preprocessing.output_indices_[name].start
+        for j, shift in _update_numeric(steps, X_fe[columns]).items():
+            affine[str(names[start + j])] = shift
+
+    if extra:
+        # Output columns move when a one-hot branch widens: remap the selection by name
+        preprocessing = _with_categories(preprocessing, extra)
+        names = [str(n) for n in preprocessing.get_feature_names_out()]
+        pipeline = Pipeline([
+            (step_name, preprocessing if step_name == "preprocessing"
+             else FeatureSelector(selected_features=[names.index(n) for n in selected])
+             if step_name == "feature_selection" else step)
+            for step_name, step in pipeline.steps
+        ])
+    return pipeline, affine, added
+
+
+# ======================================================
+# 📐 Re-expressing the model in the updated feature scale
+# ======================================================
+def _moved_thresholds(thresholds, feature, a: np.ndarray, b: np.ndarray, ties_left: bool) -> np.ndarray:
+    """
+    Split thresholds on the updated scale: t' = (t - b) / a.
+
+    Trees compare float32 inputs, and a threshold that is itself a float32
+    value can equal a training value (XGBoost's cut points always do).
+    Rescaled, that value lands within an ulp of t' on either side, so such
+    thresholds are moved 2 float32 ulps towards the side the tied value took
+    before (left for `x <= t`, right for `x < t`). Thresholds of unchanged
+    features are returned as they are.
+    """
+    thresholds, feature = np.asarray(thresholds, dtype=np.float64), np.asarray(feature)
+    changed = (a[feature] != 1.0) | (b[feature] != 0.0)
+    moved = (thresholds - b[feature]) / a[feature]
+    tie = thresholds.astype(np.float32).astype(np.float64) == thresholds  # can be a training value
+    ulps = 2 * np.spacing(np.abs(moved).astype(np.float32)).astype(np.float64) * tie
+    moved = moved + ulps if ties_left else moved - ulps
+    return np.where(changed, moved, thresholds)
+
+
+def _rescale_trees(trees, a: np.ndarray, b: np.ndarray) -> None:
+    for tree in trees:
+        internal = tree.tree_.feature >= 0
+        feature = tree.tree_.feature[internal]
+        tree.tree_.threshold[internal] = _moved_thresholds(tree.tree_.threshold[internal], feature, a, b,
+                                                           ties_left=True)
+
+
+def _rescale_xgboost(booster, a: np.ndarray, b: np.ndarray) -> None:
+    model = json.loads(booster.save_raw("json"))
+    for tree in model["learner"]["gradient_booster"]["model"]["trees"]:
+        split_types = tree.get("split_type", [0] * len(tree["left_children"]))
+        conditions = tree["split_conditions"]
+        for node, (left, feature) in enumerate(zip(tree["left_children"], tree["split_indices"])):
+            if left != -1 and not split_types[node]:
+                conditions[node] = float(_moved_thresholds(np.float32([conditions[node]]), [feature], a, b,
+                                                           ties_left=False)[0])
+    booster.load_model(bytearray(json.dumps(model), "utf-8"))
+
+
+def _rescale_lightgbm(booster, a: np.ndarray, b: np.ndarray) -> None:
+    # tree_sizes (byte offsets for parallel parsing) no longer match once thresholds change
+    lines = [line for line in booster.model_to_string().splitlines() if not line.startswith("tree_sizes=")]
+    features = []
+    for i, line in enumerate(lines):
+        key, _, value = line.partition("=")
+        if key == "split_feature":
+            features = [int(f) for f in value.split()]
+        elif key == "threshold":
+            thresholds = [float(t) for t in value.split()]
+            decisions = [int(d) for d in lines[i + 1].partition("=")[2].split()]
+            moved = _moved_thresholds(thresholds, features, a, b, ties_left=True)
+            lines[i] = "threshold=" + " ".join(
+                repr(t if d & 1 else float(m))  # bit 0: categorical split, left as is
+                for t, m, d in zip(thresholds, moved, decisions))
+    booster.model_from_string("\n".join(lines) + "\n")
+
+
+def rescale_model(model, shifts: Sequence[Tuple[float, float]]):
+    """
+    Copy of `model` whose decisions on the updated features equal the original
+    model's decisions on the old ones, for every input column j where
+    old value = a_j · new value + b_j (`shifts[j] = (a_j, b_j)`).
+
+    Tree splits get their thresholds moved, linear models their coefficients
+    and intercept; other models are returned unchanged. Exact for linear
+    models. Trees compare float32 inputs, so a row whose value lies within a
+    float32 rounding step of a split threshold can still take the other
+    branch: XGBoost/LightGBM split on training values (handled by the tie
+    nudge in `_moved_thresholds`), sklearn trees on midpoints between them,
+    where such flips remain possible (a fraction of a percent of rows in
+    `scripts/benchmark_incremental_retrain.py`).
+    """
+    model = copy.deepcopy(model)
+    a = np.array([s[0] for s in shifts], dtype=np.float64)
+    b = np.array([s[1] for s in shifts], dtype=np.float64)
+    if np.allclose(a, 1.0) and np.allclose(b, 0.0):
+        return model
+    name = type(model).__name__
+    if name == "XGBClassifier":
+        _rescale_xgboost(model.get_booster(), a, b)
+    elif name == "LGBMClassifier":
+        _rescale_lightgbm(model.booster_, a, b)
+    elif hasattr(model, "estimators_") and hasattr(model, "n_estimators"):
+        _rescale_trees(np.ravel(model.estimators_), a, b)
+    elif hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        model.intercept_ = model.intercept_ + model.coef_ @ b
+        model.coef_ = model.coef_ * a
+    return model
+
+
+# ======================================================
+# 🏋️ Continued training
+# ======================================================
+def _added_estimators(current: int, n_new: int, n_seen: int) -> int:
+    """Trees / boosting rounds for the new rows: their share of all rows seen so far."""
+    return max(1, math.ceil(current * n_new / max(n_seen, 1)))
+
+
+def continue_training(model, X, y, n_seen: int):
+    """
+    Copy of `model` trained further on (X, y).
+
+    - XGBoost / LightGBM: boosting continues from the existing booster.
+    - GradientBoosting / RandomForest: `warm_start` adds stages / trees.
+    - Estimators with `partial_fit` (SGD-style linear models): one more pass.
+
+    Boosters and ensembles grow by the new rows' share of all rows seen
+    (`n_seen` before this batch), so one small batch cannot outweigh the history.
+
+    Raises:
+        ValueError: If the model cannot continue training.
+    """
+    kind = continuation_kind(model)
+    model = copy.deepcopy(model)
+    n_new = len(y)
+    if kind == "xgboost":
+        booster = model.get_booster()
+        rounds = booster.num_boosted_rounds()
+        model.set_params(n_estimators=_added_estimators(rounds, n_new, n_seen), early_stopping_rounds=None)
+        model.fit(X, y, xgb_model=booster, verbose=False)
+        model.set_params(n_estimators=model.get_booster().num_boosted_rounds())
+    elif kind == "lightgbm":
+        booster = model.booster_
+        rounds = booster.current_iteration()
+        model.set_params(n_estimators=_added_estimators(rounds, n_new, n_seen))
+        model.fit(X, y, init_model=booster)
+        model.set_params(n_estimators=model.booster_.current_iteration())
+    elif kind == "warm_start":
+        current = len(model.estimators_)
+        params = {"warm_start": True, "n_estimators": current + _added_estimators(current, n_new, n_seen)}
+        if "n_iter_no_change" in model.get_params():
+            params["n_iter_no_change"] = None
+        model.set_params(**params).fit(X, y)
+        model.set_params(warm_start=False)
+    elif kind == "partial_fit":
+        model.partial_fit(X, y)
+    else:
+        raise ValueError(f"{type(model).__name__} cannot continue training on new rows")
+    return model
+
+
+# ======================================================
+# 🔁 Incremental update: preprocessing + model
+# ======================================================
+def model_input(model, X, feature_names: Sequence[str]):
+    """Selected features in the layout the model was fitted on (named DataFrame or array)."""
+    X = X.toarray() if sparse.issparse(X) else np.asarray(X)
+    if getattr(model, "feature_names_in_", None) is not None or type(model).__name__ in ("XGBClassifier",
+                                                                                         "LGBMClassifier"):
+        return pd.DataFrame(X, columns=list(feature_names))
+    return X
+
+
+def incremental_update(pipeline: Pipeline, model, X_new: pd.DataFrame, y_new,
+                       reasons: Optional[List[str]] = None) -> Tuple[Pipeline, object, dict]:
+    """
+    Fold newly labelled rows into the fitted pipeline and model.
+
+    1. Scaler statistics and one-hot vocabularies are updated
+       (`update_preprocessing`).
+    2. The model is re-expressed in the updated feature scale (`rescale_model`),
+       so it scores the rows it already knew as before (up to the RandomForest
+       near-tie flips described there).
+    3. The model continues training on the new rows only (`continue_training`).
+
+    Args:
+        pipeline (Pipeline): Fitted inference pipeline (as saved by `run_pipeline`).
+        model: Fitted classifier on the pipeline's output.
+        X_new (pd.DataFrame): New rows, cleaned, without the target.
+        y_new: Their labels.
+        reasons (List[str], optional): Result of an earlier `check_incremental`
+            on the same rows (computed here if not given).
+
+    Returns:
+        Tuple[Pipeline, model, dict]: Updated pipeline, updated model and a summary.
+
+    Raises:
+        ValueError: If `check_incremental` finds a reason to retrain fully.
+    """
+    if reasons is None:
+        reasons = check_incremental(pipeline, model, X_new, y_new)
+    if reasons:
+        raise ValueError("Incremental retrain not possible: " + "; ".join(reasons))
+
+    n_seen = seen_rows(pipeline)
+    y_new = pd.Series(np.asarray(y_new))
+    pipeline, affine, added = update_preprocessing(pipeline, X_new)
+    names = selected_feature_names(pipeline)
+    model = rescale_model(model, [affine.get(name, (1.0, 0.0)) for name in names])
+    model = continue_training(model, model_input(model, pipeline.transform(X_new), names), y_new, n_seen)
+
+    summary = {
+        "new_rows": len(X_new),
+        "rows_seen_before": n_seen,
+        "continuation": continuation_kind(model),
+        "rescaled_features": sum(1 for name in names if name in affine),
+        "added_categories": added,
+    }
+    print(f"✅ Incremental update: {len(X_new)} new rows folded into {n_seen} "
+          f"({summary['continuation']}, {sum(len(v) for v in added.values())} new categories)")
+    return pipeline, model, summary
@@ -0,0 +1,213 @@
+# ===============================
+# 📁 Module: Training Scheduler
+# Runs the model families' hyperparameter searches concurrently
+# under one global CPU budget.
+# ===============================
+
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Tuple
+
+from sklearn.model_selection import ParameterGrid, RandomizedSearchCV
+
+# 📌 Cores shared by all concurrent searches (default: every core of this host)
+TRAIN_CPU_BUDGET = int(os.getenv("TRAIN_CPU_BUDGET", "0")) or (os.cpu_count() or 1)
+
+# 📌 Seconds per single fit on ~5k rows x 50 selected features (1 core), and how
+#    that grows with rows (kernel SVM is roughly quadratic). Only the ratios matter.
+FAMILY_FIT_COST = {
+    "LogisticRegression": (0.02, 1.0),
+    "RandomForest":       (0.6, 1.0),
+    "GradientBoosting":   (0.8, 1.0),
+    "XGBoost":            (0.1, 1.0),
+    "LightGBM":           (0.1, 1.0),
+    "SVM":                (5.0, 2.0),
+}
+DEFAULT_FIT_COST = (1.0, 1.0)
+COST_REFERENCE_ROWS = 5000
+
+
+# ======================================================
+# 📐 Cost model & core allocation
+# ======================================================
+def search_candidates(search) -> int:
+    """Parameter settings a GridSearchCV / RandomizedSearchCV / SuccessiveHalvingSearch will try."""
+    if hasattr(search, "candidates"):
+        return len(search.candidates)
+    if isinstance(search, RandomizedSearchCV):
+        grid = search.param_distributions
+        if all(hasattr(values, "__len__") for values in grid.values()):
+            return min(search.n_iter, len(ParameterGrid(grid)))
+        return search.n_iter
+    return len(ParameterGrid(search.param_grid))
+
+
+def _family_seconds(p: dict, cores: int, threaded: bool) -> Tuple[float, int, int]:
+    """Projected (seconds, search workers, threads per fit) of a family on `cores` cores."""
+    search_jobs = min(cores, p["fits"])
+    model_threads = max(1, cores // search_jobs) if threaded else 1
+    rounds = -(-p["fits"] // search_jobs)
+    return p["est_seconds"] / p["fits"] * rounds / model_threads, search_jobs, model_threads
+
+
+def projected_makespan(plan: Dict[str, dict], budget: int) -> float:
+    """
+    Wall time of a plan under the `train_families` dispatch rule: most expensive
+    family first, each started as soon as its cores are free.
+    """
+    pending = sorted(plan, key=lambda name: plan[name]["est_seconds"], reverse=True)
+    running, free, now = [], budget, 0.0
+    while pending or running:
+        for name in list(pending):
+            if plan[name]["cores"] <= free:
+                running.append((now + plan[name]["projected_s"], name))
+                free -= plan[name]["cores"]
+                pending.remove(name)
+        running.sort()
+        now, name = running.pop(0)
+        free += plan[name]["cores"]
+    return now
+
+
+def plan_resources(searches: Dict[str, object], n_rows: int, budget: int = TRAIN_CPU_BUDGET) -> Dict[str, dict]:
+    """
+    Size every family's search by its expected cost.
+
+    A family's cost is fits (candidates × CV folds) × estimated seconds per
+    fit. Cores go to parallel CV fits first (`search_jobs`); families whose
+    model is multi-threaded (`n_jobs` parameter) use the remainder as threads
+    per fit (`model_threads`), so search workers × model threads never exceeds
+    the family's cores. For each target duration, every family gets the fewest
+    cores that finish it in time; the allocation with the shortest projected
+    makespan wins, so cheap families run beside the expensive one instead of
+    queueing behind it.
+
+    Args:
+        searches (dict): {family name: unfitted search object}.
+        n_rows (int): Training rows.
+        budget (int): Total cores.
+
+    Returns:
+        dict: {family name: {"fits", "est_seconds", "cores", "search_jobs",
+        "model_threads", "projected_s"}}.
+    """
+    budget = max(1, int(budget))
+    plan, threaded = {}, {}
+    for name, search in searches.items():
+        fits = search_candidates(search) * search.cv
+        # Successive halving: most fits see a fraction of the rows, so cost is counted in full-size fits
+        work = search.expected_fits(n_rows) if hasattr(search, "expected_fits") else fits
+        seconds, exponent = FAMILY_FIT_COST.get(name, DEFAULT_FIT_COST)
+        plan[name] = {"fits": fits, "est_seconds": work * seconds * (n_rows / COST_REFERENCE_ROWS) ** exponent}
+        threaded[name] = "n_jobs" in search.estimator.get_params()
+
+    options = {name: [_family_seconds(p, cores, threaded[name]) + (cores,) for cores in range(1, budget + 1)]
+               for name, p in plan.items()}
+    best, best_makespan = None, float("inf")
+    for target in sorted({option[0] for family in options.values() for option in family}):
+        candidate = {}
+        for name, p in plan.items():
+            # Fewest cores meeting the target (options are sorted by cores), else the fastest option
+            fitting = [option for option in options[name] if option[0] <= target]
+            seconds, search_jobs, model_threads, cores = fitting[0] if fitting else min(options[name])
+            candidate[name] = {**p, "cores": cores, "search_jobs": search_jobs,
+                               "model_threads": model_threads, "projected_s": round(seconds, 2)}
+        makespan = projected_makespan(candidate, budget)
+        if makespan < best_makespan - 1e-9:
+            best, best_makespan = candidate, makespan
+    return best
+
+
+# ======================================================
+# 🧵 One family in its own process
+# ======================================================
+def _train_family(task: dict) -> Tuple[str, str, float, float]:
+    """
+    Child-process entry point: cap this process's native thread pools at
+    the family's cores, then train and log it as a nested MLflow run.
+    """
+    import mlflow
+    from threadpoolctl import threadpool_limits
+    from src.ml.training.train_utils import train_and_log_model
+
+    threadpool_limits(limits=task["cores"])
+    mlflow.set_tracking_uri(task["tracking_uri"])
+    mlflow.set_experiment(experiment_id=task["experiment_id"])
+
+    t0 = time.perf_counter()
+    name, run_id, f1 = train_and_log_model(
+        name=task["name"], model=task["model"], param_grid=task["param_grid"],
+        n_jobs=task["search_jobs"], model_threads=task["model_threads"],
+        parent_run_id=task["parent_run_id"], **task["data"]
+    )
+    return name, run_id, f1, time.perf_counter() - t0
+
+
+def train_families(
+    families: Dict[str, tuple],
+    data: dict,
+    parent_run_id: str,
+    budget: int = TRAIN_CPU_BUDGET,
+) -> Tuple[List[Tuple[str, str, float]], Dict[str, dict]]:
+    """
+    Train all families concurrently without exceeding `budget` cores.
+
+    Families start most expensive first whenever enough of the budget is
+    free (the first waiting family that fits is started). Each runs in a
+    separate process: concurrent searches in one process would share
+    joblib's single loky executor, which cannot be resized while another
+    search is using it. Every family logs a child run under
+    `parent_run_id`, explicitly, since the active-run stack is per process.
+
+    Args:
+        families (dict): {name: (unfitted model, param grid)}, as from `get_models_with_params`.
+        data (dict): X_train, X_test, y_train, y_test, feature_names.
+        parent_run_id (str): MLflow run the family runs are nested under.
+        budget (int): Total cores.
+
+    Returns:
+        Tuple[list, dict]: (name, run_id, f1) per family in `families` order,
+        and the executed plan (with start/end offsets and wall seconds per family).
+    """
+    import mlflow
+    from src.ml.training.train_utils import build_search
+
+    searches = {name: build_search(name, model, grid) for name, (model, grid) in families.items()}
+    plan = plan_resources(searches, n_rows=data["X_train"].shape[0], budget=budget)
+    parent = mlflow.get_run(parent_run_id)
+    pending = sorted(plan, key=lambda name: plan[name]["est_seconds"], reverse=True)
+
+    print(f"[INFO] Training {len(families)} model families on a {budget}-core budget:")
+    for name in pending:
+        p = plan[name]
+        print(f"   {name:20s} {p['fits']:3d} fits ~{p['est_seconds']:7.1f}s  "
+              f"cores={p['cores']} (search n_jobs={p['search_jobs']} x {p['model_threads']} model threads)")
+
+    results, free, running = {}, budget, {}
+    t0 = time.perf_counter()
+    context = multiprocessing.get_context("spawn")  # fresh interpreters: no inherited OpenMP/MLflow state
+    with ProcessPoolExecutor(max_workers=min(len(families), budget), mp_context=context) as pool:
+        while pending or running:
+            for name in list(pending):
+                if plan[name]["cores"] <= free:
+                    model, grid = families[name]
+                    task = {"name": name, "model": model, "param_grid": grid, "data": data,
+                            "parent_run_id": parent_run_id, "tracking_uri": mlflow.get_tracking_uri(),
+                            "experiment_id": parent.info.experiment_id, **plan[name]}
+                    running[pool.submit(_train_family, task)] = name
+                    plan[name]["started_s"] = round(time.perf_counter() - t0, 2)
+                    free -= plan[name]["cores"]
+                    pending.remove(name)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                mname, run_id, f1, seconds = future.result()
+                results[name] = (mname, run_id, f1)
+                plan[name].update(finished_s=round(time.perf_counter() - t0, 2), wall_s=round(seconds, 2))
+                free += plan[name]["cores"]
+
+    print(f"[⏱️] All model families trained in {time.perf_counter() - t0:.1f}s")
+    return [results[name] for name in families], plan
@@ -0,0 +1,219 @@
+# ===============================
+# 📁 Module: Successive-Halving Search
+# Budgeted hyperparameter search over growing rows/estimators,
+# with native early stopping for the boosted-tree families.
+# ===============================
+
+import os
+import math
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, train_test_split
+
+# 📌 Kept fraction per rung is 1/eta; rows and estimators grow eta-fold per rung
+TRAIN_SEARCH_ETA = int(os.getenv("TRAIN_SEARCH_ETA", "3"))
+
+# 📌 Wall-clock seconds per model family; the best model so far is returned when exceeded
+TRAIN_SEARCH_BUDGET_S = float(os.getenv("TRAIN_SEARCH_BUDGET_S", "300"))
+
+# 📌 Share of the training rows held out as the validation fold
+TRAIN_SEARCH_VALIDATION = float(os.getenv("TRAIN_SEARCH_VALIDATION", "0.2"))
+
+# 📌 Boosting rounds without validation improvement before a fit stops
+EARLY_STOPPING_ROUNDS = int(os.getenv("EARLY_STOPPING_ROUNDS", "10"))
+
+# 📌 Smallest training subset of the first rung
+MIN_RUNG_ROWS = 300
+
+# 📌 Smallest forest / boosting cap of the first rung
+MIN_RUNG_ESTIMATORS = 10
+
+
+def _take(X, rows):
+    return X.iloc[rows] if isinstance(X, pd.DataFrame) else X[rows]
+
+
+def _kind(estimator) -> str:
+    """Early-stopping flavour: "xgboost", "lightgbm", "sklearn_gb" or "" (none)."""
+    name = type(estimator).__name__
+    return {"XGBClassifier": "xgboost", "LGBMClassifier": "lightgbm",
+            "GradientBoostingClassifier": "sklearn_gb"}.get(name, "")
+
+
+def fit_with_early_stopping(estimator, X, y, X_val=None, y_val=None):
+    """
+    Fit `estimator`, stopping boosted trees once the validation loss stops improving.
+
+    XGBoost and LightGBM monitor (X_val, y_val); GradientBoosting uses its own
+    `validation_fraction` split of X. Other estimators are fitted normally.
+
+    Returns:
+        Tuple[estimator, int | None]: The fitted estimator and the number of
+        boosting rounds kept (None when not early-stopped).
+    """
+    kind = _kind(estimator)
+    if kind == "xgboost" and X_val is not None:
+        estimator.set_params(early_stopping_rounds=EARLY_STOPPING_ROUNDS)
+        estimator.fit(X, y, eval_set=[(X_val, y_val)], verbose=False)
+        return estimator, int(estimator.best_iteration) + 1
+    if kind == "lightgbm" and X_val is not None:
+        import lightgbm
+        estimator.fit(X, y, eval_set=[(X_val, y_val)],
+                      callbacks=[lightgbm.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)])
+        return estimator, int(estimator.best_iteration_) or None
+    if kind == "sklearn_gb":
+        estimator.set_params(n_iter_no_change=EARLY_STOPPING_ROUNDS, validation_fraction=0.1)
+        estimator.fit(X, y)
+        return estimator, int(estimator.n_estimators_)
+    return estimator.fit(X, y), None
+
+
+def _evaluate(estimator, params: dict, X, y, X_val, y_val, deadline: float) -> Optional[dict]:
+    """One candidate at one rung (skipped once the budget is spent)."""
+    if time.time() >= deadline:
+        return None
+    t0 = time.perf_counter()
+    estimator, rounds = fit_with_early_stopping(clone(estimator).set_params(**params), X, y, X_val, y_val)
+    return {
+        "estimator": estimator,
+        "rounds": rounds,
+        "fit_time": time.perf_counter() - t0,
+        "test_score": f1_score(y_val, estimator.predict(X_val)),
+        "train_score": f1_score(y, estimator.predict(X)),
+    }
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive halving with a wall-clock budget, a drop-in for the
+    GridSearchCV attributes `train_and_log_model` reads.
+
+    Rung i trains every surviving candidate on a growing share of the rows
+    (and, for forests / boosted trees, of the `n_estimators` cap) and keeps
+    the best 1/eta by F1 on a held-out validation fold; the last rung uses all
+    fit rows and the full cap. Boosted trees stop early on the validation fold.
+    The winner is refitted on every training row (boosters with the number of
+    rounds early stopping kept). Once `budget_s` is spent no new fit starts:
+    the best model so far (highest rung, best score) is returned as is.
+
+    Args:
+        estimator: Unfitted model.
+        param_grid (dict): Hyperparameter grid (every combination is a candidate).
+        eta (int): Halving factor.
+        budget_s (float): Wall-clock budget in seconds.
+        validation (float): Share of rows held out for scoring / early stopping.
+        n_jobs (int): Candidates fitted in parallel within a rung.
+        random_state (int): Seed of the validation split and row order.
+    """
+
+    def __init__(self, estimator, param_grid: dict, eta: int = TRAIN_SEARCH_ETA,
+                 budget_s: float = TRAIN_SEARCH_BUDGET_S, validation: float = TRAIN_SEARCH_VALIDATION,
+                 n_jobs: int = -1, random_state: int = 42):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.eta = max(2, int(eta))
+        self.budget_s = budget_s
+        self.validation = validation
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.cv = 1  # one validation fold (read by the training scheduler)
+
+    @property
+    def candidates(self) -> List[dict]:
+        return list(ParameterGrid(self.param_grid))
+
+    def n_rungs(self, n_rows: int) -> int:
+        """Rungs needed to narrow the grid to one candidate, limited by MIN_RUNG_ROWS."""
+        wanted = math.ceil(math.log(len(self.candidates), self.eta)) + 1 if len(self.candidates) > 1 else 1
+        affordable = int(math.log(max(n_rows / MIN_RUNG_ROWS, 1), self.eta)) + 1
+        return max(1, min(wanted, affordable))
+
+    def expected_fits(self, n_rows: int = 10000) -> float:
+        """Search cost in full-size fits (rung fits weighted by their share of rows), plus the refit."""
+        n, rungs, total = len(self.candidates), self.n_rungs(n_rows), 1.0
+        for rung in range(rungs):
+            total += n * self.eta ** (rung - rungs + 1)
+            n = max(1, math.ceil(n / self.eta))
+        return total
+
+    def fit(self, X, y):
+        started = time.perf_counter()
+        deadline = time.time() + self.budget_s
+        y = pd.Series(np.asarray(y))
+        fit_rows, val_rows = train_test_split(np.arange(len(y)), test_size=self.validation,
+                                              random_state=self.random_state, stratify=y)
+        order = np.random.default_rng(self.random_state).permutation(fit_rows)
+        X_val, y_val = _take(X, val_rows), y.iloc[val_rows]
+
+        candidates = self.candidates
+        rungs = self.n_rungs(len(order))
+        alive = list(range(len(candidates)))
+        results = {"params": [], "rung": [], "n_rows": [], "n_estimators": [], "rounds": [],
+                   "mean_test_score": [], "mean_train_score": [], "mean_fit_time": []}
+        best, best_rung = None, -1
+
+        for rung in range(rungs):
+            share = float(self.eta) ** (rung - rungs + 1)
+            rows = order[:max(MIN_RUNG_ROWS, int(len(order) * share))] if rung < rungs - 1 else order
+            X_rung, y_rung = _take(X, rows), y.iloc[rows]
+            jobs = []
+            for i in alive:
+                params = dict(candidates[i])
+                if "n_estimators" in self.estimator.get_params() and rung < rungs - 1:
+                    cap = params.get("n_estimators", self.estimator.get_params()["n_estimators"])
+                    params["n_estimators"] = max(MIN_RUNG_ESTIMATORS, int(cap * share))
+                jobs.append((i, params))
+
+            outcomes = Parallel(n_jobs=min(effective_n_jobs(self.n_jobs), len(jobs)))(
+                delayed(_evaluate)(self.estimator, params, X_rung, y_rung, X_val, y_val, deadline)
+                for _, params in jobs)
+
+            scored = []
+            for (i, params), outcome in zip(jobs, outcomes):
+                if outcome is None:
+                    continue
+                for key, value in (("params", candidates[i]), ("rung", rung), ("n_rows", len(rows)),
+                                   ("n_estimators", params.get("n_estimators")), ("rounds", outcome["rounds"]),
+                                   ("mean_test_score", outcome["test_score"]),
+                                   ("mean_train_score", outcome["train_score"]),
+                                   ("mean_fit_time", outcome["fit_time"])):
+                    results[key].append(value)
+                scored.append((outcome["test_score"], i, outcome))
+            if scored:
+                scored.sort(key=lambda item: (-item[0], item[1]))
+                best, best_rung = scored[0], rung
+            if len(scored) < len(jobs) or time.time() >= deadline:
+                break
+            alive = [i for _, i, _ in scored[:max(1, math.ceil(len(scored) / self.eta))]]
+
+        if best is None:
+            raise TimeoutError(f"Search budget of {self.budget_s:.0f}s ran out before the first fit finished")
+
+        score, index, outcome = best
+        self.best_params_ = dict(candidates[index])
+        self.best_score_ = float(score)
+        self.best_estimator_ = outcome["estimator"]
+        self.budget_exhausted_ = best_rung < rungs - 1 or time.time() >= deadline
+        self.refitted_ = False
+        if not self.budget_exhausted_:
+            final = clone(self.estimator).set_params(**self.best_params_)
+            if outcome["rounds"] and _kind(final) in ("xgboost", "lightgbm"):
+                final.set_params(n_estimators=outcome["rounds"])  # the rounds early stopping kept
+            self.best_estimator_, _ = fit_with_early_stopping(final, X, y)
+            self.refitted_ = True
+
+        self.cv_results_ = {key: np.asarray(values, dtype=object if key in ("params", "n_estimators", "rounds")
+                                            else float) for key, values in results.items()}
+        self.n_candidates_ = len(candidates)
+        self.n_rungs_ = best_rung + 1
+        self.search_seconds_ = time.perf_counter() - started
+        print(f"[⏱️] Successive halving: {len(results['params'])} fits over {self.n_rungs_}/{rungs} rungs in "
+              f"{self.search_seconds_:.1f}s" + (" (budget exhausted, best so far returned)"
+                                                 if self.budget_exhausted_ else ""))
+        return self
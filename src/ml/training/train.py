@@ -3,8 +3,10 @@
 import os
 import sys
 from datetime import datetime
+from typing import Optional
 import pandas as pd
 import mlflow
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from dotenv import load_dotenv
 
@@ -20,22 +22,39 @@ load_dotenv()
 from src.drift.check_drift import check_drift
 from src.ml.pipeline.pipeline_runner import run_pipeline
 from src.ml.training.train_utils import get_models_with_params, train_and_log_model
-from src.ml.registry.model_registry import register_and_promote
+from src.ml.training.scheduler import train_families, TRAIN_CPU_BUDGET
+from src.ml.registry.model_registry import promote_pair
 
+# 📌 "sequential" (default): one family at a time, each search on all cores;
+#    "concurrent": families share TRAIN_CPU_BUDGET cores in parallel processes
+#    (opt-in until measured on a multi-core host; a 1-core budget always runs
+#    sequentially, since worker processes would only add start-up time)
+TRAIN_SCHEDULER = os.getenv("TRAIN_SCHEDULER", "sequential").lower()
 
-def train_all_models():
+
+def train_all_models(table_name: str = "lead_data", load_options: Optional[dict] = None,
+                     model_tags: Optional[dict] = None):
     """
     Executes full pipeline: preprocessing, model training, drift detection, 
     MLflow logging, and best model registration.
+
+    Args:
+        table_name (str): Table with the labelled training rows.
+        load_options (dict, optional): Passed to `run_pipeline` (e.g. a
+            where/params bound on the rows to train on).
+        model_tags (dict, optional): Tags set on the registered best model version.
     """
 
     # ─────────────────────────────────────────────
     # 1. Preprocess & Feature Selection Pipeline
+    #    (registered together with the best model in step 6)
     # ─────────────────────────────────────────────
     X_sel, y, final_pipeline = run_pipeline(
+        table_name=table_name,
         save=True,
-        register=True,
-        return_pipeline=True
+        register=False,
+        return_pipeline=True,
+        load_options=load_options
     )
 
     # ─────────────────────────────────────────────
@@ -48,14 +67,15 @@ def train_all_models():
 
     # ─────────────────────────────────────────────
     # 3. Convert selected features to DataFrame
+    #    (sparse mode: keep the CSR matrix; train_utils densifies per model)
     # ─────────────────────────────────────────────
-    df = pd.DataFrame(X_sel, columns=feat_names)
+    data = X_sel if sparse.issparse(X_sel) else pd.DataFrame(X_sel, columns=feat_names)
 
     # ─────────────────────────────────────────────
     # 4. Train/Test Split
     # ─────────────────────────────────────────────
     X_train, X_test, y_train, y_test = train_test_split(
-        df, y, test_size=0.2,
+        data, y, test_size=0.2,
         random_state=42, stratify=y
     )
 
@@ -75,37 +95,40 @@ def train_all_models():
         print(f"[INFO] Parent run ID: {parent.info.run_id}")
 
         # 🧪 Check data drift between train & test
-        check_drift(X_train, X_test, "train_vs_test", save_report=True, log_to_mlflow=True)
+        if sparse.issparse(X_train):
+            check_drift(pd.DataFrame(X_train.toarray(), columns=feat_names),
+                        pd.DataFrame(X_test.toarray(), columns=feat_names),
+                        "train_vs_test", save_report=True, log_to_mlflow=True)
+        else:
+            check_drift(X_train, X_test, "train_vs_test", save_report=True, log_to_mlflow=True)
 
         # 🔁 Train and log all models
-        for name, (model, params) in get_models_with_params().items():
-            mname, run_id, f1 = train_and_log_model(
-                name=name,
-                model=model,
-                param_grid=params,
-                X_train=X_train,
-                X_test=X_test,
-                y_train=y_train,
-                y_test=y_test,
-                feature_names=feat_names
-            )
+        families = get_models_with_params()
+        splits = dict(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test,
+                      feature_names=feat_names)
+        started = datetime.now()
+        if TRAIN_SCHEDULER == "sequential" or TRAIN_CPU_BUDGET <= 1:
+            results = [train_and_log_model(name=name, model=model, param_grid=params, **splits)
+                       for name, (model, params) in families.items()]
+        else:
+            results, schedule = train_families(families, splits, parent_run_id=parent.info.run_id,
+                                               budget=TRAIN_CPU_BUDGET)
+            mlflow.log_dict(schedule, "training_schedule.json")
+        mlflow.log_metric("training_wall_seconds", (datetime.now() - started).total_seconds())
 
+        for mname, run_id, f1 in results:
             # 🥇 Track best model
             if f1 > best_f1:
                 best_f1 = f1
                 best_info = (mname, run_id)
 
-        # ✅ Register best model to MLflow Model Registry
+        # ✅ Register the pipeline and best model; the model is promoted first,
+        #    tagged with the preprocessor version it was trained on
         best_name, best_run = best_info
         if best_name:
             print(f"\n🏆 Best model: {best_name} (F1={best_f1:.4f})")
             uri = f"runs:/{best_run}/{best_name}"
-            register_and_promote(
-                registry_name="LeadScoringBestModel",
-                run_id=best_run,
-                model_uri=uri,
-                is_pipeline=False
-            )
+            promote_pair(final_pipeline, run_id=best_run, model_uri=uri, model_tags=model_tags)
         else:
             print("❌ No successful model runs to register.")
 
@@ -10,12 +10,15 @@ import tempfile
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from scipy import sparse
 import mlflow
-import shap
 import warnings
+from contextlib import nullcontext
 
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+from joblib import parallel_config
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, ParameterGrid
 from src.ml.evaluation.metrics import compute_metrics
+from src.ml.training.search import SuccessiveHalvingSearch
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -23,6 +26,19 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 MODEL_DIR = os.path.join("src", "ml", "model_objects")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# 📌 Models trained directly on CSR input in sparse mode; the rest get a dense copy
+SPARSE_INPUT_MODELS = ("LogisticRegression", "XGBoost", "LightGBM")
+
+# 📌 Rows densified for the SHAP background / test sample and the MLflow signature
+SHAP_ROWS = 100
+
+# 📌 Cross-validation folds of every hyperparameter search
+CV_FOLDS = 3
+
+# 📌 "grid": Grid/RandomizedSearchCV on full data; "halving": budgeted successive
+#    halving over rows and estimators with early stopping (see search.py)
+TRAIN_SEARCH_MODE = os.getenv("TRAIN_SEARCH_MODE", "grid").lower()
+
 
 # ======================================================
 # 🔍 SHAP Explainability Plot Logger
@@ -30,8 +46,9 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 # ======================================================
 def log_shap_plot(model_name, model, X_train_df: pd.DataFrame, X_test_df: pd.DataFrame):
     try:
+        import shap  # heavy import, only needed here
         print(f"🔍 Generating SHAP for {model_name}")
-        
+
         # Choose appropriate SHAP explainer
         if model_name in ["RandomForest", "GradientBoosting", "XGBoost", "LightGBM"]:
             explainer = shap.TreeExplainer(model)
@@ -48,6 +65,7 @@ def log_shap_plot(model_name, model, X_train_df: pd.DataFrame, X_test_df: pd.Dat
             shap.summary_plot(shap_values, subset, show=False)
             plt.tight_layout()
             plt.savefig(tmp.name)
+            plt.close("all")
             mlflow.log_artifact(tmp.name, artifact_path=f"{model_name}_shap")
 
         print(f"📈 SHAP plot logged for {model_name}")
@@ -55,6 +73,45 @@ def log_shap_plot(model_name, model, X_train_df: pd.DataFrame, X_test_df: pd.Dat
         print(f"⚠️ SHAP failed for {model_name}: {e}")
 
 
+# ======================================================
+# 🔁 Hyperparameter Search
+# ======================================================
+def build_search(name: str, model, param_grid: dict, n_jobs: int = -1, mode: str = None):
+    """
+    GridSearchCV, or RandomizedSearchCV for the boosted-tree families
+    (up to 5 of the grid's combinations); SuccessiveHalvingSearch in "halving" mode.
+
+    Args:
+        name (str): Model family name.
+        model: Unfitted estimator.
+        param_grid (dict): Hyperparameter grid.
+        n_jobs (int): Parallel CV fits (-1: all cores).
+        mode (str, optional): "grid" or "halving" (default: TRAIN_SEARCH_MODE).
+
+    Returns:
+        The unfitted search object.
+    """
+    mode = mode or TRAIN_SEARCH_MODE
+    if mode == "halving":
+        return SuccessiveHalvingSearch(model, param_grid, n_jobs=n_jobs)
+    if mode != "grid":
+        raise ValueError(f"Unknown TRAIN_SEARCH_MODE '{mode}' (choose 'grid' or 'halving')")
+    if name in ["XGBoost", "LightGBM"]:
+        return RandomizedSearchCV(
+            estimator=model,
+            param_distributions=param_grid,
+            n_iter=min(5, len(ParameterGrid(param_grid))),
+            cv=CV_FOLDS, scoring="f1", n_jobs=n_jobs,
+            random_state=42, return_train_score=True
+        )
+    return GridSearchCV(
+        estimator=model,
+        param_grid=param_grid,
+        cv=CV_FOLDS, scoring="f1", n_jobs=n_jobs,
+        return_train_score=True
+    )
+
+
 # ======================================================
 # ⚙️ Model Trainer + MLflow Logger
 # Trains model using GridSearch/RandomSearchCV
@@ -65,44 +122,69 @@ def train_and_log_model(
     model,
     param_grid: dict,
     X_train, X_test, y_train, y_test,
-    feature_names: list = None
+    feature_names: list = None,
+    n_jobs: int = -1,
+    model_threads: int = None,
+    parent_run_id: str = None
 ):
+    """
+    Tune, evaluate and log one model family as a child MLflow run.
+
+    Args:
+        n_jobs (int): Parallel CV fits of the search (-1: all cores).
+        model_threads (int, optional): Threads per fit for models with an
+            `n_jobs` parameter (RandomForest, XGBoost, LightGBM), also applied to
+            the search workers' native thread pools so workers × threads stays
+            within budget. None keeps the defaults.
+        parent_run_id (str, optional): Parent run to nest under explicitly (from
+            another process); by default the run nests under the active run.
+
+    Returns:
+        Tuple[str, str, float]: (name, child run ID, test F1).
+    """
     print(f"\n📌 Training model: {name}")
 
+    if model_threads is not None and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=model_threads)
+
+    # ✅ Sparse mode: CSR straight into models that take it, dense fallback otherwise
+    if sparse.issparse(X_train):
+        if feature_names is None:
+            raise ValueError("feature_names must be provided for sparse input")
+        if name in SPARSE_INPUT_MODELS:
+            model = prepare_for_sparse(name, model)
+            fit_train, fit_test = X_train.tocsr(), X_test.tocsr()
+        else:
+            print(f"[INFO] {name} trains on a dense copy of the sparse features")
+            fit_train, fit_test = X_train.toarray(), X_test.toarray()
+        # SHAP and the MLflow signature only ever look at a few rows
+        X_train_df = pd.DataFrame(X_train[:SHAP_ROWS].toarray(), columns=feature_names)
+        X_test_df = pd.DataFrame(X_test[:SHAP_ROWS].toarray(), columns=feature_names)
     # ✅ Ensure DataFrame for SHAP & MLflow signature
-    if isinstance(X_train, np.ndarray):
+    elif isinstance(X_train, np.ndarray):
         if feature_names is None:
             raise ValueError("feature_names must be provided for NumPy input")
         X_train_df = pd.DataFrame(X_train, columns=feature_names)
         X_test_df = pd.DataFrame(X_test, columns=feature_names)
+        fit_train, fit_test = X_train_df, X_test_df
     else:
         X_train_df = X_train.copy()
         X_test_df = X_test.copy()
+        fit_train, fit_test = X_train_df, X_test_df
 
     # 🔁 Choose between GridSearchCV or RandomizedSearchCV
-    search = (
-        RandomizedSearchCV(
-            estimator=model,
-            param_distributions=param_grid,
-            n_iter=min(5, len(param_grid)),
-            cv=3, scoring="f1", n_jobs=-1,
-            random_state=42, return_train_score=True
-        ) if name in ["XGBoost", "LightGBM"]
-        else GridSearchCV(
-            estimator=model,
-            param_grid=param_grid,
-            cv=3, scoring="f1", n_jobs=-1,
-            return_train_score=True
-        )
-    )
+    search = build_search(name, model, param_grid, n_jobs=n_jobs)
 
-    # 🏋️ Train the model
-    search.fit(X_train_df, y_train)
+    # 🏋️ Train the model (loky workers' OpenMP/BLAS pools capped at model_threads)
+    threads = (parallel_config(backend="loky", inner_max_num_threads=model_threads)
+               if model_threads is not None and n_jobs != 1 else nullcontext())
+    with threads:
+        search.fit(fit_train, y_train)
     best_model = search.best_estimator_
 
     # 📊 Evaluate
-    y_pred = best_model.predict(X_test_df)
-    y_prob = best_model.predict_proba(X_test_df)[:, 1] if hasattr(best_model, "predict_proba") else None
+    y_pred = best_model.predict(fit_test)
+    y_prob = best_model.predict_proba(fit_test)[:, 1] if hasattr(best_model, "predict_proba") else None
     metrics = compute_metrics(y_test, y_pred, y_prob)
     f1 = metrics["f1_score"]
 
@@ -117,9 +199,15 @@ def train_and_log_model(
         "cv_mean_train_score": float(np.mean(search.cv_results_["mean_train_score"])),
         "cv_mean_test_score": float(np.mean(search.cv_results_["mean_test_score"]))
     })
+    if isinstance(search, SuccessiveHalvingSearch):
+        metrics.update({
+            "search_seconds": search.search_seconds_,
+            "search_fits": float(len(search.cv_results_["params"])),
+            "search_budget_exhausted": float(search.budget_exhausted_)
+        })
 
     # 📤 Log everything to MLflow
-    with mlflow.start_run(run_name=name, nested=True) as run:
+    with mlflow.start_run(run_name=name, nested=parent_run_id is None, parent_run_id=parent_run_id) as run:
         run_id = run.info.run_id
 
         mlflow.log_params(search.best_params_)
@@ -146,6 +234,25 @@ def train_and_log_model(
     return name, run_id, f1
 
 
+# ======================================================
+# 🕳️ Sparse Input Preparation
+# Keeps predictions on CSR (training) and dense (serving) rows identical
+# ======================================================
+def prepare_for_sparse(name: str, model):
+    """
+    Adjust a model that will be fitted on CSR input.
+
+    XGBoost treats entries absent from a CSR matrix as missing, while the
+    serving path scores dense rows where they are real zeros. Declaring 0.0
+    as the missing value makes both layouts mean the same thing (there are no
+    NaNs left after imputation). LogisticRegression and LightGBM already read
+    absent entries as zeros.
+    """
+    if name == "XGBoost":
+        model.set_params(missing=0.0)
+    return model
+
+
 # ======================================================
 # 🧠 Supported Models & Hyperparameter Grids
 # Add/remove models here to train in main pipeline